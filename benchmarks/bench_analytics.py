@@ -0,0 +1,108 @@
+"""Training load and heart rate zone analytics on a 5 year history.
+
+    python benchmarks/bench_analytics.py --workouts 1m --rides 500
+
+Generates a seeded database spanning five years and stores 1 Hz heart rate
+samples for the --rides most recent workouts. It then times a full
+rebuild of the CTL/ATL curves, the incremental update after logging one
+workout, an update with nothing to do, filling the zone cache and summing
+zone time from it. The incremental result is checked against a rebuild.
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import analytics
+import database
+import storage
+from dataset import generate, parse_size
+from samples import save_samples
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def forget_curves(path):
+    conn = sqlite3.connect(path)
+    conn.execute("DELETE FROM training_load_state")
+    conn.commit()
+    conn.close()
+
+
+def forget_zones(path):
+    conn = sqlite3.connect(path)
+    conn.execute("DELETE FROM workout_zones")
+    conn.commit()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark training load and zone analytics")
+    parser.add_argument("--workouts", type=parse_size, default="1m")
+    parser.add_argument("--rides", type=int, default=500, help="recent workouts given heart rate samples")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="fitness_analytics_bench_")
+    try:
+        engine = storage.configure(os.path.join(workdir, 'fitness_tracker.db'))
+        generate(engine, args.workouts, seed=args.seed)
+        database.create_db()
+
+        rng = np.random.default_rng(args.seed)
+        conn = engine.connect()
+        recent = [row[0] for row in conn.execute("SELECT id, duration FROM workouts ORDER BY id DESC LIMIT ?",
+                                                 (args.rides,))]
+        durations = dict(conn.execute(f"SELECT id, duration FROM workouts WHERE id >= {min(recent)}"))
+        conn.close()
+        for workout_id in recent:
+            seconds = int(durations[workout_id] * 60)
+            heart_rate = np.clip(110 + np.cumsum(rng.integers(-1, 2, seconds)) * 0.5, 80, 195)
+            save_samples(workout_id, {"heart_rate": (np.arange(seconds), heart_rate)})
+        print(f"{args.workouts:,} workouts over 5 years, {args.rides} with heart rate samples\n")
+
+        rebuilds = []
+        for _ in range(args.repeat):
+            forget_curves(engine.path)
+            rebuilds.append(timed(analytics.update_training_load)[0])
+        forget_zones(engine.path)
+        forget_curves(engine.path)
+        cold_ms, _ = timed(analytics.update_training_load)
+        noop_ms, _ = timed(analytics.update_training_load)
+        database.add_workout("Running", 45, 450, None, "High")
+        incremental_ms, first_day = timed(analytics.update_training_load)
+        _, load, ctl, atl, _ = analytics.get_training_load()
+        forget_curves(engine.path)
+        analytics.update_training_load()
+        _, load_full, ctl_full, atl_full, _ = analytics.get_training_load()
+        matches = np.allclose(ctl, ctl_full) and np.allclose(atl, atl_full) and np.allclose(load, load_full)
+
+        forget_zones(engine.path)
+        zones_cold_ms, _ = timed(analytics.zone_totals)
+        zones_warm_ms, totals = timed(analytics.zone_totals)
+
+        print(f"full rebuild, zones cached      {np.median(rebuilds):8.1f} ms (median of {args.repeat})")
+        print(f"full rebuild, zones computed    {cold_ms:8.1f} ms")
+        print(f"update, nothing new             {noop_ms:8.1f} ms")
+        print(f"update after one workout        {incremental_ms:8.1f} ms (recomputed from day {first_day})")
+        print(f"incremental matches rebuild     {matches}")
+        print(f"zone totals, cache cold         {zones_cold_ms:8.1f} ms")
+        print(f"zone totals, cache warm         {zones_warm_ms:8.1f} ms ({totals.sum() / 3600:.0f} h of samples)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Check that a background backup does not add lag to the UI thread.
+
+    python benchmarks/bench_backup.py --workouts 1m
+
+The main thread plays the part of the Tk loop: it wakes every 10 ms and runs
+a small read query, as the dashboard does. Its wake-up lag is measured once
+while idle and once while BackupScheduler copies the database in the
+background.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import database
+import storage
+from backup import BackupScheduler
+from dataset import generate, parse_size
+from lag_monitor import percentile
+
+TICK_S = 0.010
+
+
+def ui_loop(duration_s, stop_event=None):
+    """Simulate the UI thread and return the wake-up lag of each tick in ms."""
+    lags = []
+    end = time.perf_counter() + duration_s
+    while time.perf_counter() < end and not (stop_event and stop_event.is_set()):
+        due = time.perf_counter() + TICK_S
+        time.sleep(TICK_S)
+        lags.append(max(0.0, time.perf_counter() - due) * 1000)
+        database.get_user_profile()
+    return lags
+
+
+def report(label, lags):
+    print(f"{label:18s} ticks={len(lags):5d} p50={percentile(lags, 50):6.2f} ms "
+          f"p95={percentile(lags, 95):6.2f} ms p99={percentile(lags, 99):6.2f} ms max={max(lags):7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure UI lag during a background backup")
+    parser.add_argument("--workouts", type=parse_size, default="1m")
+    parser.add_argument("--db", help="use a copy of an existing database instead of generating one")
+    parser.add_argument("--pages-per-step", type=int, default=256)
+    parser.add_argument("--step-pause", type=float, default=0.005)
+    parser.add_argument("--compress", action="store_true")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="fitness_backup_bench_")
+    try:
+        engine = storage.configure(os.path.join(workdir, 'fitness_tracker.db'))
+        if args.db:
+            shutil.copyfile(args.db, engine.path)
+        else:
+            generate(engine, args.workouts)
+        size_mb = os.path.getsize(engine.path) / 1e6
+
+        report("idle", ui_loop(3.0))
+
+        done = threading.Event()
+        scheduler = BackupScheduler(backup_dir=os.path.join(workdir, "backups"), compress=args.compress,
+                                    pages_per_step=args.pages_per_step, step_pause=args.step_pause,
+                                    on_complete=lambda path: done.set(), on_error=lambda e: done.set())
+        start = time.perf_counter()
+        scheduler.start()
+        lags = ui_loop(600, done)
+        elapsed = time.perf_counter() - start
+        scheduler.stop()
+
+        report("during backup", lags)
+        print(f"Backed up {size_mb:.0f} MB in {elapsed:.1f}s -> {scheduler.last_snapshot}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
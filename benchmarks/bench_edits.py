@@ -0,0 +1,100 @@
+"""Cost of editing and deleting history, and the bulk range delete.
+
+    python benchmarks/bench_edits.py --workouts 1m
+
+Generates a seeded database and times update_workout and delete_workout on
+ordinary workouts and on workouts that hold a personal record (which makes
+the record be recomputed), delete_session, and delete_sessions_between over
+one month, set-based, against deleting the same month's sessions one at a
+time. Afterwards the incrementally kept records are checked against a
+rebuild and the session totals against their workouts.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import database
+import storage
+from dataset import generate, parse_size
+from run_benchmarks import measure
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark workout and session edits and deletes")
+    parser.add_argument("--workouts", type=parse_size, default="1m")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="fitness_edits_bench_")
+    try:
+        engine = storage.configure(os.path.join(workdir, 'fitness_tracker.db'))
+        generate(engine, args.workouts, seed=args.seed)
+        database.create_db()
+        conn = engine.connect()
+        print(f"{args.workouts:,} workouts\n")
+
+        # Ordinary workouts from the most recent sessions, newest first
+        ordinary = iter([row[0] for row in conn.execute('''
+            SELECT id FROM workouts WHERE id NOT IN (SELECT workout_id FROM personal_records)
+            ORDER BY id DESC LIMIT ?
+        ''', (4 * args.repeat,))])
+        cases = [
+            ("update_workout", lambda: database.update_workout(next(ordinary), duration=42.0, notes="edited")),
+            ("delete_workout", lambda: database.delete_workout(next(ordinary))),
+        ]
+        for name, func in cases:
+            print(f"{name:34s} {measure(func, args.repeat)['median_ms']:9.2f} ms")
+
+        def holder(metric):
+            return conn.execute("SELECT workout_id FROM personal_records WHERE metric = ? LIMIT 1",
+                                (metric,)).fetchone()[0]
+        print(f"{'update_workout, record holder':34s} "
+              f"{timed(lambda: database.update_workout(holder('duration'), duration=1.0))[0]:9.2f} ms")
+        print(f"{'delete_workout, record holder':34s} "
+              f"{timed(lambda: database.delete_workout(holder('calories')))[0]:9.2f} ms")
+
+        session_id = conn.execute("SELECT MAX(id) FROM sessions WHERE end_time IS NOT NULL").fetchone()[0]
+        print(f"{'delete_session':34s} {timed(lambda: database.delete_session(session_id))[0]:9.2f} ms")
+
+        end = datetime.now() - timedelta(days=60)
+        months = [((end - timedelta(days=30 * (i + 1))).strftime('%Y-%m-%d'),
+                   (end - timedelta(days=30 * i + 1)).strftime('%Y-%m-%d')) for i in range(2)]
+        bulk_ms, count = timed(lambda: database.delete_sessions_between(*months[0]))
+        print(f"{'delete_sessions_between, 30 days':34s} {bulk_ms:9.2f} ms ({count} sessions)")
+        start, stop = (database.to_epoch_day(day) * 86400 for day in months[1])
+        ids = [row[0] for row in conn.execute('''
+            SELECT id FROM sessions WHERE start_time >= ? AND start_time < ? + 86400 AND deleted_at IS NULL
+        ''', (start, stop))]
+        loop_ms, _ = timed(lambda: [database.delete_session(session_id) for session_id in ids])
+        print(f"{'delete_session per session, 30 days':34s} {loop_ms:9.2f} ms ({len(ids)} sessions)\n")
+
+        kept = database.get_personal_records()
+        database.rebuild_personal_records()
+        print(f"records match rebuild        {kept == database.get_personal_records()}")
+        drift = conn.execute('''
+            SELECT MAX(ABS(s.total_duration - w.duration)) FROM sessions s
+            JOIN (SELECT session_id, SUM(duration) AS duration FROM workouts
+                  WHERE deleted_at IS NULL GROUP BY session_id) w ON w.session_id = s.id
+            WHERE s.deleted_at IS NULL
+        ''').fetchone()[0]
+        print(f"largest session total drift  {drift:.2f} min (generator rounds totals to 0.1)")
+        conn.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Year switches of the activity calendar over a decade of history.
+
+    python benchmarks/bench_heatmap.py --workouts 1m --days 3650
+
+Generates a seeded database spanning --days days, builds the activity
+calendar from scratch and checks it against grouping the workouts by day.
+Then compares showing each year by grouping the workouts table by date
+with reading the year's precomputed arrays (cold, through
+get_activity_calendar) and with a year already held by the
+HeatmapViewModel, and times add_workout including the calendar update.
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+from datetime import date
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import database
+import storage
+from dataset import generate, parse_size
+from run_benchmarks import measure
+from viewmodels import HeatmapViewModel
+
+GROUP_QUERY = '''
+    SELECT date, COUNT(*), SUM(duration), SUM(calories_burned) FROM workouts
+    WHERE user_id = ? AND date BETWEEN ? AND ? AND deleted_at IS NULL
+    GROUP BY date
+'''
+
+
+def year_days(year):
+    """First and last stored day number of a year."""
+    return ((date(year, 1, 1) - database.EPOCH_DATE).days, (date(year, 12, 31) - database.EPOCH_DATE).days)
+
+
+def mismatches(conn, years):
+    """Days whose calendar totals differ from grouping the workouts table."""
+    bad = 0
+    for year in years:
+        arrays = database.get_activity_calendar(year)
+        first, last = year_days(year)
+        for day, count, duration, calories in conn.execute(GROUP_QUERY, (database.DEFAULT_USER_ID, first, last)):
+            slot = day - first
+            if (arrays["workouts"][slot] != count or abs(arrays["duration"][slot] - duration) > 0.5
+                    or abs(arrays["calories"][slot] - calories) > 0.5):
+                bad += 1
+    return bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the activity calendar")
+    parser.add_argument("--workouts", type=parse_size, default="1m")
+    parser.add_argument("--days", type=int, default=3650, help="length of the history in days")
+    parser.add_argument("--adds", type=int, default=500, help="workouts logged after the rebuild")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="fitness_heatmap_bench_")
+    try:
+        engine = storage.configure(os.path.join(workdir, 'fitness_tracker.db'))
+        generate(engine, args.workouts, seed=args.seed, days=args.days)
+        rebuild = measure(database.rebuild_activity_calendar, 3)
+        years = database.get_activity_years()
+        print(f"{args.workouts:,} workouts over {len(years)} years\n")
+        print(f"rebuild calendar               {rebuild['median_ms']:9.1f} ms")
+
+        conn = engine.connect()
+        print(f"days differing from GROUP BY   {mismatches(conn, years):9d}\n")
+
+        def group_all():
+            for year in years:
+                first, last = year_days(year)
+                conn.execute(GROUP_QUERY, (database.DEFAULT_USER_ID, first, last)).fetchall()
+
+        def read_all():
+            for year in years:
+                database.get_activity_calendar(year)
+
+        view = HeatmapViewModel()
+        for year in years:
+            view.load(year)
+
+        def cached_all():
+            for year in years:
+                view.data(year, "duration")
+
+        per_year = len(years)
+        for name, func in (("GROUP BY date", group_all), ("get_activity_calendar", read_all),
+                           ("HeatmapViewModel.data cached", cached_all)):
+            result = measure(func, args.repeat)
+            print(f"{name:30s} {result['median_ms'] / per_year:9.3f} ms per year switch")
+        conn.close()
+
+        rng = random.Random(args.seed)
+        types = database.WORKOUT_TYPES
+        adds = measure(lambda: database.add_workout(rng.choice(types), round(rng.uniform(5, 240), 1),
+                                                    round(rng.uniform(20, 2500), 1), None, "High"), args.adds)
+        print(f"\nadd_workout incl. calendar     {adds['median_ms']:9.3f} ms (median of {adds['runs']})")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Throughput of activity file ingestion (GPX, TCX and FIT-CSV).
+
+    python benchmarks/bench_ingest.py --files 2000 --points 1800
+
+Writes a seeded mix of synthetic activity files (one track point with
+heart rate per second, so --points 1800 is a 30 minute activity), then
+imports them into an empty database with one process and with a process
+pool, and reports files/sec for each. Imports after the first find every
+activity already present, so each run uses a fresh database. Finally one
+very long GPX track is parsed under tracemalloc to show that peak memory
+stays far below what a full ElementTree.parse needs.
+"""
+import argparse
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import database
+import storage
+from activity_import import FIT_EPOCH, import_activity_files, parse_gpx
+
+SPORTS = [("running", "Running", 2.8), ("cycling", "Biking", 7.0), ("walking", "Walking", 1.4)]
+
+
+def track(rng, points, speed):
+    """Yield (time, lat, lon, metres so far, heart rate) for a random walk at roughly speed m/s."""
+    start = datetime(2023, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=rng.randrange(2 * 365 * 24 * 60))
+    lat, lon = 48.0 + rng.random(), 11.0 + rng.random()
+    heading = rng.random() * 2 * math.pi
+    meters = 0.0
+    heart_rate = 120.0
+    for i in range(points):
+        yield start + timedelta(seconds=i), lat, lon, meters, round(heart_rate)
+        heart_rate = min(185.0, max(90.0, heart_rate + rng.uniform(-1.0, 1.1)))
+        heading += rng.uniform(-0.2, 0.2)
+        step = speed * rng.uniform(0.8, 1.2)
+        lat += step * math.cos(heading) / 111320.0
+        lon += step * math.sin(heading) / (111320.0 * math.cos(math.radians(lat)))
+        meters += step
+
+
+def write_gpx(path, rng, points, sport, speed):
+    with open(path, "w") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<gpx version="1.1" creator="bench" xmlns="http://www.topografix.com/GPX/1/1" '
+                'xmlns:gpxtpx="http://www.garmin.com/xmlschemas/TrackPointExtension/v1">\n'
+                f'<trk><name>Activity</name><type>{sport[0]}</type><trkseg>\n')
+        for when, lat, lon, _, heart_rate in track(rng, points, speed):
+            f.write(f'<trkpt lat="{lat:.7f}" lon="{lon:.7f}"><ele>{500 + rng.random() * 5:.1f}</ele>'
+                    f'<time>{when:%Y-%m-%dT%H:%M:%SZ}</time><extensions><gpxtpx:TrackPointExtension>'
+                    f'<gpxtpx:hr>{heart_rate}</gpxtpx:hr></gpxtpx:TrackPointExtension></extensions></trkpt>\n')
+        f.write('</trkseg></trk></gpx>\n')
+
+
+def write_tcx(path, rng, points, sport, speed):
+    rows = list(track(rng, points, speed))
+    start = rows[0][0]
+    with open(path, "w") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<TrainingCenterDatabase xmlns="http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2">\n'
+                f'<Activities><Activity Sport="{sport[1]}"><Id>{start:%Y-%m-%dT%H:%M:%SZ}</Id>\n'
+                f'<Lap StartTime="{start:%Y-%m-%dT%H:%M:%SZ}"><TotalTimeSeconds>{points - 1}</TotalTimeSeconds>'
+                f'<DistanceMeters>{rows[-1][3]:.1f}</DistanceMeters><Calories>{points // 9}</Calories><Track>\n')
+        for when, lat, lon, meters, heart_rate in rows:
+            f.write(f'<Trackpoint><Time>{when:%Y-%m-%dT%H:%M:%SZ}</Time><Position>'
+                    f'<LatitudeDegrees>{lat:.7f}</LatitudeDegrees><LongitudeDegrees>{lon:.7f}</LongitudeDegrees>'
+                    f'</Position><DistanceMeters>{meters:.1f}</DistanceMeters>'
+                    f'<HeartRateBpm><Value>{heart_rate}</Value></HeartRateBpm></Trackpoint>\n')
+        f.write('</Track></Lap></Activity></Activities></TrainingCenterDatabase>\n')
+
+
+def write_fit_csv(path, rng, points, sport, speed):
+    rows = list(track(rng, points, speed))
+    to_fit = lambda when: int((when - FIT_EPOCH).total_seconds())
+    with open(path, "w") as f:
+        f.write("Type,Local Number,Message,Field 1,Value 1,Units 1,Field 2,Value 2,Units 2,"
+                "Field 3,Value 3,Units 3,Field 4,Value 4,Units 4\n")
+        f.write("Definition,0,record,timestamp,1,,position_lat,1,,distance,1,,heart_rate,1,\n")
+        for when, lat, lon, meters, heart_rate in rows:
+            f.write(f'Data,0,record,timestamp,"{to_fit(when)}",s,position_lat,"{int(lat * 2 ** 31 / 180)}",'
+                    f'semicircles,distance,"{meters:.1f}",m,heart_rate,"{heart_rate}",bpm\n')
+        f.write(f'Data,1,session,start_time,"{to_fit(rows[0][0])}",,sport,"{sport[0]}",,'
+                f'total_timer_time,"{points - 1}",s,total_distance,"{rows[-1][3]:.1f}",m\n')
+
+
+WRITERS = [(".gpx", write_gpx), (".tcx", write_tcx), (".csv", write_fit_csv)]
+
+
+def generate_files(directory, count, points, seed):
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        extension, writer = WRITERS[i % len(WRITERS)]
+        sport = rng.choice(SPORTS)
+        path = os.path.join(directory, f"activity_{i:05d}{extension}")
+        writer(path, rng, points, sport, sport[2])
+        paths.append(path)
+    return paths
+
+
+def run_import(workdir, paths, workers, label):
+    storage.configure(os.path.join(workdir, f"ingest_{label}.db"))
+    database.create_db()
+    start = time.perf_counter()
+    summary = import_activity_files(paths, workers=workers)
+    elapsed = time.perf_counter() - start
+    megabytes = sum(os.path.getsize(path) for path in paths) / 1e6
+    print(f"{label:14s} {len(paths) / elapsed:9.1f} files/s {megabytes / elapsed:7.1f} MB/s  "
+          f"imported={summary['imported']} duplicates={summary['duplicates']} failed={len(summary['failed'])}")
+    return summary
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark activity file ingestion")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--points", type=int, default=1800, help="track points per activity")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--long-points", type=int, default=200000, help="track points of the memory check file")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="fitness_ingest_bench_")
+    try:
+        start = time.perf_counter()
+        paths = generate_files(workdir, args.files, args.points, args.seed)
+        print(f"generated {len(paths)} files ({args.points} points each) in {time.perf_counter() - start:.1f} s")
+
+        run_import(workdir, paths, 1, "1 process")
+        if args.workers > 1:
+            run_import(workdir, paths, args.workers, f"{args.workers} processes")
+
+        long_path = os.path.join(workdir, "long.gpx")
+        write_gpx(long_path, random.Random(args.seed), args.long_points, SPORTS[0], SPORTS[0][2])
+        size_mb = os.path.getsize(long_path) / 1e6
+        print(f"\n{size_mb:.1f} MB GPX, {args.long_points} points, peak traced memory:")
+        print(f"  iterparse (parse_gpx)  {peak_memory(lambda: parse_gpx(long_path)):8.1f} MB")
+        print(f"  ElementTree.parse      {peak_memory(lambda: ET.parse(long_path)):8.1f} MB")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Load test for a shared kiosk: many members logging workouts at once.
+
+    python benchmarks/bench_kiosk.py --users 50 --interval 3 --duration 30
+    python benchmarks/bench_kiosk.py --users 50 --interval 0.05 --duration 30
+
+Every simulated member starts a session, logs a workout every few seconds
+(uniformly between 0.5x and 1.5x --interval) and starts a new session after
+every few workouts, while one extra thread refreshes the dashboard once a
+second. The run is repeated with per-call connections (Session without a
+writer) and with the shared DatabaseWriter, and reports write latency,
+throughput, dashboard latency and errors for both.
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import database
+import storage
+from dataset import generate, parse_size
+from db_writer import DatabaseWriter
+from lag_monitor import percentile
+from session import Session, SessionRegistry
+from workout import Workout
+
+WORKOUTS_PER_SESSION = 4
+
+
+def member(user_id, registry, args, stop, latencies, errors, seed):
+    rng = random.Random(seed)
+    logged = 0
+    while not stop.is_set():
+        if stop.wait(args.interval * rng.uniform(0.5, 1.5)):
+            break
+        start = time.perf_counter()
+        try:
+            if not registry.get(user_id).is_active:
+                registry.start(user_id)
+            registry.add_workout(user_id, Workout("Running", 30, 300, intensity="High"))
+            logged += 1
+            if logged % WORKOUTS_PER_SESSION == 0:
+                registry.end(user_id)
+            latencies.append((time.perf_counter() - start) * 1000)
+        except Exception as e:
+            errors.append(str(e))
+
+
+def dashboard(stop, latencies):
+    month_ago = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+    while not stop.wait(1.0):
+        start = time.perf_counter()
+        database.get_sessions(month_ago, user_id=database.DEFAULT_USER_ID)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+def run(label, use_writer, user_ids, args):
+    writer = DatabaseWriter() if use_writer else None
+    if writer:
+        writer.start()
+    registry = SessionRegistry(writer)
+
+    # Session.add_workout reports failures by returning False, so count those too
+    original_add = Session.add_workout
+    errors = []
+
+    def checked_add(session, workout):
+        if not original_add(session, workout):
+            raise RuntimeError("add_workout failed")
+        return True
+
+    Session.add_workout = checked_add
+    stop = threading.Event()
+    latencies = []
+    dashboard_latencies = []
+    threads = [threading.Thread(target=member, args=(user_id, registry, args, stop, latencies, errors, user_id))
+               for user_id in user_ids]
+    threads.append(threading.Thread(target=dashboard, args=(stop, dashboard_latencies)))
+    try:
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(args.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        for session in registry.active().values():
+            session.end()
+    finally:
+        Session.add_workout = original_add
+        if writer:
+            writer.stop()
+
+    print(f"\n{label}")
+    if latencies:
+        print(f"  workouts logged  {len(latencies):6d} ({len(latencies) / elapsed:.1f}/s)")
+        print(f"  log latency      p50={percentile(latencies, 50):7.2f} ms  p95={percentile(latencies, 95):7.2f} ms  "
+              f"p99={percentile(latencies, 99):7.2f} ms  max={max(latencies):8.2f} ms")
+    if dashboard_latencies:
+        print(f"  dashboard read   p50={percentile(dashboard_latencies, 50):7.2f} ms  "
+              f"max={max(dashboard_latencies):8.2f} ms")
+    print(f"  errors           {len(errors)}" + (f" (first: {errors[0]})" if errors else ""))
+    if writer and writer.batches:
+        print(f"  commits          {writer.batches} ({writer.writes / writer.batches:.1f} writes per commit)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate many members logging workouts at once")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=3.0, help="average seconds between workouts per member")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run each mode")
+    parser.add_argument("--workouts", type=parse_size, default="100k", help="size of the existing history")
+    parser.add_argument("--mode", choices=["direct", "writer", "both"], default="both")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="fitness_kiosk_bench_")
+    try:
+        engine = storage.configure(os.path.join(workdir, 'fitness_tracker.db'))
+        generate(engine, args.workouts)
+        user_ids = [database.DEFAULT_USER_ID] + [database.add_user_profile(f"Member {i}")
+                                                 for i in range(2, args.users + 1)]
+        print(f"{args.users} members, one workout every ~{args.interval:g}s each, {args.duration:g}s per mode")
+
+        if args.mode in ("direct", "both"):
+            run("per-call connections", False, user_ids, args)
+        if args.mode in ("writer", "both"):
+            run("shared DatabaseWriter", True, user_ids, args)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
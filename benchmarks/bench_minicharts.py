@@ -0,0 +1,85 @@
+"""Render and update cost of the dashboard's Canvas mini-charts.
+
+    python benchmarks/bench_minicharts.py --repeat 1000
+
+Times the geometry of a 30 day sparkline, a 7 bar chart and a progress ring
+update. With a display (or under xvfb-run) it also creates each widget and
+times set_values/set_value followed by update_idletasks, i.e. until Tk has
+redrawn it, for the first render and for in-place refreshes. The target is
+under 2 ms per widget.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from lag_monitor import percentile
+from minicharts import MiniBars, ProgressRing, Sparkline, bar_rects, sparkline_points
+
+
+def report(name, timings):
+    print(f"{name:34s} p50 {percentile(timings, 50) * 1000:8.1f} us  p95 {percentile(timings, 95) * 1000:8.1f} us  "
+          f"max {max(timings) * 1000:8.1f} us")
+
+
+def timed(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Canvas mini-charts")
+    parser.add_argument("--repeat", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    def series(days):
+        return [rng.choice([0.0, rng.uniform(100, 900)]) for _ in range(days)]
+
+    report("sparkline geometry (30 days)", timed(lambda: sparkline_points(series(30), 160, 36), args.repeat))
+    report("bar geometry (7 days)", timed(lambda: bar_rects(series(7), 120, 36), args.repeat))
+
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:
+        print(f"\nNo display ({e}); skipping the Tk render timings")
+        return
+
+    root.update()
+    widgets = {
+        "sparkline": (lambda: Sparkline(root), lambda w: w.set_values(series(30))),
+        "bars": (lambda: MiniBars(root, width=120, height=36), lambda w: w.set_values(series(7), target=500)),
+        "ring": (lambda: ProgressRing(root), lambda w: w.set_value(rng.uniform(0, 100))),
+    }
+    for name, (create, refresh) in widgets.items():
+        def first_render():
+            widget = create()
+            widget.pack()
+            refresh(widget)
+            root.update_idletasks()
+            widget.destroy()
+        report(f"{name} create + first render", timed(first_render, min(args.repeat, 200)))
+
+        widget = create()
+        widget.pack()
+        root.update()
+
+        def in_place():
+            refresh(widget)
+            root.update_idletasks()
+        report(f"{name} in-place refresh", timed(in_place, args.repeat))
+        widget.destroy()
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
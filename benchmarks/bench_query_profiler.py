@@ -0,0 +1,98 @@
+"""Measure the overhead of the query profiler on the database module.
+
+Run from the project root:
+
+    python benchmarks/bench_query_profiler.py
+
+The profiler must cost next to nothing while disabled; the script exits with
+a non-zero status when the disabled overhead exceeds MAX_DISABLED_OVERHEAD.
+"""
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import database
+import storage
+from query_profiler import profiler
+
+REPEAT = 25
+NUMBER = 400
+MAX_DISABLED_OVERHEAD = 0.05  # 5%
+
+
+def seed(workouts=200):
+    """Fill the benchmark database with a handful of sessions."""
+    session_id = database.add_session('2024-01-01 08:00:00', None, 0, 0)
+    conn = database.get_connection()
+    conn.executemany('''
+        INSERT INTO workouts (type_id, duration, calories_burned, session_id, date, notes, intensity_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', [(1, 30, 300, session_id, database.to_epoch_day('2024-01-01'), "", 2)] * workouts)
+    conn.commit()
+    conn.close()
+    return session_id
+
+
+def unprofiled_session_details(session_id):
+    """database.get_session_details on plain engine connections, bypassing the profiler entirely.
+
+    Running the real function keeps the baseline in step with it (e.g. the
+    archive partition lookup), so the comparison measures only the profiler.
+    """
+    get_connection = database.get_connection
+    database.get_connection = storage.get_engine().connect
+    try:
+        return database.get_session_details(session_id)
+    finally:
+        database.get_connection = get_connection
+
+
+def best(*stmts):
+    """Best per-call time of each statement in microseconds.
+
+    The repeats are interleaved so cache warm-up and machine noise hit every
+    statement alike instead of whichever runs first.
+    """
+    timings = [[] for _ in stmts]
+    for _ in range(REPEAT):
+        for stmt, runs in zip(stmts, timings):
+            runs.append(timeit.timeit(stmt, number=NUMBER))
+    return [min(runs) / NUMBER * 1e6 for runs in timings]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        storage.configure(os.path.join(tmp, 'fitness_tracker.db'))
+        database.create_db()
+        session_id = seed()
+
+        profiler.configure(slow_query_ms=1e9)
+
+        def profiled_session_details():
+            profiler.configure(enabled=True)
+            try:
+                return database.get_session_details(session_id)
+            finally:
+                profiler.configure(enabled=False)
+
+        profiler.configure(enabled=False)
+        baseline, disabled, enabled = best(lambda: unprofiled_session_details(session_id),
+                                           lambda: database.get_session_details(session_id),
+                                           profiled_session_details)
+
+    disabled_overhead = disabled / baseline - 1
+    print(f"without profiler:   {baseline:8.2f} us/call")
+    print(f"profiler disabled:  {disabled:8.2f} us/call ({disabled_overhead:+.1%})")
+    print(f"profiler enabled:   {enabled:8.2f} us/call ({enabled / baseline - 1:+.1%})")
+
+    if disabled_overhead > MAX_DISABLED_OVERHEAD:
+        print(f"FAIL: disabled overhead above {MAX_DISABLED_OVERHEAD:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""Personal record maintenance and lookup on a large history.
+
+    python benchmarks/bench_records.py --workouts 1m
+
+Generates a seeded database, rebuilds the personal records from scratch
+with the windowed query, then logs --adds workouts through add_workout
+(each one updating the records) and checks that the incrementally kept
+records match a fresh rebuild. Finally compares reading the records with
+answering "longest workout per type" by scanning the workouts table.
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import database
+import storage
+from dataset import generate, parse_size
+from run_benchmarks import measure
+
+SCAN_QUERY = '''
+    SELECT type_id, MAX(duration), MAX(calories_burned) FROM workouts WHERE user_id = ? GROUP BY type_id
+'''
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark personal record maintenance")
+    parser.add_argument("--workouts", type=parse_size, default="1m")
+    parser.add_argument("--adds", type=int, default=500, help="workouts logged after the rebuild")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="fitness_records_bench_")
+    try:
+        engine = storage.configure(os.path.join(workdir, 'fitness_tracker.db'))
+        generate(engine, args.workouts, seed=args.seed)
+        print(f"{args.workouts:,} workouts\n")
+
+        rebuild = measure(database.rebuild_personal_records, 3)
+        print(f"rebuild (windowed query)     {rebuild['median_ms']:9.1f} ms")
+
+        rng = random.Random(args.seed)
+        types = database.WORKOUT_TYPES
+        adds = measure(lambda: database.add_workout(rng.choice(types), round(rng.uniform(5, 240), 1),
+                                                    round(rng.uniform(20, 2500), 1), None, "High"), args.adds)
+        print(f"add_workout incl. records    {adds['median_ms']:9.3f} ms (median of {adds['runs']})")
+
+        kept = database.get_personal_records()
+        database.rebuild_personal_records()
+        print(f"incremental matches rebuild  {kept == database.get_personal_records()}\n")
+
+        conn = engine.connect()
+        scan = measure(lambda: conn.execute(SCAN_QUERY, (database.DEFAULT_USER_ID,)).fetchall(), args.repeat)
+        conn.close()
+        lookup = measure(database.get_personal_records, args.repeat)
+        print(f"records by scanning workouts {scan['median_ms']:9.3f} ms")
+        print(f"get_personal_records         {lookup['median_ms']:9.3f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Read latency of statistics and history with and without the analytics replica.
+
+    python benchmarks/bench_replica.py --workouts 1m --staleness 5
+
+Generates a seeded database and times get_stats_by_workout_type,
+get_trends and get_sessions reading the file directly and reading the
+in-memory replica, first with nothing else running and then while a
+writer thread logs a workout every --write-interval seconds. Under load
+the replica refreshes in the background; the report includes how often
+and how long each copy took.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import database
+import storage
+from dataset import generate, parse_size
+from lag_monitor import percentile
+from replica import replica
+from run_benchmarks import measure
+
+
+def read_cases():
+    today = datetime.now()
+    month_ago = (today - timedelta(days=30)).strftime('%Y-%m-%d')
+    today_str = today.strftime('%Y-%m-%d')
+    return {
+        "get_stats_by_workout_type[all]": database.get_stats_by_workout_type,
+        "get_stats_by_workout_type[30d]": lambda: database.get_stats_by_workout_type(month_ago, today_str),
+        "get_trends[30d]": database.get_trends,
+        "get_sessions[30d]": lambda: database.get_sessions(month_ago, today_str),
+    }
+
+
+def writer(stop, interval, errors):
+    while not stop.wait(interval):
+        try:
+            database.add_workout("Running", 30, 300, None, "High")
+        except Exception as e:
+            errors.append(str(e))
+
+
+def under_load(cases, seconds, interval):
+    """Run the read cases in turn for seconds while a writer logs workouts; return latencies per case."""
+    stop = threading.Event()
+    errors = []
+    thread = threading.Thread(target=writer, args=(stop, interval, errors), daemon=True)
+    thread.start()
+    latencies = {name: [] for name in cases}
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for name, func in cases.items():
+            start = time.perf_counter()
+            func()
+            latencies[name].append((time.perf_counter() - start) * 1000)
+    stop.set()
+    thread.join()
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the in-memory analytics replica")
+    parser.add_argument("--workouts", type=parse_size, default="1m")
+    parser.add_argument("--staleness", type=float, default=5.0, help="max_staleness of the replica in seconds")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of reads under write load per mode")
+    parser.add_argument("--write-interval", type=float, default=0.02, help="seconds between logged workouts")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="fitness_replica_bench_")
+    try:
+        engine = storage.configure(os.path.join(workdir, 'fitness_tracker.db'))
+        generate(engine, args.workouts, seed=args.seed)
+        cases = read_cases()
+        print(f"{args.workouts:,} workouts, {os.path.getsize(engine.path) / 1e6:.0f} MB\n")
+
+        idle = {"file": {}, "replica": {}}
+        for name, func in cases.items():
+            idle["file"][name] = measure(func, args.repeat)
+        replica.configure(enabled=True, max_staleness=args.staleness)
+        start = time.perf_counter()
+        replica.refresh()
+        print(f"initial copy {(time.perf_counter() - start) * 1000:8.1f} ms\n")
+        for name, func in cases.items():
+            idle["replica"][name] = measure(func, args.repeat)
+        replica.configure(enabled=False)
+
+        print(f"{'idle, median':34s} {'file':>10s} {'replica':>10s}")
+        for name in cases:
+            print(f"{name:34s} {idle['file'][name]['median_ms']:8.2f}ms "
+                  f"{idle['replica'][name]['median_ms']:8.2f}ms")
+
+        loaded = {}
+        loaded["file"], file_errors = under_load(cases, args.duration, args.write_interval)
+        replica.configure(enabled=True, max_staleness=args.staleness)
+        replica.refresh()
+        refreshes = replica.refreshes
+        replica.start()
+        loaded["replica"], replica_errors = under_load(cases, args.duration, args.write_interval)
+        refreshes = replica.refreshes - refreshes
+        last_refresh_ms = replica.last_refresh_ms
+        replica.configure(enabled=False)
+
+        print(f"\n{'under write load, p50 / p99':34s} {'file':>19s} {'replica':>19s}")
+        for name in cases:
+            file_ms, replica_ms = loaded["file"][name], loaded["replica"][name]
+            print(f"{name:34s} {percentile(file_ms, 50):8.2f} / {percentile(file_ms, 99):7.2f}ms "
+                  f"{percentile(replica_ms, 50):8.2f} / {percentile(replica_ms, 99):7.2f}ms")
+        print(f"\nreplica refreshes under load: {refreshes} in {args.duration:g}s, "
+              f"last copy {last_refresh_ms:.1f} ms (max staleness {args.staleness:g}s)")
+        print(f"writer errors: file {len(file_errors)}, replica {len(replica_errors)}")
+    finally:
+        replica.configure(enabled=False)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
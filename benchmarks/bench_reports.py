@@ -0,0 +1,86 @@
+"""Throughput of headless report rendering, in one process and across a process pool.
+
+    python benchmarks/bench_reports.py --workouts 100k --reports 48 --format png --workers 1,2,4
+
+Generates a seeded database, then times one report in this process: the
+queries alone, drawing with a new ReportRenderer (figure, axes and canvas)
+per report, and drawing on one reused, warmed-up renderer. Finally renders
+--reports reports (cycling through the report periods) with each pool size
+in --workers and prints reports/minute, including pool start-up and worker
+warm-up, and the speedup and per-worker efficiency against one worker.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import database
+import storage
+from dataset import generate, parse_size
+from reports import REPORT_FORMATS, REPORT_PERIODS, ReportRenderer, render_reports, report_data
+from run_benchmarks import measure
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark headless report rendering")
+    parser.add_argument("--workouts", type=parse_size, default="100k")
+    parser.add_argument("--days", type=int, default=365, help="length of the history in days")
+    parser.add_argument("--reports", type=int, default=48, help="reports rendered per pool size")
+    parser.add_argument("--format", choices=REPORT_FORMATS, default="png")
+    parser.add_argument("--workers", default=None,
+                        help="comma separated pool sizes (default: 1, 2, 4, ... up to the CPU count)")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    if args.workers:
+        pool_sizes = [int(size) for size in args.workers.split(",")]
+    else:
+        pool_sizes = [1]
+        while pool_sizes[-1] * 2 <= cpus:
+            pool_sizes.append(pool_sizes[-1] * 2)
+        if pool_sizes[-1] != cpus:
+            pool_sizes.append(cpus)
+
+    workdir = tempfile.mkdtemp(prefix="fitness_reports_bench_")
+    try:
+        engine = storage.configure(os.path.join(workdir, 'fitness_tracker.db'))
+        generate(engine, args.workouts, seed=args.seed, days=args.days)
+        database.create_db()
+        output = os.path.join(workdir, "reports")
+        os.makedirs(output)
+        path = os.path.join(output, f"single.{args.format}")
+        print(f"{args.workouts:,} workouts, {args.format} reports, {cpus} CPU(s)\n")
+
+        data = measure(lambda: report_data(database.DEFAULT_USER_ID, "Month"), args.repeat)
+        report = report_data(database.DEFAULT_USER_ID, "Month")
+        fresh = measure(lambda: ReportRenderer().save(report, args.format, path), args.repeat)
+        renderer = ReportRenderer()
+        renderer.warm_up()
+        reused = measure(lambda: renderer.save(report, args.format, path), args.repeat)
+        print(f"report queries                 {data['median_ms']:9.1f} ms")
+        print(f"draw, new renderer per report  {fresh['median_ms']:9.1f} ms")
+        print(f"draw, reused warm renderer     {reused['median_ms']:9.1f} ms\n")
+
+        periods = list(REPORT_PERIODS)
+        jobs = [(database.DEFAULT_USER_ID, periods[i % len(periods)], args.format,
+                 os.path.join(output, f"report{i}.{args.format}")) for i in range(args.reports)]
+        baseline = None
+        for workers in pool_sizes:
+            paths, seconds = render_reports(jobs, workers=workers)
+            rate = len(paths) / seconds * 60
+            baseline = baseline or rate
+            print(f"{workers:3d} worker(s)  {rate:8.0f} reports/minute  speedup {rate / baseline:5.2f}x  "
+                  f"efficiency {rate / baseline / workers:4.0%}  ({seconds:.1f} s)")
+        if max(pool_sizes) > cpus:
+            print(f"\nPools larger than the {cpus} CPU(s) of this machine cannot scale further")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
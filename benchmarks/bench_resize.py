@@ -0,0 +1,148 @@
+"""Scripted continuous window resize, with the old <Configure> handler and with the ResizeManager.
+
+    python benchmarks/bench_resize.py --steps 200 --step-ms 8
+
+Needs a display (run under xvfb-run on a headless machine). Builds a window
+shaped like the app's (a notebook with a few hundred labels, a 2,000 row
+history Treeview and, when matplotlib is installed, a bar chart canvas),
+then grows and shrinks it one step every --step-ms ms. Reports how many
+<Configure> events reached the root binding, how many layout passes and
+chart re-rasterizations they caused, the frame lag of the layout passes and
+the event-loop lag measured by the LagMonitor heartbeat during the resize.
+"""
+import argparse
+import os
+import sys
+import time
+import tkinter as tk
+from tkinter import ttk
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from lag_monitor import LagMonitor
+from resize import ResizeManager
+
+try:
+    import matplotlib
+    matplotlib.use("TkAgg")
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+except ImportError:
+    plt = None
+
+
+def build_window(root, rows):
+    notebook = ttk.Notebook(root)
+    notebook.pack(fill=tk.BOTH, expand=True)
+    dashboard = ttk.Frame(notebook)
+    history = ttk.Frame(notebook)
+    notebook.add(dashboard, text="Dashboard")
+    notebook.add(history, text="History")
+
+    for i in range(300):
+        ttk.Label(dashboard, text=f"Label {i}").grid(row=i // 10, column=i % 10, sticky=tk.W)
+
+    tree = ttk.Treeview(history, columns=('session_id', 'date', 'duration', 'calories', 'workouts'), show='headings')
+    for i in range(rows):
+        tree.insert('', tk.END, values=(i, "2024-01-01 10:00:00", "45.0", "300.0", "Running, Cycling"))
+    tree.pack(fill=tk.BOTH, expand=True)
+
+    canvas = None
+    if plt is not None:
+        chart_frame = ttk.Frame(dashboard)
+        chart_frame.grid(row=40, column=0, columnspan=10, sticky=tk.NSEW)
+        fig = plt.Figure(figsize=(10, 6), dpi=100, tight_layout=True)
+        ax = fig.add_subplot(111)
+        ax.bar([f"Type {i}" for i in range(12)], range(12))
+        canvas = FigureCanvasTkAgg(fig, master=chart_frame)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    return tree, canvas
+
+
+def run(mode, steps, step_ms, rows):
+    root = tk.Tk()
+    root.geometry("800x600+0+0")
+    tree, canvas = build_window(root, rows)
+    counts = {"events": 0, "layouts": 0, "chart_redraws": 0}
+
+    if canvas is not None:
+        resize = canvas.resize
+
+        def counted_resize(event):
+            counts["chart_redraws"] += 1
+            resize(event)
+        canvas.get_tk_widget().bind("<Configure>", counted_resize)
+
+    def layout(width, height):
+        counts["layouts"] += 1
+        tree.column('workouts', width=max(200, width - 500))
+
+    manager = None
+    if mode == "old":
+        size = [None, None]
+
+        # The handler the app used before: compares widgets with ==, lays out on every change
+        def on_configure(event):
+            counts["events"] += 1
+            if event.widget == root and size != [event.width, event.height]:
+                size[:] = [event.width, event.height]
+                layout(event.width, event.height)
+        root.bind("<Configure>", on_configure)
+    else:
+        manager = ResizeManager(root)
+        manager.on_settle(layout)
+        root.bind("<Configure>", manager.on_configure)
+        if canvas is not None:
+            manager.defer_canvas(canvas.get_tk_widget(), counted_resize)
+
+    root.update()
+    for key in counts:
+        counts[key] = 0
+    monitor = LagMonitor(root, interval_ms=16)
+    monitor.start()
+
+    sizes = [(800 + 4 * i, 600 + 3 * i) for i in range(steps // 2)]
+    sizes += sizes[::-1]
+    start = time.perf_counter()
+
+    def step(i=0):
+        if i < len(sizes):
+            root.geometry(f"{sizes[i][0]}x{sizes[i][1]}")
+            root.after(step_ms, step, i + 1)
+        else:
+            # Let the resize settle before stopping
+            root.after(500, root.quit)
+
+    root.after(0, step)
+    root.mainloop()
+    elapsed = time.perf_counter() - start
+    monitor.stop()
+    lag = monitor.summary()
+    if manager is not None:
+        stats = manager.stats()
+        counts["events"] = stats["events"]
+        frame_lag = f", frame lag p95 {stats['frame_lag_p95_ms']:.1f} ms"
+    else:
+        frame_lag = ""
+    root.destroy()
+    print(f"{mode:8s} {counts['events']:7d} events, {counts['layouts']:4d} layout passes, "
+          f"{counts['chart_redraws']:4d} chart redraws, loop lag p50 {lag['p50_ms']:.1f} / p95 {lag['p95_ms']:.1f} / "
+          f"max {lag['max_ms']:.1f} ms{frame_lag} ({elapsed:.1f} s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark window resize handling")
+    parser.add_argument("--steps", type=int, default=200, help="geometry changes in the scripted resize")
+    parser.add_argument("--step-ms", type=int, default=8, help="ms between geometry changes")
+    parser.add_argument("--rows", type=int, default=2000, help="rows in the history Treeview")
+    args = parser.parse_args()
+
+    if plt is None:
+        print("matplotlib is not installed; measuring without the chart canvas\n")
+    for mode in ("old", "managed"):
+        run(mode, args.steps, args.step_ms, args.rows)
+
+
+if __name__ == "__main__":
+    main()
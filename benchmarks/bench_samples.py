@@ -0,0 +1,110 @@
+"""Size and decode speed of the workout sample store.
+
+    python benchmarks/bench_samples.py --rides 200
+
+Stores --rides synthetic 2 hour rides with 1 Hz heart rate, pace and power
+streams through samples.save_samples, and the same samples as one row per
+sample in a plain table of a second database. Both files are vacuumed and
+the script prints the bytes per sample of each, then the median time to
+decode every stream of one ride and to read a 10 minute range of one
+stream.
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import database
+import storage
+from run_benchmarks import measure
+from samples import STREAMS, read_all_samples, read_samples, save_samples
+
+RIDE_SECONDS = 2 * 3600
+
+
+def ride(rng):
+    """Plausible 1 Hz streams of a 2 hour ride: slow heart rate drift, noisy power and pace."""
+    times = np.arange(RIDE_SECONDS)
+    heart_rate = np.clip(135 + np.cumsum(rng.integers(-1, 2, RIDE_SECONDS)) * 0.3, 90, 190)
+    effort = np.convolve(rng.normal(0, 1, RIDE_SECONDS), np.ones(30) / 30, mode="same")
+    power = np.clip(210 + 120 * effort + rng.normal(0, 15, RIDE_SECONDS), 0, None)
+    speed = np.clip(8.0 + 4.0 * effort + rng.normal(0, 0.3, RIDE_SECONDS), 1.0, None)
+    pace = 1000.0 / speed
+    # A few dropouts, as sensors do
+    power[rng.integers(0, RIDE_SECONDS, 20)] = np.nan
+    return {"heart_rate": (times, heart_rate), "pace": (times, pace), "power": (times, power)}
+
+
+def file_size(path):
+    conn = sqlite3.connect(path)
+    conn.execute("VACUUM")
+    conn.close()
+    return os.path.getsize(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the workout sample store")
+    parser.add_argument("--rides", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="fitness_samples_bench_")
+    try:
+        rng = np.random.default_rng(args.seed)
+        engine = storage.configure(os.path.join(workdir, 'fitness_tracker.db'))
+        database.create_db()
+        empty_size = file_size(engine.path)
+
+        rows_path = os.path.join(workdir, 'rows.db')
+        rows = sqlite3.connect(rows_path)
+        rows.execute('''
+            CREATE TABLE samples (workout_id INTEGER, stream INTEGER, time INTEGER, value INTEGER,
+                                  PRIMARY KEY (workout_id, stream, time))
+        ''')
+        rows_empty = file_size(rows_path)
+
+        total = 0
+        for workout_id in range(1, args.rides + 1):
+            streams = ride(rng)
+            save_samples(workout_id, streams)
+            for name, (times, values) in streams.items():
+                keep = ~np.isnan(values)
+                total += int(keep.sum())
+                rows.executemany("INSERT INTO samples VALUES (?, ?, ?, ?)",
+                                 zip([workout_id] * int(keep.sum()), [STREAMS[name]] * int(keep.sum()),
+                                     times[keep].tolist(), np.rint(values[keep]).astype(int).tolist()))
+        rows.commit()
+        rows.close()
+
+        chunked = file_size(engine.path) - empty_size
+        per_row = file_size(rows_path) - rows_empty
+        print(f"{args.rides} rides, {total:,} samples")
+        print(f"one row per sample  {per_row / 1e6:8.1f} MB  {per_row / total:6.2f} bytes/sample")
+        print(f"chunked store       {chunked / 1e6:8.1f} MB  {chunked / total:6.2f} bytes/sample\n")
+
+        workout_id = args.rides // 2
+        expected = ride(np.random.default_rng(args.seed))  # regenerate ride 1 to check the round trip
+        times, values = read_samples(1, "heart_rate")
+        assert np.array_equal(times, expected["heart_rate"][0])
+        assert np.array_equal(values, np.rint(expected["heart_rate"][1]))
+
+        cases = [
+            ("decode 2h ride, 3 streams", lambda: read_all_samples(workout_id)),
+            ("decode 2h ride, power", lambda: read_samples(workout_id, "power")),
+            ("read 10 min of power", lambda: read_samples(workout_id, "power", 3600, 4200)),
+        ]
+        for name, func in cases:
+            print(f"{name:28s} {measure(func, args.repeat)['median_ms']:7.3f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
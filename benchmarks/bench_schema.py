@@ -0,0 +1,200 @@
+"""Compare the text-column schema with the integer/lookup-table schema.
+
+    python benchmarks/bench_schema.py --workouts 1m
+
+A seeded database is generated, rewritten into the old layout (text
+timestamps and dates, workout type and intensity names on every row, the
+same indexes on the text columns), and then converted back with
+database.migrate_database(). Both files are vacuumed before measuring. The
+script prints the on-disk size of each, the migration time, and the median
+time of the old queries against the database.py API on the new layout,
+after checking that both return the same rows.
+"""
+import argparse
+import math
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import database
+import storage
+from dataset import generate, parse_size
+from run_benchmarks import measure
+
+LEGACY_TABLES = '''
+    CREATE TABLE legacy_workouts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        workout_type TEXT NOT NULL,
+        duration REAL NOT NULL,
+        calories_burned REAL NOT NULL,
+        session_id INTEGER,
+        date TEXT NOT NULL,
+        notes TEXT,
+        intensity TEXT DEFAULT 'Medium',
+        calories_estimated INTEGER DEFAULT 0,
+        FOREIGN KEY (session_id) REFERENCES sessions (id)
+    );
+    CREATE TABLE legacy_sessions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        start_time TEXT NOT NULL,
+        end_time TEXT,
+        total_duration REAL,
+        total_calories REAL,
+        notes TEXT,
+        rating INTEGER
+    );
+'''
+
+# The queries database.py ran against the text layout
+LEGACY_SESSIONS = '''
+    SELECT id, start_time, end_time, total_duration, total_calories, notes, rating
+    FROM sessions WHERE start_time BETWEEN ? AND ? ORDER BY start_time DESC
+'''
+LEGACY_ALL_SESSIONS = '''
+    SELECT id, start_time, end_time, total_duration, total_calories, notes, rating
+    FROM sessions ORDER BY start_time DESC
+'''
+LEGACY_STATS = '''
+    SELECT workout_type, COUNT(*) as count, SUM(duration) as total_duration, AVG(duration) as avg_duration,
+           SUM(calories_burned) as total_calories, AVG(calories_burned) as avg_calories,
+           AVG(CASE WHEN intensity = 'High' THEN 3 WHEN intensity = 'Medium' THEN 2 ELSE 1 END) as avg_intensity
+    FROM workouts {where}
+    GROUP BY workout_type ORDER BY total_duration DESC
+'''
+LEGACY_TRENDS = '''
+    SELECT date, COUNT(*) as workout_count, SUM(duration) as total_duration, SUM(calories_burned) as total_calories
+    FROM workouts WHERE date BETWEEN ? AND ? GROUP BY date ORDER BY date ASC
+'''
+LEGACY_DETAILS = '''
+    SELECT workout_type, duration, calories_burned, intensity, notes, id FROM workouts WHERE session_id = ?
+'''
+
+
+def build_legacy(path):
+    """Rewrite the history tables of a generated database into the text layout."""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.executescript(LEGACY_TABLES)
+    conn.executescript('''
+        BEGIN;
+        INSERT INTO legacy_sessions
+        SELECT id, strftime('%Y-%m-%d %H:%M:%S', start_time, 'unixepoch'),
+               strftime('%Y-%m-%d %H:%M:%S', end_time, 'unixepoch'), total_duration, total_calories, notes, rating
+        FROM sessions;
+        INSERT INTO legacy_workouts
+        SELECT w.id, t.name, w.duration, w.calories_burned, w.session_id, date(w.date * 86400, 'unixepoch'),
+               w.notes, i.name, w.calories_estimated
+        FROM workouts w JOIN workout_types t ON t.id = w.type_id JOIN intensities i ON i.id = w.intensity_id;
+        DROP TABLE workouts;
+        DROP TABLE sessions;
+        DROP TABLE workout_types;
+        DROP TABLE intensities;
+        ALTER TABLE legacy_sessions RENAME TO sessions;
+        ALTER TABLE legacy_workouts RENAME TO workouts;
+        CREATE INDEX idx_sessions_start_time ON sessions (start_time);
+        CREATE INDEX idx_workouts_date ON workouts (date);
+        CREATE INDEX idx_workouts_session_id ON workouts (session_id);
+        COMMIT;
+    ''')
+    conn.execute("VACUUM")
+    conn.close()
+
+
+def legacy_query(path, sql, params=()):
+    """Run an old query the way database.py did, partition registry lookup included."""
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    database.archive_partitions_for(cursor)
+    rows = cursor.execute(sql, params).fetchall()
+    conn.close()
+    return rows
+
+
+def same_rows(a, b):
+    """Rows match, allowing for floating point differences in sums and averages."""
+    if len(a) != len(b):
+        return False
+    for row_a, row_b in zip(a, b):
+        for x, y in zip(row_a, row_b):
+            if isinstance(x, float) or isinstance(y, float):
+                if not math.isclose(x, y, rel_tol=1e-9, abs_tol=1e-6):
+                    return False
+            elif x != y:
+                return False
+    return True
+
+
+def describe(path):
+    conn = sqlite3.connect(path)
+    pages, = conn.execute("PRAGMA page_count").fetchone()
+    conn.close()
+    return f"{os.path.getsize(path) / 1e6:8.1f} MB ({pages} pages)"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare text and integer history schemas")
+    parser.add_argument("--workouts", type=parse_size, default="1m")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="fitness_schema_bench_")
+    try:
+        legacy_path = os.path.join(workdir, 'legacy.db')
+        generate(legacy_path, args.workouts, seed=args.seed)
+        build_legacy(legacy_path)
+
+        engine = storage.configure(os.path.join(workdir, 'fitness_tracker.db'))
+        shutil.copyfile(legacy_path, engine.path)
+        start = time.perf_counter()
+        database.migrate_database()
+        migrate_s = time.perf_counter() - start
+
+        print(f"\nworkouts: {args.workouts:,}")
+        print(f"text schema     {describe(legacy_path)}")
+        print(f"integer schema  {describe(engine.path)}")
+        print(f"migration       {migrate_s:8.1f} s\n")
+
+        today = datetime.now()
+        month_ago = (today - timedelta(days=30)).strftime('%Y-%m-%d')
+        year_ago = (today - timedelta(days=365)).strftime('%Y-%m-%d')
+        today_str = today.strftime('%Y-%m-%d')
+        session_id, = legacy_query(legacy_path, "SELECT MAX(id) / 2 FROM sessions")[0]
+
+        cases = [
+            ("get_sessions[30d]", lambda: legacy_query(legacy_path, LEGACY_SESSIONS, (month_ago, today_str)),
+             lambda: database.get_sessions(month_ago, today_str)),
+            ("get_sessions[all]", lambda: legacy_query(legacy_path, LEGACY_ALL_SESSIONS),
+             database.get_sessions),
+            ("get_stats_by_workout_type[30d]",
+             lambda: legacy_query(legacy_path, LEGACY_STATS.format(where="WHERE date BETWEEN ? AND ?"),
+                                  (month_ago, today_str)),
+             lambda: database.get_stats_by_workout_type(month_ago, today_str)),
+            ("get_stats_by_workout_type[all]", lambda: legacy_query(legacy_path, LEGACY_STATS.format(where="")),
+             database.get_stats_by_workout_type),
+            ("get_trends[365d]", lambda: legacy_query(legacy_path, LEGACY_TRENDS, (year_ago, today_str)),
+             lambda: database.get_trends(365)),
+            ("get_session_details", lambda: legacy_query(legacy_path, LEGACY_DETAILS, (session_id,)),
+             lambda: database.get_session_details(session_id)),
+        ]
+
+        print(f"{'case':34s} {'text':>10s} {'integer':>10s} {'ratio':>8s}")
+        for name, old, new in cases:
+            if not same_rows(old(), new()):
+                print(f"{name:34s} results differ")
+                continue
+            old_ms = measure(old, args.repeat)["median_ms"]
+            new_ms = measure(new, args.repeat)["median_ms"]
+            print(f"{name:34s} {old_ms:8.2f}ms {new_ms:8.2f}ms {new_ms / old_ms:7.2f}x")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
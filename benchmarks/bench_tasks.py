@@ -0,0 +1,160 @@
+"""Headless benchmark of the background task scheduler against one thread per click.
+
+    python benchmarks/bench_tasks.py --workouts 100k --clicks 50 --interval 20
+
+Generates a seeded database and replays a burst of Refresh clicks (summary
+totals plus the history reload, as refresh_stats does), one every
+--interval ms, twice: once starting a thread per click the way the app used
+to, and once through TaskScheduler's "refresh" slot. A small after() loop
+stands in for Tk's event loop. Reports how many refreshes had finished, how
+long until the last click's result reached the "UI", queue depth and the
+scheduler's latency percentiles.
+"""
+import argparse
+import heapq
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import database
+import storage
+from dataset import generate, parse_size
+from tasks import TaskScheduler
+from viewmodels import HistoryViewModel, summary_totals
+
+
+class EventLoop:
+    """The after()/after_cancel() part of a Tk root, run on the calling thread."""
+
+    def __init__(self):
+        self._timers = []
+        self._next_id = 0
+        self._cancelled = set()
+
+    def after(self, ms, func, *args):
+        self._next_id += 1
+        heapq.heappush(self._timers, (time.perf_counter() + ms / 1000.0, self._next_id, func, args))
+        return self._next_id
+
+    def after_cancel(self, after_id):
+        self._cancelled.add(after_id)
+
+    def run_until(self, done, timeout=600):
+        deadline = time.perf_counter() + timeout
+        while not done() and time.perf_counter() < deadline:
+            if not self._timers:
+                time.sleep(0.001)
+                continue
+            due, after_id, func, args = self._timers[0]
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(min(delay, 0.005))
+                continue
+            heapq.heappop(self._timers)
+            if after_id not in self._cancelled:
+                func(*args)
+
+
+def refresh(history, user_id):
+    return summary_totals("All Time", user_id), history.load(user_id)
+
+
+def run_threads(clicks, interval, user_id):
+    """One thread per click, results handed back through after(0, ...) like the old code."""
+    loop = EventLoop()
+    history = HistoryViewModel(user_id)
+    results = queue.Queue()
+    runs = []
+    delivered = []
+    threads = []
+
+    def worker(click):
+        results.put((click, refresh(history, user_id)))
+        runs.append(click)
+
+    def drain():
+        while not results.empty():
+            delivered.append((results.get()[0], time.perf_counter()))
+        loop.after(20, drain)
+
+    def click(n):
+        thread = threading.Thread(target=worker, args=(n,), daemon=True)
+        thread.start()
+        threads.append(thread)
+
+    start = time.perf_counter()
+    for n in range(clicks):
+        loop.after(n * interval, click, n)
+    loop.after(20, drain)
+    last_click = start + (clicks - 1) * interval / 1000.0
+    loop.run_until(lambda: any(n == clicks - 1 for n, _ in delivered))
+    finished = len(runs)
+    # Let the stragglers finish so they do not slow down the next run
+    for thread in threads:
+        thread.join()
+    return finished, max(at for n, at in delivered if n == clicks - 1) - last_click
+
+
+def run_scheduler(clicks, interval, user_id):
+    loop = EventLoop()
+    history = HistoryViewModel(user_id)
+    scheduler = TaskScheduler(loop)
+    scheduler.start()
+    runs = []
+    delivered = []
+    max_depth = 0
+
+    def task(n):
+        runs.append(n)
+        return refresh(history, user_id)
+
+    def click(n):
+        nonlocal max_depth
+        scheduler.submit("refresh", task, n, on_done=lambda result: delivered.append((n, time.perf_counter())))
+        max_depth = max(max_depth, scheduler.stats()["queue_depth"])
+
+    start = time.perf_counter()
+    for n in range(clicks):
+        loop.after(n * interval, click, n)
+    last_click = start + (clicks - 1) * interval / 1000.0
+    loop.run_until(lambda: any(n == clicks - 1 for n, _ in delivered))
+    stats = scheduler.stats()
+    scheduler.stop()
+    return len(runs), max(at for n, at in delivered if n == clicks - 1) - last_click, max_depth, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the background task scheduler")
+    parser.add_argument("--workouts", type=parse_size, default="100k")
+    parser.add_argument("--clicks", type=int, default=50, help="Refresh clicks in the burst")
+    parser.add_argument("--interval", type=float, default=20, help="ms between clicks")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="fitness_tasks_bench_")
+    try:
+        engine = storage.configure(os.path.join(workdir, 'fitness_tracker.db'))
+        generate(engine, args.workouts, seed=args.seed)
+        database.create_db()
+        user_id = database.DEFAULT_USER_ID
+
+        print(f"{args.workouts:,} workouts, {args.clicks} Refresh clicks every {args.interval:g} ms\n")
+        runs, latency = run_threads(args.clicks, args.interval, user_id)
+        print(f"thread per click   {runs:4d} refreshes finished, last result after {latency * 1000:8.1f} ms")
+        runs, latency, max_depth, stats = run_scheduler(args.clicks, args.interval, user_id)
+        print(f"TaskScheduler      {runs:4d} refreshes finished, last result after {latency * 1000:8.1f} ms")
+        print(f"\nscheduler: max queue depth {max_depth}, superseded {stats['superseded']}, "
+              f"wait p50 {stats['wait_p50_ms']:.1f} ms / p95 {stats['wait_p95_ms']:.1f} ms, "
+              f"run p50 {stats['run_p50_ms']:.1f} ms, delivery p95 {stats['delivery_p95_ms']:.1f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Theme toggle latency: reconfiguring every ttk style against switching compiled themes.
+
+    python benchmarks/bench_theme.py --toggles 50 --widgets 2000
+
+Needs a display (run under xvfb-run on a headless machine). Builds a window
+with --widgets labels and buttons across a notebook, then toggles between
+light and dark --toggles times, first by configuring each style one call at
+a time as apply_theme used to, then through ThemeManager's compiled themes.
+Each toggle is timed from the call until Tk is idle again
+(update_idletasks), which includes the relayout and redraw of every widget.
+"""
+import argparse
+import os
+import sys
+import time
+import tkinter as tk
+from tkinter import ttk
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from lag_monitor import percentile
+from themes import PALETTES, ThemeManager, theme_settings
+
+ACCENT_COLORS = {"primary": "#2196F3", "info": "#2196F3", "success": "#4CAF50", "error": "#F44336"}
+
+
+def configure_styles(style, theme):
+    """What apply_theme did before: one style.configure/style.map call per style and option set."""
+    settings = theme_settings(PALETTES[theme], ACCENT_COLORS["primary"], ACCENT_COLORS["info"],
+                              ACCENT_COLORS["success"], ACCENT_COLORS["error"])
+    for name, spec in settings.items():
+        style.configure(name, **spec["configure"])
+        if "map" in spec:
+            style.map(name, **spec["map"])
+
+
+def build_window(root, widgets):
+    notebook = ttk.Notebook(root)
+    notebook.pack(fill=tk.BOTH, expand=True)
+    per_tab = widgets // 4
+    for tab in range(4):
+        frame = ttk.Frame(notebook)
+        notebook.add(frame, text=f"Tab {tab}")
+        for i in range(per_tab):
+            widget = ttk.Label(frame, text=f"Label {i}") if i % 2 else ttk.Button(frame, text=f"Button {i}")
+            widget.grid(row=i // 20, column=i % 20)
+
+
+def measure(root, toggles, switch):
+    timings = []
+    theme = "light"
+    for _ in range(toggles):
+        theme = "dark" if theme == "light" else "light"
+        start = time.perf_counter()
+        switch(theme)
+        root.update_idletasks()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark theme toggling")
+    parser.add_argument("--toggles", type=int, default=50)
+    parser.add_argument("--widgets", type=int, default=2000)
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    style = ttk.Style()
+    style.theme_use("clam")
+    build_window(root, args.widgets)
+    root.update()
+
+    results = {"per-style configure": measure(root, args.toggles, lambda theme: configure_styles(style, theme))}
+    themes = ThemeManager(style, ACCENT_COLORS)
+    start = time.perf_counter()
+    themes.precompile()
+    compile_ms = (time.perf_counter() - start) * 1000
+    results["compiled themes"] = measure(root, args.toggles, lambda theme: themes.apply(theme))
+    root.destroy()
+
+    print(f"{args.widgets} widgets, {args.toggles} toggles; compiling both themes took {compile_ms:.1f} ms\n")
+    for name, timings in results.items():
+        print(f"{name:22s} p50 {percentile(timings, 50):7.2f} ms  p95 {percentile(timings, 95):7.2f} ms  "
+              f"max {max(timings):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
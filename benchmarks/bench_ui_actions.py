@@ -0,0 +1,127 @@
+"""Headless load test of the view models: thousands of simulated UI actions.
+
+    python benchmarks/bench_ui_actions.py --workouts 100k --actions 10000
+    python benchmarks/bench_ui_actions.py --workouts 100k --actions 10000 --threads 4 --replica 2
+
+Generates a seeded database and replays a random mix of what a user does
+in the app (open the dashboard, switch summary periods, change charts,
+reload and filter the history, open session details, log a workout)
+against the view models, with no Tk and no display. --threads runs that
+many simulated users at once, each with its own history view; --replica
+serves reads from the in-memory analytics replica. Reports latency per
+action and the overall actions/sec.
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import database
+import storage
+import viewmodels
+from dataset import generate, parse_size
+from lag_monitor import percentile
+from replica import replica
+
+FILTERS = ["run", "cycl", "yoga", "2024-0", "swim", "hiit", "walking", "1"]
+
+# (action, relative weight); a user mostly looks at statistics and logs now and then
+ACTIONS = [
+    ("open dashboard", 15),
+    ("switch summary period", 15),
+    ("change chart", 20),
+    ("reload history", 5),
+    ("filter history", 20),
+    ("open session details", 15),
+    ("log workout", 10),
+]
+
+
+def simulated_user(actions, seed, user_id, timings, errors):
+    rng = random.Random(seed)
+    history = viewmodels.HistoryViewModel(user_id)
+    history.load()
+    names = [name for name, _ in ACTIONS]
+    weights = [weight for _, weight in ACTIONS]
+    for name in rng.choices(names, weights, k=actions):
+        start = time.perf_counter()
+        try:
+            if name == "open dashboard":
+                viewmodels.dashboard_data(user_id)
+            elif name == "switch summary period":
+                viewmodels.summary_texts(viewmodels.summary_totals(rng.choice(viewmodels.SUMMARY_PERIODS), user_id))
+            elif name == "change chart":
+                viewmodels.chart_data(rng.choice(viewmodels.CHART_TYPES), rng.choice(viewmodels.CHART_PERIODS),
+                                      user_id)
+            elif name == "reload history":
+                history.load()
+            elif name == "filter history":
+                history.rows(rng.choice(FILTERS))
+            elif name == "open session details":
+                rows = history.rows()
+                if rows:
+                    viewmodels.session_detail(rng.choice(rows)[0])
+            elif name == "log workout":
+                database.add_workout(rng.choice(database.WORKOUT_TYPES), round(rng.uniform(10, 90), 1),
+                                     round(rng.uniform(50, 900), 1), None, "Medium", user_id=user_id)
+        except Exception as e:
+            errors.append(f"{name}: {e}")
+        timings.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless load test of the view models")
+    parser.add_argument("--workouts", type=parse_size, default="100k")
+    parser.add_argument("--actions", type=int, default=10_000, help="simulated UI actions in total")
+    parser.add_argument("--threads", type=int, default=1, help="simulated users acting at the same time")
+    parser.add_argument("--replica", type=float, default=None, metavar="SECONDS",
+                        help="read from the analytics replica with this max staleness")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="fitness_ui_bench_")
+    try:
+        engine = storage.configure(os.path.join(workdir, 'fitness_tracker.db'))
+        generate(engine, args.workouts, seed=args.seed)
+        database.create_db()
+        if args.replica is not None:
+            replica.configure(enabled=True, max_staleness=args.replica)
+            replica.start()
+
+        per_thread = [args.actions // args.threads + (i < args.actions % args.threads) for i in range(args.threads)]
+        timings = [{} for _ in per_thread]
+        errors = []
+        threads = [threading.Thread(target=simulated_user,
+                                    args=(count, args.seed + i, database.DEFAULT_USER_ID, timings[i], errors))
+                   for i, count in enumerate(per_thread)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        mode = f"replica ({args.replica:g}s)" if args.replica is not None else "file"
+        print(f"{args.workouts:,} workouts, {args.actions:,} actions, {args.threads} user(s), reads from {mode}\n")
+        print(f"{'action':24s} {'count':>6s} {'p50':>9s} {'p95':>9s} {'p99':>9s} {'max':>9s}")
+        for name, _ in ACTIONS:
+            values = [value for thread_timings in timings for value in thread_timings.get(name, [])]
+            if values:
+                print(f"{name:24s} {len(values):6d} {percentile(values, 50):7.2f}ms {percentile(values, 95):7.2f}ms "
+                      f"{percentile(values, 99):7.2f}ms {max(values):7.1f}ms")
+        print(f"\n{args.actions / elapsed:.0f} actions/s ({elapsed:.1f} s), {len(errors)} errors")
+        for error in errors[:5]:
+            print(f"  {error}")
+    finally:
+        replica.configure(enabled=False)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
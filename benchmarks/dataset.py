@@ -0,0 +1,190 @@
+"""Seeded generator for realistic fitness tracker databases.
+
+    python benchmarks/dataset.py --workouts 100000 --output bench_100k.db
+
+Sizes used by the benchmark suite are 1k, 100k, 1M and 10M workouts. Rows are
+written with executemany in large batches inside one transaction, with
+journaling and syncing turned off since the database is disposable. The
+derived tables (personal records, activity calendar, training load) are then
+rebuilt, so the database looks like one grown by the app. No heart rate
+samples are generated, so there are no zone times to cache.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import analytics
+import database
+import storage
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+
+# Relative frequency of each workout type and its typical duration (minutes)
+WORKOUT_TYPES = [
+    ("Running", 25, 35),
+    ("Walking", 20, 45),
+    ("Cycling", 15, 50),
+    ("Weight Training", 15, 45),
+    ("Yoga", 8, 40),
+    ("HIIT", 7, 20),
+    ("Swimming", 6, 35),
+    ("Other", 4, 30),
+]
+INTENSITIES = [("Low", 25), ("Medium", 50), ("High", 25)]
+
+# Approximate calories per minute for a 70 kg person, as used by the add workout dialog
+CALORIES_PER_MIN = {
+    "Running": {"Low": 8, "Medium": 10, "High": 14},
+    "Walking": {"Low": 3, "Medium": 4, "High": 5},
+    "Cycling": {"Low": 5, "Medium": 7, "High": 10},
+    "Swimming": {"Low": 6, "Medium": 8, "High": 10},
+    "Weight Training": {"Low": 3, "Medium": 5, "High": 6},
+    "Yoga": {"Low": 2, "Medium": 3, "High": 4},
+    "HIIT": {"Low": 8, "Medium": 12, "High": 15},
+    "Other": {"Low": 4, "Medium": 6, "High": 8}
+}
+
+BATCH_SIZE = 50_000
+
+
+def generate(location, workouts, seed=42, days=1825, end=None):
+    """Fill a new database holding the requested number of workouts.
+
+    location is a file path or a storage engine. Returns the
+    number of sessions written.
+    """
+    rng = random.Random(seed)
+    end = end or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    first_day = end - timedelta(days=days)
+
+    engine = storage.open_engine(location) if isinstance(location, str) else location
+    engine.destroy()
+    with storage.using(engine):
+        database.create_db()
+
+    conn = engine.connect()
+    type_ids = {name: database.lookup_id(conn.cursor(), "workout_types", name) for name, _, _ in WORKOUT_TYPES}
+    intensity_ids = {name: database.lookup_id(conn.cursor(), "intensities", name) for name, _ in INTENSITIES}
+
+    type_names = [t[0] for t in WORKOUT_TYPES]
+    type_weights = [t[1] for t in WORKOUT_TYPES]
+    type_minutes = {t[0]: t[2] for t in WORKOUT_TYPES}
+    intensity_names = [i[0] for i in INTENSITIES]
+    intensity_weights = [i[1] for i in INTENSITIES]
+
+    # Sessions hold 1-4 workouts (2.5 on average) spread evenly over the period
+    session_count = max(1, workouts * 2 // 5)
+    seconds_per_session = days * 86400 / session_count
+
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    cursor = conn.cursor()
+    cursor.execute("BEGIN")
+
+    session_rows = []
+    workout_rows = []
+    remaining = workouts
+    session_id = 0
+
+    while remaining > 0:
+        session_id += 1
+        start = first_day + timedelta(seconds=(session_id - 1) * seconds_per_session + rng.random() * 3600)
+        count = remaining if session_id >= session_count else min(remaining, rng.randint(1, 4))
+        remaining -= count
+
+        start_ts = database.to_epoch_seconds(start)
+        date = start_ts // 86400
+        total_duration = 0.0
+        total_calories = 0.0
+        types = rng.choices(type_names, type_weights, k=count)
+        intensities = rng.choices(intensity_names, intensity_weights, k=count)
+        for workout_type, intensity in zip(types, intensities):
+            duration = round(max(5.0, rng.gauss(type_minutes[workout_type], 12)), 1)
+            calories = round(CALORIES_PER_MIN[workout_type][intensity] * duration * rng.uniform(0.85, 1.15), 1)
+            total_duration += duration
+            total_calories += calories
+            # Most members let the app estimate calories
+            estimated = 1 if rng.random() < 0.8 else 0
+            workout_rows.append((type_ids[workout_type], duration, calories, session_id, date, "",
+                                 intensity_ids[intensity], estimated))
+
+        end_ts = start_ts + int((total_duration + rng.randint(5, 20)) * 60)
+        session_rows.append((session_id, start_ts, end_ts,
+                             round(total_duration, 1), round(total_calories, 1), "", rng.randint(1, 5)))
+
+        if len(workout_rows) >= BATCH_SIZE:
+            _flush(cursor, session_rows, workout_rows)
+
+    _flush(cursor, session_rows, workout_rows)
+
+    cursor.execute('''
+        INSERT INTO user_profile (name, age, weight, height, gender, activity_level, bmr, date_updated)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', ("Benchmark User", 34, 72.5, 178.0, "Male", "Active",
+          88.362 + 13.397 * 72.5 + 4.799 * 178.0 - 5.677 * 34, end.strftime('%Y-%m-%d')))
+
+    goal_rows = []
+    for i in range(12):
+        goal_start = end - timedelta(days=30 * (i + 1))
+        goal_rows.append((rng.choice(["Workout Frequency", "Calories Burned", "Duration"]),
+                          rng.choice([4, 10, 300, 2000, 5000]),
+                          goal_start.strftime('%Y-%m-%d'),
+                          (goal_start + timedelta(days=60)).strftime('%Y-%m-%d'),
+                          1 if i > 2 else 0, ""))
+    cursor.executemany('''
+        INSERT INTO goals (goal_type, target_value, start_date, end_date, completed, notes)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', goal_rows)
+
+    conn.commit()
+    conn.close()
+
+    with storage.using(engine):
+        database.rebuild_personal_records()
+        database.rebuild_activity_calendar()
+        analytics.update_training_load(today=database.to_epoch_day(end))
+    return session_id
+
+
+def _flush(cursor, session_rows, workout_rows):
+    cursor.executemany('''
+        INSERT INTO sessions (id, start_time, end_time, total_duration, total_calories, notes, rating)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', session_rows)
+    cursor.executemany('''
+        INSERT INTO workouts (type_id, duration, calories_burned, session_id, date, notes, intensity_id,
+                              calories_estimated)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', workout_rows)
+    session_rows.clear()
+    workout_rows.clear()
+
+
+def parse_size(value):
+    """Accept either a named size (1k, 100k, 1m, 10m) or a plain number."""
+    return SIZES.get(value.lower()) or int(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic fitness tracker database")
+    parser.add_argument("--workouts", type=parse_size, default="100k",
+                        help="number of workouts: 1k, 100k, 1m, 10m or any integer")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--days", type=int, default=1825, help="length of the history in days")
+    parser.add_argument("--output", default="bench_fitness_tracker.db")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    sessions = generate(args.output, args.workouts, seed=args.seed, days=args.days)
+    elapsed = time.perf_counter() - start
+    print(f"Generated {args.workouts} workouts in {sessions} sessions in {elapsed:.1f}s "
+          f"({args.workouts / elapsed:,.0f} workouts/s) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
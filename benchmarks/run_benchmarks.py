@@ -0,0 +1,272 @@
+"""Reproducible benchmark suite for the database, Session and view data paths.
+
+    python benchmarks/run_benchmarks.py --workouts 100k --output results.json
+    python benchmarks/run_benchmarks.py --workouts 100k --baseline results.json
+    python benchmarks/run_benchmarks.py --workouts 100k --memory
+
+Each run generates (or reuses) a seeded database, times the public functions
+of database.py that open their own connection, the Session methods and the data preparation behind the
+statistics views, and writes the timings as JSON. Passing --baseline prints
+the ratio of each timing against an earlier run. --memory keeps the database
+in RAM, which separates query cost from disk I/O.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import calories
+import database
+import storage
+import viewmodels
+from dataset import generate, parse_size
+from session import Session
+from workout import Workout
+
+# Stop repeating a case once it has used this much time in total
+TIME_BUDGET_S = 2.0
+
+
+def measure(func, repeat):
+    """Time func up to repeat times and return summary statistics in ms."""
+    timings = []
+    spent = 0.0
+    while len(timings) < repeat and (not timings or spent < TIME_BUDGET_S):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        timings.append(elapsed * 1000)
+        spent += elapsed
+    return {
+        "runs": len(timings),
+        "min_ms": round(min(timings), 4),
+        "median_ms": round(statistics.median(timings), 4),
+        "mean_ms": round(statistics.fmean(timings), 4)
+    }
+
+
+def database_cases(scratch_dir):
+    """Benchmarks for the public functions of database.py that open their own connection.
+
+    Helpers that run on the caller's cursor are timed through these.
+    """
+    today = datetime.now()
+    month_ago = (today - timedelta(days=30)).strftime('%Y-%m-%d')
+    today_str = today.strftime('%Y-%m-%d')
+    conn = database.get_connection()
+    session_id, = conn.execute("SELECT MAX(id) FROM sessions").fetchone()
+    goal_id, = conn.execute("SELECT MAX(id) FROM goals").fetchone()
+    workout_id, = conn.execute("SELECT MAX(id) FROM workouts").fetchone()
+    conn.close()
+    finished = (today - timedelta(hours=1)).strftime('%Y-%m-%d %H:%M:%S')
+    days_ahead = itertools.count(1)
+
+    def reset_scratch():
+        # Run against a throwaway file so the benchmark database survives
+        with storage.using(storage.FileEngine(os.path.join(scratch_dir, 'reset.db'))):
+            database.reset_database()
+
+    def add_activities():
+        # A new day each run, well after the generated history, so nothing is skipped as a duplicate
+        day = datetime(today.year + 1, 1, 1) + timedelta(days=next(days_ahead))
+        database.add_activities([(day + timedelta(minutes=5 * i), Workout("Running", 30, 300)) for i in range(100)])
+
+    def add_and_delete_workout():
+        database.add_workout("Running", 30, 300, session_id, "Medium", "")
+        conn = database.get_connection()
+        new_id, = conn.execute("SELECT MAX(id) FROM workouts").fetchone()
+        conn.close()
+        database.delete_workout(new_id)
+
+    return {
+        "database.get_connection": lambda: database.get_connection().close(),
+        "database.create_db": database.create_db,
+        "database.migrate_database": database.migrate_database,
+        "database.reset_database": reset_scratch,
+        "database.add_workout": lambda: database.add_workout("Running", 30, 300, session_id, "Medium", ""),
+        "database.add_session": lambda: database.add_session(today.strftime('%Y-%m-%d %H:%M:%S'), None, 0, 0),
+        "database.get_session_details": lambda: database.get_session_details(session_id),
+        "database.add_activities[100]": add_activities,
+        "database.get_open_sessions": database.get_open_sessions,
+        "database.get_sessions[all]": database.get_sessions,
+        "database.get_sessions[30d]": lambda: database.get_sessions(month_ago, today_str),
+        "database.get_sessions[newest 5]": lambda: database.get_sessions(limit=5),
+        "database.get_session": lambda: database.get_session(session_id),
+        "database.get_session_totals[all]": database.get_session_totals,
+        "database.get_session_totals[30d]": lambda: database.get_session_totals(month_ago, today_str),
+        "database.get_session_workout_types[all]": database.get_session_workout_types,
+        "database.get_stats_by_workout_type[all]": database.get_stats_by_workout_type,
+        "database.get_stats_by_workout_type[30d]": lambda: database.get_stats_by_workout_type(month_ago, today_str),
+        "database.update_session": lambda: database.update_session(session_id, notes="benchmark"),
+        "database.add_goal": lambda: database.add_goal("Duration", 300, month_ago, today_str),
+        "database.get_active_goals": database.get_active_goals,
+        "database.update_goal_progress": lambda: database.update_goal_progress(goal_id, completed=False),
+        "database.save_user_profile": lambda: database.save_user_profile("Benchmark User", 34, 72.5, 178.0,
+                                                                          "Male", "Active"),
+        "database.get_user_profile": database.get_user_profile,
+        "database.get_trends[30d]": database.get_trends,
+        "database.get_trends[365d]": lambda: database.get_trends(365),
+        "database.get_read_connection": lambda: database.get_read_connection().close(),
+        "database.get_personal_records": database.get_personal_records,
+        "database.rebuild_personal_records": database.rebuild_personal_records,
+        "database.get_activity_calendar": lambda: database.get_activity_calendar(today.year),
+        "database.get_activity_years": database.get_activity_years,
+        "database.rebuild_activity_calendar": database.rebuild_activity_calendar,
+        "database.update_workout": lambda: database.update_workout(workout_id, notes="benchmark"),
+        "database.add_workout+delete_workout": add_and_delete_workout,
+        "database.add_session+delete_session": lambda: database.delete_session(
+            database.add_session(finished, today.strftime('%Y-%m-%d %H:%M:%S'), 60, 500)),
+        "database.delete_sessions_between[empty]": lambda: database.delete_sessions_between("2000-01-01",
+                                                                                             "2000-01-31"),
+        "database.add_user_profile": lambda: database.add_user_profile("Benchmark Member"),
+        "database.get_user_profiles": database.get_user_profiles,
+        "calories.estimate_many[10k]": lambda: calories.estimate_many(
+            [("Running", "High", 30.0)] * 10_000, 72.5, 1700.0),
+        "calories.recompute_estimated_calories": lambda: calories.recompute_estimated_calories(72.5, 1700.0),
+    }
+
+
+def session_cases():
+    """Benchmarks for the Session methods."""
+    session = Session()
+    session.start()
+    for _ in range(10):
+        session.add_workout(Workout("Cycling", 40, 280, intensity="High"))
+
+    def start_and_end():
+        s = Session()
+        s.start()
+        s.end()
+
+    return {
+        "Session.start+end": start_and_end,
+        "Session.start_new_session": lambda: _fresh_session().start_new_session(),
+        "Session.add_workout": lambda: session.add_workout(Workout("Running", 30, 300)),
+        "Session.restore": lambda: Session.restore(session.session_id, session.start_time.strftime('%Y-%m-%d %H:%M:%S')),
+        "Session.get_session_stats": session.get_session_stats,
+        "Session.display_session_details": session.display_session_details,
+    }
+
+
+def _fresh_session():
+    s = Session()
+    s.start_time = datetime.now()
+    return s
+
+
+def view_cases():
+    """Benchmarks for the data preparation behind the statistics views."""
+    history = viewmodels.HistoryViewModel()
+    history.load()
+    cases = {
+        "view.load_history": history.load,
+        "view.filter_history": lambda: history.rows("running"),
+        "view.dashboard": viewmodels.dashboard_data,
+    }
+    for period in viewmodels.SUMMARY_PERIODS:
+        cases[f"view.update_summary_stats[{period}]"] = lambda p=period: viewmodels.summary_totals(p)
+    for period in viewmodels.CHART_PERIODS:
+        cases[f"view.update_chart[{period}]"] = lambda p=period: viewmodels.chart_stats(p)
+    return cases
+
+
+def run(args):
+    """Run the suite and return the JSON-serialisable results."""
+    workdir = tempfile.mkdtemp(prefix="fitness_bench_")
+    if args.memory:
+        engine = storage.MemoryEngine()
+    else:
+        engine = storage.FileEngine(os.path.join(workdir, 'fitness_tracker.db'))
+    try:
+        if args.db:
+            source = sqlite3.connect(args.db)
+            target = engine.connect()
+            source.backup(target)
+            target.close()
+            source.close()
+            generate_s = None
+        else:
+            start = time.perf_counter()
+            generate(engine, args.workouts, seed=args.seed)
+            generate_s = time.perf_counter() - start
+
+        storage.configure(engine)
+        cases = {}
+        cases.update(database_cases(workdir))
+        cases.update(session_cases())
+        cases.update(view_cases())
+
+        results = {}
+        for name, func in cases.items():
+            if args.only and args.only not in name:
+                continue
+            results[name] = measure(func, args.repeat)
+            print(f"{name:48s} {results[name]['median_ms']:12.3f} ms (n={results[name]['runs']})")
+
+        return {
+            "meta": {
+                "timestamp": datetime.now().isoformat(timespec='seconds'),
+                "workouts": args.workouts,
+                "seed": args.seed,
+                "source_db": args.db,
+                "engine": "memory" if args.memory else "file",
+                "generate_s": generate_s,
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "platform": platform.platform()
+            },
+            "results": results
+        }
+    finally:
+        engine.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def compare(current, baseline):
+    """Print each timing relative to a baseline run."""
+    print(f"\n{'case':48s} {'baseline':>12s} {'current':>12s} {'ratio':>8s}")
+    for name, result in current["results"].items():
+        old = baseline["results"].get(name)
+        if not old:
+            continue
+        ratio = result["median_ms"] / old["median_ms"] if old["median_ms"] else float('inf')
+        print(f"{name:48s} {old['median_ms']:12.3f} {result['median_ms']:12.3f} {ratio:8.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the fitness tracker benchmark suite")
+    parser.add_argument("--workouts", type=parse_size, default="1k",
+                        help="dataset size: 1k, 100k, 1m, 10m or any integer")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", help="benchmark a copy of an existing database instead of generating one")
+    parser.add_argument("--memory", action="store_true", help="keep the database in memory instead of a file")
+    parser.add_argument("--repeat", type=int, default=20, help="maximum runs per case")
+    parser.add_argument("--only", help="only run cases whose name contains this text")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against a previous JSON result file")
+    args = parser.parse_args()
+
+    results = run(args)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
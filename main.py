@@ -1,5 +1,6 @@
 import sys
 import os
+import argparse
 import tkinter as tk
 from tkinter import messagebox
 
@@ -9,11 +10,80 @@ sys.path.append(os.path.join(current_dir, 'src'))
 
 # Import required modules
 from app import FitnessTrackerApp
-from database import create_db, reset_database
+from database import DEFAULT_USER_ID, create_db, get_user_profiles, reset_database
 from setup_assets import setup_assets
+from query_profiler import profiler
+from replica import replica
+from reports import REPORT_FORMATS, REPORT_PERIODS, render_reports, report_jobs
+from storage import MEMORY, configure
 
-def launch_app():
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Fitness Tracker Pro")
+    parser.add_argument("--profile-queries", action="store_true",
+                        help="record timings for every database query")
+    parser.add_argument("--slow-query-ms", type=float, default=None,
+                        help="log queries slower than this (with their query plan)")
+    parser.add_argument("--query-report", action="store_true",
+                        help="print the query profile report on exit")
+    parser.add_argument("--monitor-lag", action="store_true",
+                        help="measure Tk event-loop lag and record UI stalls")
+    parser.add_argument("--lag-report", metavar="PATH", default=None,
+                        help="write the UI responsiveness summary to PATH (JSON) on exit")
+    parser.add_argument("--db", metavar="PATH", default=None,
+                        help=f"database file, or {MEMORY} for a throwaway in-memory database "
+                             "(default: $FITNESS_TRACKER_DB, else fitness_tracker.db next to main.py)")
+    parser.add_argument("--replica-staleness", metavar="SECONDS", type=float, default=None,
+                        help="serve statistics and history from an in-memory copy of the database "
+                             "that is at most SECONDS behind")
+    parser.add_argument("--render-reports", metavar="DIR", default=None,
+                        help="render a report for every profile into DIR without opening the window, then exit")
+    parser.add_argument("--report-period", choices=list(REPORT_PERIODS), action="append", default=None,
+                        help="period of the rendered reports; repeat for several (default: Week)")
+    parser.add_argument("--report-format", choices=REPORT_FORMATS, default="pdf",
+                        help="file format of the rendered reports (default: pdf)")
+    parser.add_argument("--report-workers", metavar="N", type=int, default=None,
+                        help="worker processes rendering reports (default: one per CPU)")
+    return parser.parse_args(argv)
+
+def render_reports_headless(args):
+    """Render the reports asked for on the command line, without Tk."""
+    configure(args.db)
+    create_db()
+    os.makedirs(args.render_reports, exist_ok=True)
+    
+    # The default profile logs sessions even before it has a profile row
+    user_ids = sorted({DEFAULT_USER_ID} | {user_id for user_id, _ in get_user_profiles()})
+    jobs = report_jobs(user_ids, args.report_period or ["Week"], args.report_format, args.render_reports)
+    
+    def report_progress(done, total):
+        print(f"\rRendered {done}/{total} reports", end="", flush=True)
+    
+    try:
+        paths, seconds = render_reports(jobs, workers=args.report_workers, progress=report_progress)
+    except Exception as e:
+        print(f"\nError rendering reports: {e}")
+        return 1
+    print(f"\nRendered {len(paths)} reports into {args.render_reports} in {seconds:.1f} s "
+          f"({len(paths) / seconds * 60:.0f} reports/minute)")
+    return 0
+
+def launch_app(args=None):
     """Launch the Fitness Tracker application."""
+    if args is None:
+        args = parse_args([])
+    
+    # Every module opens its connections through the configured engine
+    configure(args.db)
+    
+    # Query profiling is enabled by any of the profiling flags
+    if args.profile_queries or args.slow_query_ms is not None or args.query_report:
+        profiler.configure(enabled=True, slow_query_ms=args.slow_query_ms)
+    
+    if args.replica_staleness is not None:
+        replica.configure(enabled=True, max_staleness=args.replica_staleness)
+        replica.start()
+    
     # Create assets
     try:
         setup_assets()
@@ -34,11 +104,23 @@ def launch_app():
     root = tk.Tk()
     try:
         app = FitnessTrackerApp(root)
+        if args.monitor_lag or args.lag_report:
+            app.lag_monitor.start()
+            app.monitor_lag_var.set(True)
         root.mainloop()
+        if args.lag_report:
+            app.lag_monitor.export_json(args.lag_report)
+            print(f"UI responsiveness report written to {args.lag_report}")
     except Exception as e:
         messagebox.showerror("Error", f"An error occurred: {e}")
         print(f"Application error: {e}")
         root.destroy()
+    
+    if args.query_report:
+        print(profiler.format_report())
 
 if __name__ == "__main__":
-    launch_app()
\ No newline at end of file
+    args = parse_args()
+    if args.render_reports:
+        sys.exit(render_reports_headless(args))
+    launch_app(args)
\ No newline at end of file
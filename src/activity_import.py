@@ -0,0 +1,420 @@
+import csv
+import math
+import os
+from array import array
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from calories import estimate_many, profile_body
+from database import DEFAULT_USER_ID, get_connection, write_activities
+from samples import write_samples
+from workout import Workout
+
+ACTIVITY_EXTENSIONS = (".gpx", ".tcx", ".csv")
+
+# Sport names used by GPX <type>, TCX Sport and FIT sport fields, matched by substring
+SPORT_KEYWORDS = [
+    ("run", "Running"),
+    ("walk", "Walking"),
+    ("hik", "Walking"),
+    ("cycl", "Cycling"),
+    ("bik", "Cycling"),
+    ("ride", "Cycling"),
+    ("swim", "Swimming"),
+    ("strength", "Weight Training"),
+    ("weight", "Weight Training"),
+    ("yoga", "Yoga"),
+    ("hiit", "HIIT"),
+]
+# FIT sport enum values for files that store the number instead of the name
+FIT_SPORTS = {"1": "Running", "2": "Cycling", "5": "Swimming", "11": "Walking", "17": "Walking",
+              "43": "Yoga", "62": "HIIT"}
+
+# Average km/h from which an activity counts as Medium and High intensity
+INTENSITY_SPEEDS = {
+    "Running": (8.0, 11.0),
+    "Walking": (4.5, 6.0),
+    "Cycling": (16.0, 25.0),
+    "Swimming": (2.0, 3.0),
+}
+
+# FIT timestamps count seconds from 1989-12-31 00:00 UTC
+FIT_EPOCH = datetime(1989, 12, 31, tzinfo=timezone.utc)
+
+# Slower than this (seconds per km) counts as standing still, not as pace
+MAX_PACE = 1800
+
+# Pools are only worth starting for more files than this
+MIN_FILES_PER_PROCESS = 8
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def sport_name(value):
+    """Map a sport or activity type from a file to one of the app's workout types."""
+    value = (value or "").strip().lower()
+    if value in FIT_SPORTS:
+        return FIT_SPORTS[value]
+    for keyword, workout_type in SPORT_KEYWORDS:
+        if keyword in value:
+            return workout_type
+    return "Other"
+
+
+def intensity_for(workout_type, distance_km, duration_min):
+    """Intensity from the average speed, Medium when it cannot be told."""
+    thresholds = INTENSITY_SPEEDS.get(workout_type)
+    if not thresholds or not distance_km or not duration_min:
+        return "Medium"
+    speed = distance_km / (duration_min / 60.0)
+    if speed >= thresholds[1]:
+        return "High"
+    if speed >= thresholds[0]:
+        return "Medium"
+    return "Low"
+
+
+def parse_time(text):
+    """Parse an ISO 8601 timestamp from a file; times without a zone are taken as UTC."""
+    value = datetime.fromisoformat(text.strip())
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def local_time(value):
+    """Aware datetime as the local wall-clock text the sessions table stores."""
+    return value.astimezone().replace(tzinfo=None).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points in kilometres."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def local_name(tag):
+    return tag.rpartition('}')[2]
+
+
+def iter_elements(path, names):
+    """Yield finished elements with a local name in names, one at a time.
+
+    Every element is detached from its parent once it has been yielded, so
+    memory stays flat however many track points the file holds.
+    """
+    stack = []
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            continue
+        stack.pop()
+        name = local_name(elem.tag)
+        if name in names:
+            yield name, elem
+            if stack:
+                stack[-1].remove(elem)
+            elem.clear()
+
+
+def child_text(elem, name):
+    for child in elem:
+        if local_name(child.tag) == name:
+            return child.text
+    return None
+
+
+class StreamRecorder:
+    """Collects per-point heart rate, pace and power as compact integer arrays."""
+
+    def __init__(self):
+        self.streams = {}
+
+    def add(self, stream, seconds, value):
+        if value is None:
+            return
+        if stream not in self.streams:
+            self.streams[stream] = (array('i'), array('i'))
+        times, values = self.streams[stream]
+        times.append(round(seconds))
+        values.append(round(value))
+
+    def add_pace(self, seconds, elapsed, km):
+        """Record pace in seconds per km from the time and distance since the previous point."""
+        if elapsed > 0 and km > 0:
+            pace = elapsed / km
+            if pace <= MAX_PACE:
+                self.add("pace", seconds, pace)
+
+
+def number(text):
+    return float(text) if text else None
+
+
+def parse_gpx(path):
+    """Summarise a GPX track: type, first and last point time, distance and sample streams."""
+    sport = None
+    first = last = None
+    distance = 0.0
+    previous = None
+    streams = StreamRecorder()
+    for name, elem in iter_elements(path, {"trkpt", "trkseg", "type"}):
+        if name == "type":
+            sport = sport or elem.text
+        elif name == "trkseg":
+            previous = None  # no distance across gaps between segments
+        else:
+            point = (float(elem.get("lat")), float(elem.get("lon")))
+            step = haversine_km(*previous[:2], *point) if previous is not None else 0.0
+            distance += step
+            text = child_text(elem, "time")
+            when = parse_time(text) if text else None
+            if when is not None:
+                first = first or when
+                seconds = (when - first).total_seconds()
+                if previous is not None and previous[2] is not None:
+                    streams.add_pace(seconds, seconds - previous[2], step)
+                # Garmin TrackPointExtension and similar extensions
+                for child in elem.iter():
+                    tag = local_name(child.tag)
+                    if tag in ("hr", "heartrate"):
+                        streams.add("heart_rate", seconds, number(child.text))
+                    elif tag in ("power", "PowerInWatts"):
+                        streams.add("power", seconds, number(child.text))
+                last = when
+            previous = point + ((when - first).total_seconds() if when is not None else None,)
+    if first is None:
+        raise ValueError("no timed track points")
+    return {"sport": sport, "start": first, "duration": (last - first).total_seconds() / 60.0,
+            "distance": distance, "calories": None, "samples": streams.streams}
+
+
+def parse_tcx(path):
+    """Summarise a TCX activity from its laps, or its track points when laps lack totals."""
+    sport = None
+    start = None
+    first = last = None
+    lap_seconds = lap_meters = lap_calories = 0.0
+    has_calories = False
+    point_meters = None
+    previous = None
+    streams = StreamRecorder()
+    for name, elem in iter_elements(path, {"Activity", "Lap", "Trackpoint"}):
+        if name == "Trackpoint":
+            text = child_text(elem, "Time")
+            if not text:
+                continue
+            last = parse_time(text)
+            first = first or last
+            seconds = (last - first).total_seconds()
+            speed = meters = None
+            for child in elem:
+                tag = local_name(child.tag)
+                if tag == "DistanceMeters" and child.text:
+                    meters = float(child.text)
+                elif tag == "HeartRateBpm":
+                    streams.add("heart_rate", seconds, number(child_text(child, "Value")))
+                elif tag == "Extensions":
+                    for value in child.iter():
+                        if local_name(value.tag) == "Watts":
+                            streams.add("power", seconds, number(value.text))
+                        elif local_name(value.tag) == "Speed" and value.text and float(value.text) > 0:
+                            speed = float(value.text)
+            if speed is not None:
+                if 1000.0 / speed <= MAX_PACE:
+                    streams.add("pace", seconds, 1000.0 / speed)
+            elif meters is not None and previous is not None:
+                streams.add_pace(seconds, seconds - previous[0], (meters - previous[1]) / 1000.0)
+            if meters is not None:
+                previous = (seconds, meters)
+                point_meters = meters
+        elif name == "Lap":
+            if elem.get("StartTime"):
+                start = start or parse_time(elem.get("StartTime"))
+            lap_seconds += float(child_text(elem, "TotalTimeSeconds") or 0)
+            lap_meters += float(child_text(elem, "DistanceMeters") or 0)
+            calories = child_text(elem, "Calories")
+            if calories:
+                lap_calories += float(calories)
+                has_calories = True
+        else:
+            sport = sport or elem.get("Sport")
+    start = start or first
+    if start is None:
+        raise ValueError("no laps or timed track points")
+    if not lap_seconds and first is not None:
+        lap_seconds = (last - first).total_seconds()
+    meters = lap_meters or point_meters or 0.0
+    return {"sport": sport, "start": start, "duration": lap_seconds / 60.0, "distance": meters / 1000.0,
+            "calories": lap_calories if has_calories else None, "samples": streams.streams}
+
+
+def parse_fit_csv(path):
+    """Summarise a FIT file converted to CSV by the FIT SDK's FitCSVTool.
+
+    The session message carries the totals; files without one fall back to
+    the first and last record timestamps and the last record distance.
+    """
+    sport = None
+    session = {}
+    first = last = None
+    record_meters = None
+    streams = StreamRecorder()
+    with open(path, newline='') as f:
+        for row in csv.reader(f):
+            if len(row) < 3 or row[0] != "Data" or row[2] not in ("session", "record", "sport"):
+                continue
+            fields = dict(zip(row[3::3], row[4::3]))
+            if row[2] == "record":
+                if fields.get("timestamp"):
+                    last = int(float(fields["timestamp"]))
+                    first = first if first is not None else last
+                    seconds = last - first
+                    streams.add("heart_rate", seconds, number(fields.get("heart_rate")))
+                    streams.add("power", seconds, number(fields.get("power")))
+                    speed = number(fields.get("enhanced_speed") or fields.get("speed"))
+                    if speed and 1000.0 / speed <= MAX_PACE:
+                        streams.add("pace", seconds, 1000.0 / speed)
+                if fields.get("distance"):
+                    record_meters = float(fields["distance"])
+            elif row[2] == "sport":
+                sport = sport or fields.get("sport")
+            elif not session:
+                session = fields
+                sport = fields.get("sport") or sport
+
+    start = session.get("start_time") or session.get("timestamp") or first
+    if not start:
+        raise ValueError("no session or record messages")
+    seconds = session.get("total_timer_time") or session.get("total_elapsed_time")
+    seconds = float(seconds) if seconds else (last - first if first is not None else 0)
+    meters = session.get("total_distance") or record_meters or 0
+    calories = session.get("total_calories")
+    return {"sport": sport, "start": FIT_EPOCH + timedelta(seconds=int(float(start))),
+            "duration": seconds / 60.0, "distance": float(meters) / 1000.0,
+            "calories": float(calories) if calories else None, "samples": streams.streams}
+
+
+PARSERS = {".gpx": parse_gpx, ".tcx": parse_tcx, ".csv": parse_fit_csv}
+
+
+def parse_activity_file(path):
+    """Parse one activity file into a summary dict, or {"path", "error"} if it cannot be read.
+
+    Runs in worker processes, so it only returns plain values.
+    """
+    parser = PARSERS.get(os.path.splitext(path)[1].lower())
+    if parser is None:
+        return {"path": path, "error": "unsupported file type"}
+    try:
+        summary = parser(path)
+    except (ET.ParseError, OSError, ValueError, TypeError, KeyError) as e:
+        return {"path": path, "error": str(e) or type(e).__name__}
+    if summary["duration"] <= 0:
+        return {"path": path, "error": "activity has no duration"}
+    workout_type = sport_name(summary["sport"])
+    return {
+        "path": path,
+        "workout_type": workout_type,
+        "start_time": local_time(summary["start"]),
+        "duration": round(summary["duration"], 2),
+        "distance": round(summary["distance"], 3) if summary["distance"] else None,
+        "calories": summary["calories"],
+        "intensity": intensity_for(workout_type, summary["distance"], summary["duration"]),
+        "samples": summary["samples"],
+    }
+
+
+def find_activity_files(directory):
+    """All GPX, TCX and FIT-CSV files below directory, in a stable order."""
+    paths = []
+    for folder, _, names in os.walk(directory):
+        paths.extend(os.path.join(folder, name) for name in names
+                     if os.path.splitext(name)[1].lower() in ACTIVITY_EXTENSIONS)
+    return sorted(paths)
+
+
+def to_activities(results, weight_kg, bmr):
+    """Turn parsed summaries into (start_time, Workout) pairs, estimating missing calories."""
+    estimates = estimate_many([(r["workout_type"], r["intensity"], r["duration"]) for r in results],
+                              weight_kg, bmr)
+    activities = []
+    for result, estimate in zip(results, estimates):
+        calories = result["calories"]
+        workout = Workout(result["workout_type"], result["duration"],
+                          estimate if calories is None else round(calories, 1),
+                          intensity=result["intensity"],
+                          notes=f"Imported from {os.path.basename(result['path'])}",
+                          calories_estimated=calories is None, distance=result["distance"])
+        activities.append((result["start_time"], workout))
+    return activities
+
+
+def import_activity_files(paths, user_id=DEFAULT_USER_ID, workers=None, batch_size=500, progress=None):
+    """Parse activity files in a process pool and insert them for a profile in batches.
+
+    Files are parsed in parallel while earlier batches are being written, and
+    each batch, sample streams included, is one transaction. progress,
+    if given, is called with (files done, total files) once every batch is
+    committed; counts only include committed batches.
+    Returns a dict with the number of files, imported activities, skipped
+    duplicates and a list of (path, error) for files that failed.
+    """
+    paths = list(paths)
+    weight_kg, bmr = profile_body(user_id)
+    summary = {"files": len(paths), "imported": 0, "duplicates": 0, "failed": []}
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, max(1, len(paths) // MIN_FILES_PER_PROCESS))
+
+    def write(batch):
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            workout_ids = write_activities(cursor, to_activities(batch, weight_kg, bmr), user_id)
+            imported = 0
+            for workout_id, result in zip(workout_ids, batch):
+                if workout_id is None:
+                    continue
+                imported += 1
+                for stream, (times, values) in result["samples"].items():
+                    write_samples(cursor, workout_id, stream, times, values)
+            conn.commit()
+            summary["imported"] += imported
+            summary["duplicates"] += len(batch) - imported
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def consume(results):
+        batch = []
+        reported = 0
+        for done, result in enumerate(results, 1):
+            if "error" in result:
+                summary["failed"].append((result["path"], result["error"]))
+            else:
+                batch.append(result)
+            if len(batch) >= batch_size:
+                write(batch)
+                batch = []
+                if progress:
+                    progress(done, len(paths))
+                    reported = done
+        if batch:
+            write(batch)
+        if progress and paths and reported != len(paths):
+            progress(len(paths), len(paths))
+
+    if workers == 1:
+        consume(map(parse_activity_file, paths))
+    else:
+        # Small chunks keep workers busy when file sizes vary a lot
+        chunksize = max(1, min(32, len(paths) // (workers * 8)))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            consume(pool.map(parse_activity_file, paths, chunksize=chunksize))
+    return summary
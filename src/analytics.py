@@ -0,0 +1,292 @@
+import datetime
+
+import numpy as np
+
+from database import (DEFAULT_USER_ID, archive_partitions_for, get_connection, get_user_profile,
+                      run_partitioned, to_epoch_day)
+from samples import STREAMS, read_samples
+
+# Lower bounds of heart rate zones 1-5 as fractions of maximum heart rate;
+# zone 0 is everything below zone 1
+ZONE_BOUNDS = np.array([0.5, 0.6, 0.7, 0.8, 0.9])
+ZONE_NAMES = ["Below Zone 1", "Zone 1", "Zone 2", "Zone 3", "Zone 4", "Zone 5"]
+DEFAULT_MAX_HR = 190
+
+# Gaps between heart rate samples count for at most this many seconds
+MAX_SAMPLE_GAP = 10
+
+# Training load is Edwards' TRIMP: minutes in each zone times the zone
+# number. Workouts without heart rate count their whole duration at the zone
+# their intensity usually reaches, one above its level (Low 2 ... High 4).
+ZONE_LOAD_SQL = "(z.zone1 + 2 * z.zone2 + 3 * z.zone3 + 4 * z.zone4 + 5 * z.zone5) / 60.0"
+
+CTL_DAYS = 42  # fitness, chronic training load
+ATL_DAYS = 7   # fatigue, acute training load
+
+# Days per vectorised EWMA block; keeps decay ** -n far from overflowing
+EWMA_BLOCK = 128
+
+
+def max_heart_rate(user_id=DEFAULT_USER_ID):
+    """Maximum heart rate from the profile's age (Tanaka: 208 - 0.7 * age)."""
+    profile = get_user_profile(user_id)
+    if profile and profile[2]:
+        return round(208 - 0.7 * profile[2])
+    return DEFAULT_MAX_HR
+
+
+def zone_seconds(times, values, max_hr):
+    """Seconds spent in zones 0-5 for heart rate samples, binned in one pass."""
+    if len(times) == 0:
+        return np.zeros(len(ZONE_NAMES))
+    zones = np.searchsorted(ZONE_BOUNDS * max_hr, values, side="right")
+    gaps = np.diff(times, append=times[-1] + 1)
+    np.minimum(gaps, MAX_SAMPLE_GAP, out=gaps)
+    return np.bincount(zones, weights=gaps, minlength=len(ZONE_NAMES))
+
+
+def cache_zones(cursor, user_id, max_hr):
+    """Compute zone times of the profile's workouts that have heart rate samples but no current cache row."""
+    # CROSS JOIN keeps samples as the outer loop; starting from the user's
+    # workouts would walk their whole history
+    cursor.execute('''
+        SELECT DISTINCT s.workout_id
+        FROM main.workout_samples s
+        CROSS JOIN main.workouts w ON w.id = s.workout_id
+        LEFT JOIN main.workout_zones z ON z.workout_id = s.workout_id
+        WHERE s.stream = ? AND w.user_id = ? AND w.deleted_at IS NULL AND (z.workout_id IS NULL OR z.max_hr != ?)
+    ''', (STREAMS["heart_rate"], user_id, max_hr))
+    rows = []
+    for workout_id, in cursor.fetchall():
+        times, values = read_samples(workout_id, "heart_rate", cursor=cursor)
+        rows.append((workout_id, max_hr, *zone_seconds(times, values, max_hr).tolist()))
+    cursor.executemany('''
+        INSERT OR REPLACE INTO main.workout_zones (workout_id, max_hr, zone0, zone1, zone2, zone3, zone4, zone5)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    return len(rows)
+
+
+def workout_zones(workout_id, user_id=DEFAULT_USER_ID):
+    """Seconds in zones 0-5 of one workout, or None if it has no heart rate samples."""
+    max_hr = max_heart_rate(user_id)
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute('''
+            SELECT zone0, zone1, zone2, zone3, zone4, zone5 FROM workout_zones
+            WHERE workout_id = ? AND max_hr = ?
+        ''', (workout_id, max_hr))
+        row = cursor.fetchone()
+        if row:
+            return np.array(row)
+        times, values = read_samples(workout_id, "heart_rate", cursor=cursor)
+        if len(times) == 0:
+            return None
+        zones = zone_seconds(times, values, max_hr)
+        cursor.execute('''
+            INSERT OR REPLACE INTO workout_zones (workout_id, max_hr, zone0, zone1, zone2, zone3, zone4, zone5)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (workout_id, max_hr, *zones.tolist()))
+        conn.commit()
+        return zones
+    finally:
+        conn.close()
+
+
+def zone_totals(start_date=None, end_date=None, user_id=DEFAULT_USER_ID):
+    """Seconds in zones 0-5 summed over the profile's workouts between two 'YYYY-MM-DD' dates."""
+    max_hr = max_heart_rate(user_id)
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cache_zones(cursor, user_id, max_hr)
+        conn.commit()
+        params = [max_hr, user_id]
+        conditions = ""
+        if start_date:
+            conditions += " AND workouts.date >= ?"
+            params.append(to_epoch_day(start_date))
+        if end_date:
+            conditions += " AND workouts.date <= ?"
+            params.append(to_epoch_day(end_date))
+        partitions = archive_partitions_for(cursor, start_date, end_date)
+        batches = run_partitioned(cursor, f'''
+            SELECT SUM(z.zone0), SUM(z.zone1), SUM(z.zone2), SUM(z.zone3), SUM(z.zone4), SUM(z.zone5)
+            FROM main.workout_zones z
+            CROSS JOIN {{workouts}} ON workouts.id = z.workout_id
+            WHERE z.max_hr = ? AND workouts.user_id = ?{conditions}
+        ''', params, partitions)
+    finally:
+        conn.close()
+    totals = np.zeros(len(ZONE_NAMES))
+    for rows in batches:
+        totals += np.array([value or 0.0 for value in rows[0]])
+    return totals
+
+
+def ewma(loads, time_constant, start=0.0):
+    """x[t] = x[t-1] + (loads[t] - x[t-1]) / time_constant, starting from x[-1] = start.
+
+    Within a block x[t] = decay**t * (decay * carry + k * cumsum(decay**-j * loads[j])),
+    so each block is a few array operations instead of a Python loop per day.
+    """
+    k = 1.0 / time_constant
+    decay = 1.0 - k
+    steps = np.arange(EWMA_BLOCK)
+    powers = decay ** steps
+    inverse = decay ** -steps
+    result = np.empty(len(loads))
+    carry = start
+    for i in range(0, len(loads), EWMA_BLOCK):
+        block = loads[i:i + EWMA_BLOCK]
+        n = len(block)
+        result[i:i + n] = powers[:n] * (decay * carry + k * np.cumsum(block * inverse[:n]))
+        carry = result[i + n - 1]
+    return result
+
+
+def day_text(day):
+    return (datetime.date(1970, 1, 1) + datetime.timedelta(days=int(day))).isoformat()
+
+
+def daily_loads(cursor, user_id, first_day, last_day, max_hr):
+    """Training load of every day from first_day to last_day (epoch days) as an array."""
+    partitions = archive_partitions_for(cursor, day_text(first_day), day_text(last_day))
+    batches = run_partitioned(cursor, f'''
+        SELECT workouts.date,
+               SUM(CASE WHEN z.workout_id IS NULL THEN workouts.duration * (intensities.level + 1)
+                        ELSE {ZONE_LOAD_SQL} END)
+        FROM {{workouts}}
+        JOIN main.intensities ON intensities.id = workouts.intensity_id
+        LEFT JOIN main.workout_zones z ON z.workout_id = workouts.id AND z.max_hr = ?
+        WHERE workouts.user_id = ? AND workouts.date BETWEEN ? AND ?
+        GROUP BY workouts.date
+    ''', (max_hr, user_id, first_day, last_day), partitions)
+    loads = np.zeros(last_day - first_day + 1)
+    for rows in batches:
+        if rows:
+            days, values = np.array(rows, dtype=np.float64).T
+            loads += np.bincount(days.astype(np.int64) - first_day, weights=values, minlength=len(loads))
+    return loads
+
+
+def first_workout_day(cursor, user_id):
+    partitions = archive_partitions_for(cursor)
+    batches = run_partitioned(cursor, "SELECT MIN(workouts.date) FROM {workouts} WHERE workouts.user_id = ?",
+                              (user_id,), partitions)
+    days = [rows[0][0] for rows in batches if rows and rows[0][0] is not None]
+    return min(days) if days else None
+
+
+def update_training_load(user_id=DEFAULT_USER_ID, today=None):
+    """Bring the stored daily load, fitness (CTL) and fatigue (ATL) of a profile up to today.
+
+    Only days from the earliest one touched by a workout added since the
+    last update (or marked by invalidate_workout_analytics) are recomputed,
+    continuing the curves from the stored values of the day before. A new
+    maximum heart rate invalidates every zone and rebuilds the whole
+    history. Returns the first day recomputed, or None if nothing changed.
+    """
+    max_hr = max_heart_rate(user_id)
+    today = today if today is not None else to_epoch_day(datetime.datetime.now())
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cache_zones(cursor, user_id, max_hr)
+        conn.commit()
+
+        # Everything is read first: archive partitions cannot be detached
+        # inside the write transaction. Workouts logged meanwhile have ids
+        # above newest_id and are picked up by the next update.
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM workouts")
+        newest_id = cursor.fetchone()[0]
+        cursor.execute('''
+            SELECT max_hr, last_workout_id, dirty_from FROM training_load_state WHERE user_id = ?
+        ''', (user_id,))
+        state = cursor.fetchone()
+
+        ctl = atl = 0.0
+        dirty_from = None
+        if state is None or state[0] != max_hr:
+            from_day = first_workout_day(cursor, user_id)
+            from_day = today if from_day is None else min(from_day, today)
+        else:
+            _, last_workout_id, dirty_from = state
+            # Keeps this a rowid range scan over the new workouts only; plain
+            # user_id or MIN(date) would pull in an index over the whole history
+            cursor.execute('''
+                SELECT MIN(date + 0) FROM workouts WHERE id > ? AND +user_id = ?
+            ''', (last_workout_id, user_id))
+            added_from = cursor.fetchone()[0]
+            cursor.execute("SELECT MAX(day) FROM training_load WHERE user_id = ?", (user_id,))
+            last_day = cursor.fetchone()[0]
+            candidates = [day for day in (dirty_from, added_from) if day is not None]
+            candidates.append(today + 1 if last_day is None else last_day + 1)
+            from_day = min(candidates)
+            if from_day > today and newest_id == last_workout_id and dirty_from is None:
+                return None
+            cursor.execute('''
+                SELECT ctl, atl FROM training_load WHERE user_id = ? AND day < ? ORDER BY day DESC LIMIT 1
+            ''', (user_id, from_day))
+            previous = cursor.fetchone()
+            if previous:
+                ctl, atl = previous
+
+        changed = from_day <= today
+        if changed:
+            loads = daily_loads(cursor, user_id, from_day, today, max_hr)
+            days = np.arange(from_day, today + 1)
+            rows = list(zip([user_id] * len(days), days.tolist(), loads.tolist(),
+                            ewma(loads, CTL_DAYS, ctl).tolist(), ewma(loads, ATL_DAYS, atl).tolist()))
+
+        cursor.execute("BEGIN IMMEDIATE")
+        if changed:
+            cursor.execute("DELETE FROM training_load WHERE user_id = ? AND day >= ?", (user_id, from_day))
+            cursor.executemany('''
+                INSERT INTO training_load (user_id, day, load, ctl, atl) VALUES (?, ?, ?, ?, ?)
+            ''', rows)
+        # A day marked dirty since it was read stays marked for the next update
+        cursor.execute('''
+            INSERT INTO training_load_state (user_id, max_hr, last_workout_id, dirty_from)
+            VALUES (?, ?, ?, NULL)
+            ON CONFLICT (user_id) DO UPDATE SET
+                max_hr = excluded.max_hr,
+                last_workout_id = excluded.last_workout_id,
+                dirty_from = CASE WHEN dirty_from IS ? THEN NULL ELSE dirty_from END
+        ''', (user_id, max_hr, newest_id, dirty_from))
+        conn.commit()
+        return from_day if changed else None
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def get_training_load(start_date=None, user_id=DEFAULT_USER_ID):
+    """Return (days, load, ctl, atl, tsb) arrays from start_date ('YYYY-MM-DD') to today.
+
+    days are epoch days. Form (TSB) is yesterday's fitness minus yesterday's
+    fatigue, the usual reading for how fresh the athlete is today.
+    """
+    update_training_load(user_id)
+    first_day = to_epoch_day(start_date) if start_date else None
+    conn = get_connection()
+    cursor = conn.cursor()
+    query = "SELECT day, load, ctl, atl FROM training_load WHERE user_id = ?"
+    params = [user_id]
+    if first_day is not None:
+        query += " AND day >= ?"
+        params.append(first_day - 1)
+    cursor.execute(query + " ORDER BY day", params)
+    rows = cursor.fetchall()
+    conn.close()
+
+    if not rows:
+        empty = np.zeros(0)
+        return empty.astype(np.int64), empty, empty, empty, empty
+    days, load, ctl, atl = np.array(rows, dtype=np.float64).T
+    tsb = np.concatenate(([0.0], (ctl - atl)[:-1]))
+    keep = slice(1, None) if first_day is not None and days[0] < first_day else slice(None)
+    return days[keep].astype(np.int64), load[keep], ctl[keep], atl[keep], tsb[keep]
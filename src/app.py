@@ -1,7 +1,7 @@
 # Fix the imports at the top of app.py
 from datetime import datetime, timedelta
 import tkinter as tk
-from tkinter import messagebox, ttk, filedialog
+from tkinter import messagebox, ttk, filedialog, simpledialog
 import os
 import json
 import matplotlib.pyplot as plt
@@ -9,18 +9,42 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import calendar
 from PIL import Image, ImageTk
 import webbrowser
-import threading
-import sqlite3
 
 # Remove the dot from relative imports
-from session import Session  # Changed from .session
+from session import Session, SessionRegistry  # Changed from .session
 from workout import Workout  # Changed from .workout
-from database import (create_db, get_sessions, get_session_details,
-                     get_stats_by_workout_type, get_user_profile,
-                     save_user_profile, add_goal, get_trends)
+from database import (create_db, get_sessions, get_session_details, get_user_profile,
+                     save_user_profile, add_goal, get_trends, get_connection,
+                     add_user_profile, get_user_profiles, DEFAULT_USER_ID,
+                     lookup_id, to_epoch_day, to_epoch_seconds, get_personal_records,
+                     update_personal_records, update_activity_calendar, delete_session,
+                     update_workout, delete_workout)
+from query_profiler import profiler
+from replica import replica
+from resize import ResizeManager
+from session_panel import SessionClock, SessionLog
+from tasks import TaskScheduler
+from themes import FONT_SIZES, PALETTES, ThemeManager, chart_style, style_figure
+from chart_figures import chart_figure
+from minicharts import ActivityHeatmap, MiniBars, ProgressRing, Sparkline
+from lag_monitor import LagMonitor
+from viewmodels import (CHART_PERIODS, CHART_TYPES, HEATMAP_METRICS, SUMMARY_PERIODS, HeatmapViewModel,
+                        HistoryViewModel, chart_data, dashboard_data, day_date, format_record, session_detail,
+                        summary_texts, summary_totals)
+from backup import BackupScheduler
+from archive import archive_sessions_before
+from maintenance import MaintenanceScheduler
+from db_writer import DatabaseWriter
+from activity_import import find_activity_files, import_activity_files
+from calories import (estimate_calories as estimate_workout_calories, estimate_many,
+                      profile_body, recompute_estimated_calories)
+
+# Dashboard sparklines: (key of the dashboard trend series, caption)
+TREND_SERIES = [("calories", "Calories"), ("duration", "Minutes"), ("workouts", "Workouts")]
+
+# Length in days of the goals the Set Workout Goal dialog creates
+GOAL_PERIOD_DAYS = {"Daily": 1, "Weekly": 7, "Monthly": 30}
 
-# Initialize the database
-create_db()
 
 def validate_positive_number(value):
     """Validate that the input is a positive number."""
@@ -47,9 +71,37 @@ class FitnessTrackerApp:
         except Exception as e:
             print(f"Could not load icon: {e}")
         
-        self.session = Session()
+        # Every profile on this station can have a session running at the same
+        # time; their writes are batched through one shared writer
+        self.user_id = DEFAULT_USER_ID
+        self.db_writer = DatabaseWriter()
+        self.db_writer.start()
+        self.session_registry = SessionRegistry(self.db_writer)
         self.current_tab = None
         self.chart_instances = {}
+        
+        # Records as last seen, to tell which ones a new workout beat
+        self.personal_records = get_personal_records(self.user_id)
+        self.history_view = HistoryViewModel(self.user_id)
+        self.heatmap_view = HeatmapViewModel(self.user_id)
+        
+        # Event-loop lag watchdog, started from the Help menu or --monitor-lag
+        self.lag_monitor = LagMonitor(root)
+        
+        # Background work; results come back to the Tk thread through its pump
+        self.tasks = TaskScheduler(root)
+        self.tasks.start()
+        
+        # Window resizes are laid out once they settle, not on every <Configure>
+        self.resize_manager = ResizeManager(root)
+        
+        # Periodic database snapshots, driven by the "Auto-backup Data" preference
+        self.backup_scheduler = BackupScheduler(
+            on_complete=lambda path: self.tasks.call_soon(lambda: self.status_bar.config(
+                text=f"Backup saved: {os.path.basename(path)}")),
+            on_error=lambda e: self.tasks.call_soon(lambda: self.status_bar.config(
+                text=f"Backup failed: {e}"))
+        )
 
         # Initialize theme and styles
         self.theme = "light"
@@ -66,6 +118,9 @@ class FitnessTrackerApp:
         # Configure ttk styles
         self.style = ttk.Style()
         self.style.theme_use('clam')
+        self.themes = ThemeManager(self.style, self.accent_colors)
+        self.chart_canvases = []  # live chart canvases, restyled in place on theme changes
+        self.stale_charts = set()
         
         # Create main container with padding
         self.main_container = ttk.Frame(root, padding="10")
@@ -98,8 +153,26 @@ class FitnessTrackerApp:
         # Initialize UI components
         self.setup_ui_components()
         
-        # Apply theme
+        # Apply theme, and compile the other one while idle so the first toggle is instant
         self.apply_theme()
+        self.root.after_idle(self.themes.precompile)
+        
+        # Database housekeeping while the user is idle
+        self.maintenance = MaintenanceScheduler(root)
+        self.maintenance.start()
+        
+        # Put sessions left open by a crash back on the station and offer to resume them
+        self.recovered_sessions = {}
+        self.root.after(0, self.restore_open_sessions)
+
+    @property
+    def session(self):
+        """The current session of the selected profile."""
+        return self.session_registry.get(self.user_id)
+
+    @session.setter
+    def session(self, session):
+        self.session_registry.put(session)
 
     def setup_ui_components(self):
         """Setup all UI components in the correct order."""
@@ -173,9 +246,8 @@ class FitnessTrackerApp:
         
         # Bind events
         self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_change)
-        self.window_width = width
-        self.window_height = height
-        self.root.bind("<Configure>", self.on_window_resize)
+        self.resize_manager.on_settle(self.layout_columns)
+        self.root.bind("<Configure>", self.resize_manager.on_configure)
 
     def create_menu_bar(self):
         """Create the application menu bar."""
@@ -187,6 +259,8 @@ class FitnessTrackerApp:
         file_menu.add_separator()
         file_menu.add_command(label="Export Data", command=self.export_data, accelerator="Ctrl+E")
         file_menu.add_command(label="Import Data", command=self.import_data, accelerator="Ctrl+I")
+        file_menu.add_command(label="Import Activity Files...", command=self.import_activities)
+        file_menu.add_command(label="Import Activity Folder...", command=lambda: self.import_activities(folder=True))
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.quit_app, accelerator="Alt+F4")
         
@@ -207,6 +281,17 @@ class FitnessTrackerApp:
         # Help menu
         help_menu = tk.Menu(menu_bar, tearoff=0)
         help_menu.add_command(label="User Guide", command=lambda: webbrowser.open("https://www.example.com/fitness-guide"))
+        help_menu.add_separator()
+        self.profile_queries_var = tk.BooleanVar(value=profiler.enabled)
+        help_menu.add_checkbutton(label="Profile Database Queries", variable=self.profile_queries_var,
+                                  command=lambda: profiler.configure(enabled=self.profile_queries_var.get()))
+        help_menu.add_command(label="Query Report", command=self.show_query_report)
+        self.monitor_lag_var = tk.BooleanVar(value=self.lag_monitor.running)
+        help_menu.add_checkbutton(label="Monitor UI Responsiveness", variable=self.monitor_lag_var,
+                                  command=self.toggle_lag_monitor)
+        help_menu.add_command(label="Export Responsiveness Report...", command=self.export_lag_report)
+        help_menu.add_command(label="Background Tasks", command=self.show_task_report)
+        help_menu.add_separator()
         help_menu.add_command(label="About", command=self.show_about)
         
         # Add menus to menu bar
@@ -228,6 +313,11 @@ class FitnessTrackerApp:
     def quit_app(self):
         """Close the application with confirmation."""
         if messagebox.askyesno("Exit", "Are you sure you want to exit?"):
+            self.tasks.stop()
+            self.session_clock.stop()
+            self.backup_scheduler.stop()
+            self.maintenance.stop()
+            self.db_writer.stop()
             self.root.quit()
 
     def show_about(self):
@@ -264,25 +354,81 @@ class FitnessTrackerApp:
         # Close button
         ttk.Button(about_window, text="Close", command=about_window.destroy).pack(pady=20)
 
-    def on_window_resize(self, event):
-        """Handle window resize events for responsive UI."""
-        # Only process if this is a root window event
-        if event.widget == self.root:
-            # Check if the size actually changed
-            if self.window_width != event.width or self.window_height != event.height:
-                self.window_width = event.width
-                self.window_height = event.height
-                
-                # Update UI elements as needed
-                # For example, adjust column widths in treeview, etc.
-                if hasattr(self, 'history_tree'):
-                    self.history_tree.column('workouts', width=max(200, event.width - 500))
+    def show_query_report(self):
+        """Show the database query profile in a report window."""
+        report_window = tk.Toplevel(self.root)
+        report_window.title("Query Report")
+        report_window.geometry("900x500")
+        report_window.transient(self.root)
+        
+        report_text = tk.Text(report_window, wrap=tk.NONE, font=("Courier", 9))
+        report_text.insert(tk.END, profiler.format_report())
+        report_text.config(state=tk.DISABLED)
+        
+        scrollbar = ttk.Scrollbar(report_window, orient=tk.VERTICAL, command=report_text.yview)
+        report_text.config(yscrollcommand=scrollbar.set)
+        
+        button_frame = ttk.Frame(report_window)
+        button_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=5)
+        
+        def reset_report():
+            profiler.reset()
+            report_window.destroy()
+        
+        ttk.Button(button_frame, text="Reset", command=reset_report).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(button_frame, text="Close", command=report_window.destroy).pack(side=tk.RIGHT, padx=5)
+        
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        report_text.pack(fill=tk.BOTH, expand=True)
+
+    def show_task_report(self):
+        """Show queue depth and latencies of the background task scheduler."""
+        messagebox.showinfo("Background Tasks", self.tasks.format_report())
+
+    def toggle_lag_monitor(self):
+        """Start or stop the event-loop lag monitor."""
+        if self.monitor_lag_var.get():
+            self.lag_monitor.start()
+            self.status_bar.config(text="UI responsiveness monitoring started")
+        else:
+            self.lag_monitor.stop()
+            self.status_bar.config(text="UI responsiveness monitoring stopped")
+
+    def export_lag_report(self):
+        """Export the event-loop lag summary to a JSON file."""
+        if not self.lag_monitor.lags:
+            messagebox.showinfo("No Data", "Enable 'Monitor UI Responsiveness' from the Help menu first.")
+            return
+        
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            title="Export Responsiveness Report"
+        )
+        if not file_path:
+            return
+        
+        try:
+            self.lag_monitor.export_json(file_path)
+            summary = self.lag_monitor.summary()
+            self.status_bar.config(text=f"Frame lag p50 {summary['p50_ms']:.1f} ms, p95 {summary['p95_ms']:.1f} ms, "
+                                        f"p99 {summary['p99_ms']:.1f} ms - report saved")
+        except OSError as e:
+            self.handle_error(f"Error exporting responsiveness report: {e}")
+
+    def layout_columns(self, width, height):
+        """Fit table columns to the window once it has stopped resizing."""
+        if hasattr(self, 'history_tree'):
+            self.history_tree.column('workouts', width=max(200, width - 500))
 
     def setup_dashboard(self):
         """Set up the dashboard with informative widgets."""
-        # Clear existing widgets first
+        # Clear existing widgets first; the trend charts stay and are updated in place
+        if not hasattr(self, 'trends_panel'):
+            self.setup_trends_panel()
         for widget in self.dashboard_tab.winfo_children():
-            widget.destroy()
+            if widget is not self.trends_panel:
+                widget.destroy()
             
         # Main container for dashboard
         dashboard_container = ttk.Frame(self.dashboard_tab)
@@ -309,6 +455,9 @@ class FitnessTrackerApp:
         )
         welcome_msg.pack(anchor=tk.W, pady=5)
         
+        data = dashboard_data(self.user_id)
+        self.update_trends_panel(data)
+        
         # Quick stats and actions in three columns
         stats_frame = ttk.Frame(dashboard_container)
         stats_frame.pack(fill=tk.BOTH, expand=True, pady=10)
@@ -346,9 +495,7 @@ class FitnessTrackerApp:
         recent_frame = ttk.LabelFrame(stats_frame, text="Recent Activity")
         recent_frame.grid(row=0, column=1, padx=10, pady=10, sticky="nsew")
         
-        # Get recent sessions
-        sessions = get_sessions()
-        if sessions:
+        if data["recent"]:
             # Create a mini treeview for recent sessions
             columns = ('date', 'duration', 'calories')
             recent_tree = ttk.Treeview(recent_frame, columns=columns, show='headings', height=5)
@@ -363,18 +510,9 @@ class FitnessTrackerApp:
             recent_tree.column('duration', width=80)
             recent_tree.column('calories', width=80)
             
-            # Add data
-            for session in reversed(sessions[-5:]):  # Show last 5 sessions
-                session_id = session[0]
-                start_time = session[1]
-                end_time = session[2] if len(session) > 2 else None
-                duration = session[3] if len(session) > 3 else None
-                calories = session[4] if len(session) > 4 else None
-                
-                duration_str = f"{duration:.1f} min" if duration else "Active"
-                calories_str = f"{calories:.1f}" if calories else "-"
-                
-                recent_tree.insert('', tk.END, values=(start_time, duration_str, calories_str))
+            # Newest sessions first
+            for row in data["recent"]:
+                recent_tree.insert('', tk.END, values=row)
                 
             recent_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
             
@@ -391,51 +529,32 @@ class FitnessTrackerApp:
         summary_frame = ttk.LabelFrame(stats_frame, text="Workout Summary")
         summary_frame.grid(row=0, column=2, padx=10, pady=10, sticky="nsew")
         
-        # Calculate total stats
-        total_sessions = len(sessions) if sessions else 0
-        total_duration = 0
-        total_calories = 0
-        
-        for session in sessions:
-            duration = session[3] if len(session) > 3 else None
-            calories = session[4] if len(session) > 4 else None
-            if duration:
-                total_duration += duration
-            if calories:
-                total_calories += calories
-        
         # Display stats with progress indicators
         stats_container = ttk.Frame(summary_frame)
         stats_container.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # Sessions count
         ttk.Label(stats_container, text=f"Total Sessions:").grid(row=0, column=0, sticky=tk.W, pady=2)
-        ttk.Label(stats_container, text=f"{total_sessions}", font=("Helvetica", 12, "bold")).grid(row=0, column=1, sticky=tk.E, pady=2)
+        ttk.Label(stats_container, text=f"{data['total_sessions']}", font=("Helvetica", 12, "bold")).grid(row=0, column=1, sticky=tk.E, pady=2)
         
         # Total duration with bar visualization
         ttk.Label(stats_container, text=f"Total Duration:").grid(row=1, column=0, sticky=tk.W, pady=2)
-        ttk.Label(stats_container, text=f"{total_duration:.1f} min", font=("Helvetica", 12, "bold")).grid(row=1, column=1, sticky=tk.E, pady=2)
+        ttk.Label(stats_container, text=f"{data['total_duration']:.1f} min", font=("Helvetica", 12, "bold")).grid(row=1, column=1, sticky=tk.E, pady=2)
         
         # Calories with visualization
         ttk.Label(stats_container, text=f"Total Calories:").grid(row=2, column=0, sticky=tk.W, pady=2)
-        ttk.Label(stats_container, text=f"{total_calories:.1f}", font=("Helvetica", 12, "bold")).grid(row=2, column=1, sticky=tk.E, pady=2)
+        ttk.Label(stats_container, text=f"{data['total_calories']:.1f}", font=("Helvetica", 12, "bold")).grid(row=2, column=1, sticky=tk.E, pady=2)
         
         # Target section
         ttk.Separator(summary_frame, orient='horizontal').pack(fill=tk.X, pady=5)
         
-        # Get user profile for BMR if available
-        profile = get_user_profile()
-        if profile and profile[6]:  # If BMR is available
-            bmr = profile[6]
-            cal_target = bmr * 0.2  # Example: 20% of BMR as daily exercise target
-            
-            # Calculate progress percentage
-            progress_pct = min(100, int((total_calories / cal_target) * 100)) if cal_target > 0 else 0
-            
-            ttk.Label(summary_frame, text=f"Daily Target: {cal_target:.1f} calories").pack(anchor=tk.W, padx=5)
-            progress = ttk.Progressbar(summary_frame, value=progress_pct, maximum=100, length=200)
+        # Daily target, shown when the profile has a BMR
+        target = data["target"]
+        if target:
+            ttk.Label(summary_frame, text=f"Daily Target: {target['calories']:.1f} calories").pack(anchor=tk.W, padx=5)
+            progress = ttk.Progressbar(summary_frame, value=target["progress_pct"], maximum=100, length=200)
             progress.pack(pady=5, padx=5, fill=tk.X)
-            ttk.Label(summary_frame, text=f"{progress_pct}% of daily target").pack(anchor=tk.E, padx=5)
+            ttk.Label(summary_frame, text=f"{target['progress_pct']}% of daily target").pack(anchor=tk.E, padx=5)
         
         # Configure grid weights for responsive layout
         stats_frame.columnconfigure(0, weight=1)
@@ -447,18 +566,14 @@ class FitnessTrackerApp:
         achievements_frame = ttk.Frame(dashboard_container)
         achievements_frame.pack(fill=tk.X, pady=10)
         
-        # Left: Recent achievements
-        recent_achievements = ttk.LabelFrame(achievements_frame, text="Recent Achievements")
+        # Left: Most recently set personal records
+        recent_achievements = ttk.LabelFrame(achievements_frame, text="Personal Records")
         recent_achievements.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10, pady=5)
         
-        # Example achievements (in a real app, these would be fetched from the database)
-        achievements = [
-            ("First Workout", "Completed your first workout session"),
-            ("Consistency", "Worked out 3 days in a row"),
-            ("Calorie Burner", "Burned over 1000 total calories")
-        ]
+        if not data["records"]:
+            ttk.Label(recent_achievements, text="Log a workout to set your first record").pack(pady=10, padx=10)
         
-        for i, (title, desc) in enumerate(achievements):
+        for text, date in data["records"]:
             achievement_frame = ttk.Frame(recent_achievements)
             achievement_frame.pack(fill=tk.X, padx=5, pady=2)
             
@@ -470,37 +585,93 @@ class FitnessTrackerApp:
             
             ttk.Label(
                 achievement_frame,
-                text=title,
+                text=text,
                 font=("Helvetica", 10, "bold")
             ).pack(side=tk.LEFT, anchor=tk.W)
+            
+            ttk.Label(achievement_frame, text=date).pack(side=tk.RIGHT, padx=5)
         
         # Right: Current goals
         current_goals = ttk.LabelFrame(achievements_frame, text="Current Goals")
         current_goals.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=10, pady=5)
         
-        # Example goals (would normally come from database)
-        goals = [
-            ("Weekly", "Complete 4 workouts this week", 75),
-            ("Monthly", "Burn 5000 calories in a month", 30),
-        ]
+        if not data["goals"]:
+            ttk.Label(current_goals, text="Set a goal to track your progress here").pack(pady=10, padx=10)
         
-        for goal_type, goal_desc, progress in goals:
+        for goal_type, goal_desc, progress in data["goals"]:
             goal_frame = ttk.Frame(current_goals)
             goal_frame.pack(fill=tk.X, pady=5, padx=5)
             
             ttk.Label(goal_frame, text=goal_type, width=10).pack(side=tk.LEFT)
             ttk.Label(goal_frame, text=goal_desc).pack(side=tk.LEFT, fill=tk.X, expand=True)
             
-            progress_frame = ttk.Frame(goal_frame)
-            progress_frame.pack(side=tk.RIGHT, padx=5)
-            
-            progress_bar = ttk.Progressbar(progress_frame, value=progress, length=100)
-            progress_bar.pack(side=tk.LEFT)
-            ttk.Label(progress_frame, text=f"{progress}%").pack(side=tk.RIGHT)
+            ring = ProgressRing(goal_frame, size=40, thickness=4, color=self.themes.accent,
+                                background=PALETTES[self.theme]["background"], font=("Helvetica", 8, "bold"))
+            ring.set_text_color(PALETTES[self.theme]["foreground"])
+            ring.set_value(progress)
+            ring.pack(side=tk.RIGHT, padx=5)
         
         # Update status
         self.status_bar.config(text="Dashboard refreshed")
 
+    def setup_trends_panel(self):
+        """Create the dashboard's 30 day sparklines, weekly bars and target ring, kept across refreshes."""
+        palette = PALETTES[self.theme]
+        accent = self.themes.accent
+        
+        # Packed at the bottom first, so the rebuilt dashboard above it keeps the rest of the tab
+        self.trends_panel = ttk.LabelFrame(self.dashboard_tab, text="Last 30 Days")
+        self.trends_panel.pack(side=tk.BOTTOM, fill=tk.X, padx=20, pady=(0, 20))
+        
+        self.sparklines = {}
+        for column, (key, title) in enumerate(TREND_SERIES):
+            frame = ttk.Frame(self.trends_panel)
+            frame.grid(row=0, column=column, padx=10, pady=5, sticky=tk.W)
+            caption = tk.StringVar(value=title)
+            ttk.Label(frame, textvariable=caption).pack(anchor=tk.W)
+            sparkline = Sparkline(frame, color=accent, background=palette["background"])
+            sparkline.pack(anchor=tk.W)
+            self.sparklines[key] = (sparkline, caption)
+        
+        frame = ttk.Frame(self.trends_panel)
+        frame.grid(row=0, column=len(TREND_SERIES), padx=10, pady=5, sticky=tk.W)
+        ttk.Label(frame, text="Calories, last 7 days").pack(anchor=tk.W)
+        self.week_bars = MiniBars(frame, width=120, height=36, color=accent, background=palette["background"])
+        self.week_bars.pack(anchor=tk.W)
+        
+        self.target_ring = ProgressRing(self.trends_panel, color=accent, background=palette["background"])
+        self.target_ring.set_text_color(palette["foreground"])
+        self.target_ring.grid(row=0, column=len(TREND_SERIES) + 1, padx=10, pady=5)
+        
+        self.mini_charts = [sparkline for sparkline, _ in self.sparklines.values()] + [self.week_bars, self.target_ring]
+    
+    def update_trends_panel(self, data):
+        """Move the trend charts to the latest dashboard data without recreating them."""
+        trend = data["trend"]
+        for key, title in TREND_SERIES:
+            sparkline, caption = self.sparklines[key]
+            values = trend[key]
+            sparkline.set_values(values)
+            caption.set(f"{title}: {sum(values):.0f} (today {values[-1]:.0f})")
+        
+        target = data["target"]
+        self.week_bars.set_values(trend["calories"][-7:], target=target["calories"] if target else None)
+        self.target_ring.set_value(target["progress_pct"] if target else 0)
+
+    def check_personal_records(self):
+        """Announce records beaten since the last check, if Goal Achievements notifications are on."""
+        records = get_personal_records(self.user_id)
+        beaten = [(key, value) for key, (value, _, _) in records.items()
+                  if key in self.personal_records and value > self.personal_records[key][0]]
+        self.personal_records = records
+        if not beaten:
+            return
+        
+        lines = [f"{workout_type}: {format_record(metric, value)}" for (workout_type, metric), value in beaten]
+        self.status_bar.config(text=f"New personal record - {lines[0]}")
+        if self.goal_notify_var.get():
+            messagebox.showinfo("New Personal Record", "\n".join(lines))
+
     def on_tab_change(self, event):
         """Handle tab changes to update content as needed."""
         tab_id = self.notebook.select()
@@ -513,43 +684,40 @@ class FitnessTrackerApp:
         elif tab_name == "Session":
             self.update_session_status()  # Update session status display
     def update_session_status(self):
-        """Update the session status information."""
-        if hasattr(self, 'session_status_var'):
-            if self.session.is_active:
-                elapsed = datetime.now() - self.session.start_time
-                elapsed_str = str(elapsed).split('.')[0]  # Remove microseconds
-                self.session_status_var.set(f"Session active - started at {self.session.start_time.strftime('%H:%M:%S')} (Elapsed: {elapsed_str})")
-            else:
-                self.session_status_var.set("No active session")
+        """Point the session clock at the current session."""
+        if hasattr(self, 'session_clock'):
+            self.session_clock.set_session(self.session)
 
     def refresh_stats(self):
-        """Refresh all statistics data."""
+        """Refresh all statistics data in the background; a newer refresh supersedes a pending one."""
         self.status_bar.config(text="Refreshing statistics...")
         
         # Start progress indicator
         self.progress_bar.pack(side=tk.RIGHT, padx=5)
         self.progress_bar.start(10)
         
-        # Use a thread to prevent UI freezing during refresh
-        def refresh_task():
-            try:
-                # Update summary stats if tab exists
-                if hasattr(self, 'summary_content_frame'):
-                    current_period = getattr(self, 'current_period', "All Time")
-                    self.update_summary_stats(current_period)
-                
-                # Reload history
-                if hasattr(self, 'history_tree'):
-                    self.load_history()
-                
-                # Call finish_refresh on success
-                self.root.after(0, self.finish_refresh)
-            except Exception as e:
-                # Only reference e inside the exception handler
-                error_msg = f"Error refreshing stats: {e}"
-                self.root.after(0, lambda: self.handle_error(error_msg))
+        period = self.summary_period_var.get() if hasattr(self, 'summary_period_var') else "All Time"
+        user_id = self.user_id
         
-        threading.Thread(target=refresh_task, daemon=True).start()
+        def refresh_task():
+            # An explicit refresh shows every write, however recent
+            replica.invalidate()
+            totals = summary_totals(period, user_id)
+            rows = self.history_view.load(user_id)
+            return totals, rows
+        
+        def finish(result):
+            totals, rows = result
+            self.show_summary_stats(totals)
+            if hasattr(self, 'history_tree'):
+                self.show_history(rows)
+            if hasattr(self, 'heatmap'):
+                self.heatmap_view.invalidate()
+                self.load_heatmap()
+            self.finish_refresh()
+        
+        self.tasks.submit("refresh", refresh_task, on_done=finish,
+                          on_error=lambda e: self.handle_error(f"Error refreshing stats: {e}"))
 
     def finish_refresh(self):
         """Complete the refresh operation."""
@@ -583,57 +751,57 @@ class FitnessTrackerApp:
             self.status_bar.config(text="Export cancelled")
             return
             
+        user_id = self.user_id
+        
         def export_task():
-            try:
-                # Get all data
-                sessions = get_sessions()
-                data = []
+            # Get all data
+            sessions = get_sessions(user_id=user_id)
+            data = []
+            
+            for session in sessions:
+                session_id = session[0]
+                start_time = session[1]
+                end_time = session[2] if len(session) > 2 else None
+                duration = session[3] if len(session) > 3 else None
+                calories = session[4] if len(session) > 4 else None
+                workouts = get_session_details(session_id)
+                
+                session_data = {
+                    "id": session_id,
+                    "start_time": start_time,
+                    "end_time": end_time,
+                    "duration": duration,
+                    "calories": calories,
+                    "workouts": []
+                }
                 
-                for session in sessions:
-                    session_id = session[0]
-                    start_time = session[1]
-                    end_time = session[2] if len(session) > 2 else None
-                    duration = session[3] if len(session) > 3 else None
-                    calories = session[4] if len(session) > 4 else None
-                    workouts = get_session_details(session_id)
+                for workout in workouts:
+                    workout_type, duration, calories = workout[:3]
+                    intensity = workout[3] if len(workout) > 3 else "Medium"
+                    notes = workout[4] if len(workout) > 4 else ""
                     
-                    session_data = {
-                        "id": session_id,
-                        "start_time": start_time,
-                        "end_time": end_time,
+                    workout_data = {
+                        "type": workout_type,
                         "duration": duration,
                         "calories": calories,
-                        "workouts": []
+                        "intensity": intensity,
+                        "notes": notes
                     }
-                    
-                    for workout in workouts:
-                        workout_type, duration, calories = workout[:3]
-                        intensity = workout[3] if len(workout) > 3 else "Medium"
-                        notes = workout[4] if len(workout) > 4 else ""
-                        
-                        workout_data = {
-                            "type": workout_type,
-                            "duration": duration,
-                            "calories": calories,
-                            "intensity": intensity,
-                            "notes": notes
-                        }
-                        session_data["workouts"].append(workout_data)
-                    
-                    data.append(session_data)
-                
-                # Determine export format based on file extension
-                if file_path.lower().endswith('.csv'):
-                    self.export_as_csv(data, file_path)
-                else:  # Default to JSON
-                    with open(file_path, 'w') as f:
-                        json.dump(data, f, indent=2)
+                    session_data["workouts"].append(workout_data)
                 
-                self.root.after(0, lambda: self.finish_export(file_path))
-            except Exception as e:
-                self.root.after(0, lambda: self.handle_error(f"Error exporting data: {e}"))
-        
-        threading.Thread(target=export_task, daemon=True).start()
+                data.append(session_data)
+            
+            # Determine export format based on file extension
+            if file_path.lower().endswith('.csv'):
+                self.export_as_csv(data, file_path)
+            else:  # Default to JSON
+                with open(file_path, 'w') as f:
+                    json.dump(data, f, indent=2)
+            return file_path
+        
+        # Exports to different files queue up behind each other instead of cancelling
+        self.tasks.submit("export", export_task, on_done=self.finish_export, supersede=False,
+                          on_error=lambda e: self.handle_error(f"Error exporting data: {e}"))
 
     def export_as_csv(self, data, file_path):
         """Export data in CSV format."""
@@ -697,81 +865,157 @@ class FitnessTrackerApp:
         self.progress_bar.pack(side=tk.RIGHT, padx=5)
         self.progress_bar.start(10)
         
-        def import_task():
+        user_id = self.user_id
+        
+        def read_task():
+            with open(file_path, 'r') as f:
+                return json.load(f)
+        
+        def write_task(data):
+            # Body weight for workouts imported without calories
+            weight_kg, bmr = profile_body(user_id)
+            
+            # Create a connection to the database
+            conn = get_connection()
+            cursor = conn.cursor()
+            
             try:
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-                    
-                # Confirm import
-                result = messagebox.askyesno(
-                    "Import Confirmation", 
-                    f"Import {len(data)} sessions? This may duplicate data if sessions already exist."
-                )
-                
-                if not result:
-                    self.root.after(0, lambda: self.status_bar.config(text="Import cancelled"))
-                    self.root.after(0, lambda: self.progress_bar.stop())
-                    self.root.after(0, lambda: self.progress_bar.pack_forget())
-                    return
+                # Start transaction
+                cursor.execute("BEGIN TRANSACTION")
                 
-                # Create a connection to the database
-                conn = sqlite3.connect('fitness_tracker.db')
-                cursor = conn.cursor()
-                
-                try:
-                    # Start transaction
-                    cursor.execute("BEGIN TRANSACTION")
+                # Import each session
+                workout_ids = []
+                for session_data in data:
+                    # Add session
+                    cursor.execute('''
+                        INSERT INTO sessions (start_time, end_time, total_duration, total_calories, user_id)
+                        VALUES (?, ?, ?, ?, ?)
+                    ''', (
+                        to_epoch_seconds(session_data["start_time"]),
+                        to_epoch_seconds(session_data["end_time"]),
+                        session_data["duration"],
+                        session_data["calories"],
+                        user_id
+                    ))
                     
-                    # Import each session
-                    for session_data in data:
-                        # Add session
-                        cursor.execute('''
-                            INSERT INTO sessions (start_time, end_time, total_duration, total_calories)
-                            VALUES (?, ?, ?, ?)
-                        ''', (
-                            session_data["start_time"],
-                            session_data["end_time"],
-                            session_data["duration"],
-                            session_data["calories"]
-                        ))
-                        
-                        session_id = cursor.lastrowid
-                        
-                        # Import workouts
-                        for workout_data in session_data["workouts"]:
-                            intensity = workout_data.get("intensity", "Medium")
-                            notes = workout_data.get("notes", "")
-                            
-                            cursor.execute('''
-                                INSERT INTO workouts (workout_type, duration, calories_burned, session_id, date, notes, intensity)
-                                VALUES (?, ?, ?, ?, ?, ?, ?)
-                            ''', (
-                                workout_data["type"],
-                                workout_data["duration"],
-                                workout_data["calories"],
-                                session_id,
-                                session_data["start_time"].split()[0],  # Extract just the date part
-                                notes,
-                                intensity
-                            ))
-                    
-                    # Commit transaction
-                    conn.commit()
-                    
-                    self.root.after(0, lambda: self.finish_import(len(data)))
+                    session_id = cursor.lastrowid
                     
-                except Exception as e:
-                    # Roll back on any error
-                    conn.rollback()
-                    raise e
+                    # Import workouts
+                    workouts = session_data["workouts"]
                     
-                finally:
-                    conn.close()
+                    # Estimate missing calories for the whole session in one pass
+                    estimates = estimate_many(
+                        [(w["type"], w.get("intensity", "Medium"), w["duration"]) for w in workouts],
+                        weight_kg, bmr
+                    )
                     
+                    for workout_data, estimate in zip(workouts, estimates):
+                        intensity = workout_data.get("intensity", "Medium")
+                        notes = workout_data.get("notes", "")
+                        calories = workout_data.get("calories")
+                        
+                        cursor.execute('''
+                            INSERT INTO workouts (type_id, duration, calories_burned, session_id, date, notes, intensity_id,
+                                                  calories_estimated, user_id)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ''', (
+                            lookup_id(cursor, "workout_types", workout_data["type"]),
+                            workout_data["duration"],
+                            estimate if calories is None else calories,
+                            session_id,
+                            to_epoch_day(session_data["start_time"]),  # Day of the session start
+                            notes,
+                            lookup_id(cursor, "intensities", intensity),
+                            1 if calories is None else 0,
+                            user_id
+                        ))
+                        workout_ids.append(cursor.lastrowid)
+                
+                update_personal_records(cursor, workout_ids)
+                update_activity_calendar(cursor, workout_ids)
+                
+                # Commit transaction
+                conn.commit()
+                
+                return len(data)
+                
             except Exception as e:
-                self.root.after(0, lambda: self.handle_error(f"Error importing data: {e}"))
+                # Roll back on any error
+                conn.rollback()
+                raise e
+                
+            finally:
+                conn.close()
+        
+        def confirm(data):
+            # Asked here on the Tk thread, never from a worker
+            if not messagebox.askyesno(
+                "Import Confirmation", 
+                f"Import {len(data)} sessions? This may duplicate data if sessions already exist."
+            ):
+                self.status_bar.config(text="Import cancelled")
+                self.progress_bar.stop()
+                self.progress_bar.pack_forget()
+                return
+            self.tasks.submit("import", write_task, data, on_done=self.finish_import, supersede=False,
+                              on_error=report_error)
+        
+        def report_error(e):
+            self.handle_error(f"Error importing data: {e}")
+        
+        self.tasks.submit("import", read_task, on_done=confirm, supersede=False, on_error=report_error)
+
+    def import_activities(self, folder=False):
+        """Import GPX, TCX and FIT-CSV activity files, each as a finished session."""
+        if folder:
+            directory = filedialog.askdirectory(title="Import Activity Folder")
+            paths = find_activity_files(directory) if directory else []
+        else:
+            paths = filedialog.askopenfilenames(
+                filetypes=[("Activity files", "*.gpx *.tcx *.csv"), ("GPX files", "*.gpx"),
+                           ("TCX files", "*.tcx"), ("FIT CSV files", "*.csv")],
+                title="Import Activity Files"
+            )
         
-        threading.Thread(target=import_task, daemon=True).start()
+        if not paths:
+            return
+        
+        self.status_bar.config(text=f"Importing {len(paths)} activity files...")
+        self.progress_bar.pack(side=tk.RIGHT, padx=5)
+        self.progress_bar.start(10)
+        user_id = self.user_id
+        
+        def report_progress(done, total):
+            self.tasks.call_soon(lambda: self.status_bar.config(text=f"Importing activity files... {done}/{total}"))
+        
+        self.tasks.submit("activity-import", import_activity_files, paths, user_id=user_id, progress=report_progress,
+                          on_done=self.finish_activity_import, supersede=False,
+                          on_error=lambda e: self.handle_error(f"Error importing activity files: {e}"))
+
+    def finish_activity_import(self, summary):
+        """Complete the activity import and report skipped files."""
+        self.progress_bar.stop()
+        self.progress_bar.pack_forget()
+        self.status_bar.config(text=f"Imported {summary['imported']} activities")
+        message = f"Imported {summary['imported']} of {summary['files']} activity files."
+        if summary["duplicates"]:
+            message += f"\n{summary['duplicates']} were already imported."
+        if summary["failed"]:
+            message += f"\n{len(summary['failed'])} could not be read:\n"
+            message += "\n".join(f"{os.path.basename(path)}: {error}" for path, error in summary["failed"][:10])
+        messagebox.showinfo("Import Activities", message)
+        self.check_personal_records()
+        self.setup_dashboard()
+
+    def recompute_calories(self):
+        """Re-estimate calories of past workouts in the background."""
+        self.status_bar.config(text="Updating calorie estimates...")
+        user_id = self.user_id
+        
+        self.tasks.submit("calories", recompute_estimated_calories, user_id=user_id,
+                          on_done=lambda updated: self.status_bar.config(
+                              text=f"Updated calorie estimates for {updated} workouts"),
+                          on_error=lambda e: self.handle_error(f"Error updating calorie estimates: {e}"))
 
     def finish_import(self, count):
         """Complete the import process."""
@@ -779,6 +1023,7 @@ class FitnessTrackerApp:
         self.progress_bar.pack_forget()
         self.status_bar.config(text=f"Imported {count} sessions")
         messagebox.showinfo("Import Successful", f"Imported {count} sessions")
+        self.check_personal_records()
 
     def setup_session_tab(self):
         """Set up the session management tab."""
@@ -810,6 +1055,13 @@ class FitnessTrackerApp:
         self.session_status_label = ttk.Label(status_frame, textvariable=self.session_status_var)
         self.session_status_label.pack(padx=10, pady=10, anchor=tk.W)
         
+        # Elapsed time ticks only while this tab is on screen
+        self.session_clock = SessionClock(self.session_status_label, self.session_status_var)
+        self.session_tab.bind("<Map>", self.session_clock.visibility_changed)
+        self.session_tab.bind("<Unmap>", self.session_clock.visibility_changed)
+        self.root.bind("<Map>", lambda e: e.widget is self.root and self.session_clock.visibility_changed(), add="+")
+        self.root.bind("<Unmap>", lambda e: e.widget is self.root and self.session_clock.visibility_changed(), add="+")
+        
         # Session details
         details_frame = ttk.LabelFrame(self.session_tab, text="Session Details")
         details_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
@@ -822,6 +1074,7 @@ class FitnessTrackerApp:
         details_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.details_text.config(yscrollcommand=details_scrollbar.set)
         details_scrollbar.config(command=self.details_text.yview)
+        self.session_log = SessionLog(self.details_text)
     
     def setup_stats_tab(self):
         """Set up the statistics tab."""
@@ -848,9 +1101,13 @@ class FitnessTrackerApp:
         # History tab
         history_tab = ttk.Frame(self.stats_notebook)
         
+        # Activity calendar tab
+        activity_tab = ttk.Frame(self.stats_notebook)
+        
         self.stats_notebook.add(summary_tab, text="Summary")
         self.stats_notebook.add(charts_tab, text="Charts")
         self.stats_notebook.add(history_tab, text="History")
+        self.stats_notebook.add(activity_tab, text="Activity")
         
         # Summary tab content
         self.setup_summary_tab(summary_tab)
@@ -860,6 +1117,9 @@ class FitnessTrackerApp:
         
         # History tab content
         self.setup_history_tab(history_tab)
+        
+        # Activity calendar content
+        self.setup_heatmap_tab(activity_tab)
     
     def setup_summary_tab(self, parent):
         """Set up the summary statistics tab."""
@@ -873,16 +1133,16 @@ class FitnessTrackerApp:
         
         ttk.Label(period_frame, text="Time Period:").pack(side=tk.LEFT, padx=5)
         
-        period_var = tk.StringVar(value="All Time")
+        self.summary_period_var = tk.StringVar(value="All Time")
         period_combo = ttk.Combobox(
             period_frame, 
-            textvariable=period_var,
-            values=["This Week", "This Month", "This Year", "All Time"],
+            textvariable=self.summary_period_var,
+            values=SUMMARY_PERIODS,
             state="readonly",
             width=15
         )
         period_combo.pack(side=tk.LEFT, padx=5)
-        period_combo.bind("<<ComboboxSelected>>", lambda e: self.update_summary_stats(period_var.get()))
+        period_combo.bind("<<ComboboxSelected>>", lambda e: self.update_summary_stats(self.summary_period_var.get()))
         
         # Create StringVars for stats
         self.total_sessions_var = tk.StringVar(value="0")
@@ -936,78 +1196,23 @@ class FitnessTrackerApp:
     
     def update_summary_stats(self, period):
         """Update the summary statistics based on the selected time period."""
-        try:
-            # Clear existing values
-            self.total_sessions_var.set("0")
-            self.total_workouts_var.set("0")
-            self.total_duration_var.set("0.0")
-            self.total_calories_var.set("0.0")
-            self.avg_duration_var.set("0.0")
-            self.avg_calories_var.set("0.0")
-            
-            # Get date range based on period
-            end_date = datetime.now()
-            start_date = None
-            
-            if period == "This Week":
-                start_date = end_date - timedelta(days=7)
-            elif period == "This Month":
-                start_date = end_date - timedelta(days=30)
-            elif period == "This Year":
-                start_date = end_date - timedelta(days=365)
-            
-            # Convert dates to string format for database query
-            start_date_str = start_date.strftime('%Y-%m-%d') if start_date else None
-            end_date_str = end_date.strftime('%Y-%m-%d')
-            
-            # Get sessions
-            sessions = get_sessions(start_date_str, end_date_str)
-            
-            if not sessions:
-                return
-            
-            # Initialize counters
-            total_sessions = len(sessions)
-            total_workouts = 0
-            total_duration = 0
-            total_calories = 0
-            
-            # Process each session
-            for session in sessions:
-                session_id = session[0]
-                
-                try:
-                    # Get session duration and calories from the session record
-                    session_duration = session[3] or 0
-                    session_calories = session[4] or 0
-                    
-                    # Add to totals
-                    total_duration += session_duration
-                    total_calories += session_calories
-                    
-                    # Get workouts for this session
-                    workouts = get_session_details(session_id)
-                    total_workouts += len(workouts)
-                except Exception as e:
-                    print(f"Error processing session {session_id}: {e}")
-                    continue
-            
-            # Calculate averages
-            avg_duration = total_duration / total_sessions if total_sessions > 0 else 0
-            avg_calories = total_calories / total_sessions if total_sessions > 0 else 0
-            
-            # Update UI
-            self.total_sessions_var.set(str(total_sessions))
-            self.total_workouts_var.set(str(total_workouts))
-            self.total_duration_var.set(f"{total_duration:.1f}")
-            self.total_calories_var.set(f"{total_calories:.1f}")
-            self.avg_duration_var.set(f"{avg_duration:.1f}")
-            self.avg_calories_var.set(f"{avg_calories:.1f}")
-
-        except Exception as e:
+        def report_error(e):
             self.handle_error(f"Error updating statistics: {e}")
             # Log error for debugging
             print(f"Error updating summary stats: {e}")
+        
+        self.tasks.submit("summary", summary_totals, period, self.user_id,
+                          on_done=self.show_summary_stats, on_error=report_error)
+    
+    def show_summary_stats(self, totals):
+        """Show summary totals in the statistics labels."""
+        texts = summary_texts(totals)
+        self.total_sessions_var.set(texts["total_sessions"])
+        self.total_workouts_var.set(texts["total_workouts"])
+        self.total_duration_var.set(texts["total_duration"])
+        self.total_calories_var.set(texts["total_calories"])
+        self.avg_duration_var.set(texts["avg_duration"])
+        self.avg_calories_var.set(texts["avg_calories"])
 
     def setup_charts_tab(self, parent):
         """Set up charts tab with visualization of workout data."""
@@ -1017,15 +1222,14 @@ class FitnessTrackerApp:
         
         ttk.Label(controls_frame, text="Chart Type:").pack(side=tk.LEFT, padx=5)
         
-        chart_types = ["Calories by Workout Type", "Duration by Workout Type", 
-                      "Workout Frequency", "Progress Over Time"]
+        chart_types = CHART_TYPES
         chart_var = tk.StringVar(value=chart_types[0])
         chart_combo = ttk.Combobox(controls_frame, textvariable=chart_var, values=chart_types, state="readonly")
         chart_combo.pack(side=tk.LEFT, padx=5)
         
         ttk.Label(controls_frame, text="Time Period:").pack(side=tk.LEFT, padx=5)
         
-        period_types = ["Last 7 Days", "Last 30 Days", "This Month", "This Year", "All Time"]
+        period_types = CHART_PERIODS
         period_var = tk.StringVar(value=period_types[1])
         period_combo = ttk.Combobox(controls_frame, textvariable=period_var, values=period_types, state="readonly")
         period_combo.pack(side=tk.LEFT, padx=5)
@@ -1043,113 +1247,33 @@ class FitnessTrackerApp:
 
     def update_chart(self, chart_type, period, container):
         """Update the chart based on selection."""
+        self.tasks.submit("chart", chart_data, chart_type, period, self.user_id,
+                          on_done=lambda data: self.render_chart(container, data),
+                          on_error=lambda e: self.handle_error(f"Error updating chart: {e}"))
+
+    def render_chart(self, container, data):
+        """Draw chart data from chart_data() into container."""
         # Clear existing chart
         for widget in container.winfo_children():
             widget.destroy()
         
-        # Get date range based on period
-        end_date = datetime.now()
-        if period == "Last 7 Days":
-            start_date = end_date - timedelta(days=7)
-        elif period == "Last 30 Days":
-            start_date = end_date - timedelta(days=30)
-        elif period == "This Month":
-            start_date = datetime(end_date.year, end_date.month, 1)
-        elif period == "This Year":
-            start_date = datetime(end_date.year, 1, 1)
-        else:  # All Time
-            start_date = None
-        
-        # Fetch data
-        if start_date:
-            start_str = start_date.strftime('%Y-%m-%d')
-            end_str = end_date.strftime('%Y-%m-%d')
-            stats = get_stats_by_workout_type(start_str, end_str)
-        else:
-            stats = get_stats_by_workout_type()
-        
         # Adjust for empty dataset
-        if not stats:
+        if data["kind"] == "empty":
             empty_label = ttk.Label(container, text="No data available for the selected period", 
                                    font=("Helvetica", 14))
             empty_label.pack(expand=True)
             return
         
-        # Create figure and axis
-        fig = plt.Figure(figsize=(10, 6), dpi=100, tight_layout=True)
-        ax = fig.add_subplot(111)
-        
-        # Get data for chart
-        workout_types = [stat[0] for stat in stats]
-        
-        if chart_type == "Calories by Workout Type":
-            values = [stat[4] for stat in stats]  # total_calories
-            title = "Calories Burned by Workout Type"
-            ylabel = "Calories"
-            
-            # Create bar chart
-            bars = ax.bar(workout_types, values)
-            
-            # Customize
-            ax.set_title(title, fontsize=14)
-            ax.set_xlabel("Workout Type", fontsize=12)
-            ax.set_ylabel(ylabel, fontsize=12)
-            ax.grid(axis='y', linestyle='--', alpha=0.7)
-            
-            # Add value labels on bars
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height,
-                        f'{height:.1f}',
-                        ha='center', va='bottom', fontsize=10)
-                        
-        elif chart_type == "Duration by Workout Type":
-            values = [stat[2] for stat in stats]  # total_duration
-            title = "Duration by Workout Type"
-            ylabel = "Duration (minutes)"
-            
-            # Create bar chart
-            bars = ax.bar(workout_types, values)
-            
-            # Customize
-            ax.set_title(title, fontsize=14)
-            ax.set_xlabel("Workout Type", fontsize=12)
-            ax.set_ylabel(ylabel, fontsize=12)
-            ax.grid(axis='y', linestyle='--', alpha=0.7)
-            
-            # Add value labels on bars
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height,
-                        f'{height:.1f}',
-                        ha='center', va='bottom', fontsize=10)
-                        
-        elif chart_type == "Workout Frequency":
-            values = [stat[1] for stat in stats]  # count
-            title = "Workout Frequency by Type"
-            ylabel = "Count"
-            
-            # Create pie chart
-            ax.pie(values, labels=workout_types, autopct='%1.1f%%',
-                   startangle=90, shadow=True)
-            ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
-            ax.set_title(title, fontsize=14)
-            
-        elif chart_type == "Progress Over Time":
-            # For this chart, we need different data - workouts over time
-            if start_date:
-                ax.text(0.5, 0.5, "Progress Over Time chart requires\ndata analysis over multiple sessions",
-                       horizontalalignment='center', verticalalignment='center',
-                       transform=ax.transAxes, fontsize=12)
-            else:
-                ax.text(0.5, 0.5, "Select a specific date range for this chart",
-                       horizontalalignment='center', verticalalignment='center',
-                       transform=ax.transAxes, fontsize=12)
+        with plt.rc_context(chart_style(self.theme)):
+            fig = chart_figure(data)
         
         # Create canvas and add to container
         canvas = FigureCanvasTkAgg(fig, master=container)
         canvas.draw()
+        self.resize_manager.defer_canvas(canvas.get_tk_widget(), canvas.resize)
+        canvas.get_tk_widget().bind("<Map>", lambda e: self.redraw_stale_chart(canvas))
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.chart_canvases.append(canvas)
 
     def setup_history_tab(self, parent):
         """Set up the history tab with session records."""
@@ -1198,64 +1322,114 @@ class FitnessTrackerApp:
         self.load_history()
     
     def load_history(self):
-        """Load session history into the table."""
-        # Clear existing items
-        for item in self.history_tree.get_children():
-            self.history_tree.delete(item)
+        """Load session history into the table in the background."""
+        self.tasks.submit("history", self.history_view.load, self.user_id, on_done=self.show_history,
+                          on_error=lambda e: self.handle_error(f"Error loading history: {e}"))
+    
+    def setup_heatmap_tab(self, parent):
+        """Set up the activity calendar: a year of days shaded by the chosen metric."""
+        controls_frame = ttk.Frame(parent)
+        controls_frame.pack(fill=tk.X, padx=10, pady=10)
         
-        # Get all sessions
-        sessions = get_sessions()
+        self.heatmap_prev_button = ttk.Button(controls_frame, text="<", width=3,
+                                              command=lambda: self.change_heatmap_year(-1))
+        self.heatmap_prev_button.pack(side=tk.LEFT)
+        self.heatmap_year_var = tk.StringVar()
+        ttk.Label(controls_frame, textvariable=self.heatmap_year_var, width=6, anchor=tk.CENTER,
+                  font=("Helvetica", 12, "bold")).pack(side=tk.LEFT, padx=5)
+        self.heatmap_next_button = ttk.Button(controls_frame, text=">", width=3,
+                                              command=lambda: self.change_heatmap_year(1))
+        self.heatmap_next_button.pack(side=tk.LEFT)
+        
+        ttk.Label(controls_frame, text="Show:").pack(side=tk.LEFT, padx=(20, 5))
+        self.heatmap_metric_var = tk.StringVar(value=HEATMAP_METRICS[0][0])
+        metric_combo = ttk.Combobox(controls_frame, textvariable=self.heatmap_metric_var, state="readonly",
+                                    values=[label for label, _, _ in HEATMAP_METRICS], width=10)
+        metric_combo.pack(side=tk.LEFT, padx=5)
+        metric_combo.bind("<<ComboboxSelected>>", lambda e: self.show_heatmap())
+        
+        palette = PALETTES[self.theme]
+        self.heatmap = ActivityHeatmap(parent, palette["heatmap"], on_hover=self.show_heatmap_day,
+                                       background=palette["background"])
+        self.heatmap.pack(padx=10, pady=5, anchor=tk.W)
+        
+        self.heatmap_summary_var = tk.StringVar()
+        ttk.Label(parent, textvariable=self.heatmap_summary_var).pack(padx=10, pady=5, anchor=tk.W)
+        self.heatmap_day_var = tk.StringVar()
+        ttk.Label(parent, textvariable=self.heatmap_day_var).pack(padx=10, anchor=tk.W)
+        
+        self.heatmap_year = datetime.now().year
+        self.heatmap_years = [self.heatmap_year]
+        self.heatmap_data = None
+        self.load_heatmap()
+    
+    def load_heatmap(self):
+        """Read the profile's activity years and the shown year in the background."""
+        view, year = self.heatmap_view, self.heatmap_year
         
-        for session in sessions:
-            session_id = session[0]
-            start_time = session[1]
-            end_time = session[2] if len(session) > 2 else None
-            duration = session[3] if len(session) > 3 else None
-            calories = session[4] if len(session) > 4 else None
-            
-            # Get workouts for this session
-            workouts = get_session_details(session_id)
-            workout_types = [w[0] for w in workouts]
-            workout_summary = ", ".join(workout_types) if workout_types else "No workouts"
-            
-            # Format values
-            duration_str = f"{duration:.1f}" if duration else "-"
-            calories_str = f"{calories:.1f}" if calories else "-"
-            
-            self.history_tree.insert('', tk.END, values=(session_id, start_time, duration_str, calories_str, workout_summary))
+        def load_task():
+            view.load(year)
+            return view.years()
+        
+        def finish(years):
+            self.heatmap_years = years
+            self.show_heatmap()
+        
+        self.tasks.submit("heatmap", load_task, on_done=finish,
+                          on_error=lambda e: self.handle_error(f"Error loading activity calendar: {e}"))
+    
+    def change_heatmap_year(self, step):
+        """Show the previous or next year with activity; years already read show at once."""
+        years = self.heatmap_years
+        index = years.index(self.heatmap_year) if self.heatmap_year in years else len(years) - 1
+        self.heatmap_year = years[max(0, min(len(years) - 1, index + step))]
+        if self.heatmap_view.cached(self.heatmap_year):
+            self.show_heatmap()
+        else:
+            self.tasks.submit("heatmap", self.heatmap_view.load, self.heatmap_year,
+                              on_done=lambda arrays: self.show_heatmap(),
+                              on_error=lambda e: self.handle_error(f"Error loading activity calendar: {e}"))
+    
+    def show_heatmap(self):
+        """Shade the calendar for the shown year and metric."""
+        metric, unit = next((metric, unit) for label, metric, unit in HEATMAP_METRICS
+                            if label == self.heatmap_metric_var.get())
+        data = self.heatmap_view.data(self.heatmap_year, metric)
+        self.heatmap_data = (data, unit)
+        self.heatmap.set_levels(data["levels"], data["first_weekday"], data["days"])
+        
+        self.heatmap_year_var.set(str(self.heatmap_year))
+        years = self.heatmap_years
+        self.heatmap_prev_button.config(state=tk.NORMAL if years and self.heatmap_year > years[0] else tk.DISABLED)
+        self.heatmap_next_button.config(state=tk.NORMAL if years and self.heatmap_year < years[-1] else tk.DISABLED)
+        
+        summary = f"{data['total']:,.0f} {unit} on {data['active_days']} active days"
+        if data["busiest"]:
+            day, value = data["busiest"]
+            summary += f" · busiest day {day} ({value:,.0f} {unit})"
+        self.heatmap_summary_var.set(summary)
+        self.heatmap_day_var.set("")
+    
+    def show_heatmap_day(self, slot):
+        """Show the value of the day under the mouse."""
+        if slot is None or self.heatmap_data is None:
+            self.heatmap_day_var.set("")
+            return
+        data, unit = self.heatmap_data
+        self.heatmap_day_var.set(f"{day_date(data['year'], slot)}: {data['values'][slot]:,.0f} {unit}")
     
     def filter_history(self, filter_text):
         """Filter session history based on the provided text."""
+        self.show_history(self.history_view.rows(filter_text))
+    
+    def show_history(self, rows):
+        """Replace the rows of the history table."""
         # Clear existing items
         for item in self.history_tree.get_children():
             self.history_tree.delete(item)
         
-        # Get all sessions
-        sessions = get_sessions()
-        
-        for session in sessions:
-            session_id = session[0]
-            start_time = session[1]
-            end_time = session[2] if len(session) > 2 else None
-            duration = session[3] if len(session) > 3 else None
-            calories = session[4] if len(session) > 4 else None
-            
-            # Get workouts for this session
-            workouts = get_session_details(session_id)
-            workout_types = [w[0] for w in workouts]
-            workout_summary = ", ".join(workout_types) if workout_types else "No workouts"
-            
-            # Format values
-            duration_str = f"{duration:.1f}" if duration else "-"
-            calories_str = f"{calories:.1f}" if calories else "-"
-            
-            # Apply filter
-            filter_text = filter_text.lower()
-            if (filter_text in str(session_id).lower() or
-                filter_text in start_time.lower() or
-                (end_time and filter_text in end_time.lower()) or
-                filter_text in workout_summary.lower()):
-                self.history_tree.insert('', tk.END, values=(session_id, start_time, duration_str, calories_str, workout_summary))
+        for row in rows:
+            self.history_tree.insert('', tk.END, values=row)
     
     def view_session_details(self, event):
         """View details of the selected session."""
@@ -1268,35 +1442,114 @@ class FitnessTrackerApp:
         details_window.title(f"Session {session_id} Details")
         details_window.geometry("600x400")
         
-        # Get session and workout details
-        sessions = get_sessions()
-        session = next((s for s in sessions if s[0] == int(session_id)), None)
-        
-        if not session:
+        detail = session_detail(int(session_id))
+        if detail is None:
             ttk.Label(details_window, text="Session not found").pack(pady=20)
             return
         
-        start_time = session[1]
-        end_time = session[2] if len(session) > 2 else None
-        duration = session[3] if len(session) > 3 else None
-        calories = session[4] if len(session) > 4 else None
-        
         # Display session details
         ttk.Label(details_window, text=f"Session ID: {session_id}").pack(anchor=tk.W, padx=10, pady=5)
-        ttk.Label(details_window, text=f"Start Time: {start_time}").pack(anchor=tk.W, padx=10, pady=5)
-        ttk.Label(details_window, text=f"End Time: {end_time if end_time else 'Ongoing'}").pack(anchor=tk.W, padx=10, pady=5)
-        ttk.Label(details_window, text=f"Duration: {duration:.1f} minutes" if duration else "Duration: -").pack(anchor=tk.W, padx=10, pady=5)
-        ttk.Label(details_window, text=f"Calories: {calories:.1f}" if calories else "Calories: -").pack(anchor=tk.W, padx=10, pady=5)
+        ttk.Label(details_window, text=f"Start Time: {detail['start_time']}").pack(anchor=tk.W, padx=10, pady=5)
+        ttk.Label(details_window, text=f"End Time: {detail['end_time'] or 'Ongoing'}").pack(anchor=tk.W, padx=10, pady=5)
+        ttk.Label(details_window, text=detail["duration_text"]).pack(anchor=tk.W, padx=10, pady=5)
+        ttk.Label(details_window, text=detail["calories_text"]).pack(anchor=tk.W, padx=10, pady=5)
+        
+        def edited(changed, action):
+            # Archived workouts are read-only
+            if not changed:
+                messagebox.showinfo("Workout", "Archived workouts cannot be changed.", parent=details_window)
+                return
+            self.status_bar.config(text=f"{action} workout in session {session_id}")
+            details_window.destroy()
+            self.refresh_after_edit(int(session_id))
+        
+        def edit_workout(workout_id, duration, calories, notes):
+            dialog = tk.Toplevel(details_window)
+            dialog.title("Edit Workout")
+            dialog.transient(details_window)
+            dialog.grab_set()
+            form_frame = ttk.Frame(dialog, padding="20 20 20 20")
+            form_frame.pack(fill=tk.BOTH, expand=True)
+            
+            duration_text, calories_text = f"{duration:.1f}", f"{calories:.1f}"
+            duration_var = tk.StringVar(value=duration_text)
+            calories_var = tk.StringVar(value=calories_text)
+            notes_var = tk.StringVar(value=notes)
+            for row, (label, var) in enumerate([("Duration (min):", duration_var), ("Calories:", calories_var),
+                                                ("Notes:", notes_var)]):
+                ttk.Label(form_frame, text=label).grid(row=row, column=0, sticky=tk.W, pady=5)
+                ttk.Entry(form_frame, textvariable=var).grid(row=row, column=1, sticky=tk.W+tk.E, pady=5, padx=5)
+            
+            def save_workout():
+                try:
+                    new_duration = validate_positive_number(duration_var.get())
+                    new_calories = validate_positive_number(calories_var.get())
+                except ValueError as e:
+                    messagebox.showerror("Input Error", str(e), parent=dialog)
+                    return
+                # Untouched fields are left alone, so estimated calories stay estimated
+                changed = update_workout(
+                    workout_id,
+                    duration=None if duration_var.get().strip() == duration_text else new_duration,
+                    calories_burned=None if calories_var.get().strip() == calories_text else new_calories,
+                    notes=notes_var.get().strip())
+                dialog.destroy()
+                edited(changed, "Edited")
+            
+            button_frame = ttk.Frame(form_frame)
+            button_frame.grid(row=3, column=0, columnspan=2, pady=10)
+            ttk.Button(button_frame, text="Save", command=save_workout).pack(side=tk.LEFT, padx=5)
+            ttk.Button(button_frame, text="Cancel", command=dialog.destroy).pack(side=tk.LEFT, padx=5)
+        
+        def remove_workout(workout_id):
+            if messagebox.askyesno("Delete Workout", "Delete this workout?", parent=details_window):
+                edited(delete_workout(workout_id), "Deleted")
         
         # Display workout details
-        workouts = get_session_details(session_id)
-        if workouts:
+        if detail["workouts"]:
             ttk.Label(details_window, text="Workouts:").pack(anchor=tk.W, padx=10, pady=5)
-            for workout in workouts:
-                workout_type, duration, calories = workout
-                ttk.Label(details_window, text=f"{workout_type} - {duration:.1f} min, {calories:.1f} cal").pack(anchor=tk.W, padx=20, pady=2)
+            for workout_id, line, duration, calories, notes in detail["workouts"]:
+                row_frame = ttk.Frame(details_window)
+                row_frame.pack(fill=tk.X, padx=20, pady=2)
+                ttk.Label(row_frame, text=line).pack(side=tk.LEFT)
+                ttk.Button(row_frame, text="Delete",
+                           command=lambda w=workout_id: remove_workout(w)).pack(side=tk.RIGHT, padx=2)
+                ttk.Button(row_frame, text="Edit",
+                           command=lambda args=(workout_id, duration, calories, notes): edit_workout(*args)
+                           ).pack(side=tk.RIGHT, padx=2)
         else:
             ttk.Label(details_window, text="No workouts recorded").pack(anchor=tk.W, padx=10, pady=5)
+        
+        def confirm_delete():
+            if not messagebox.askyesno("Delete Session", "Delete this session and its workouts?",
+                                       parent=details_window):
+                return
+            if delete_session(int(session_id)):
+                self.status_bar.config(text=f"Deleted session {session_id}")
+                self.refresh_after_edit()
+            else:
+                messagebox.showinfo("Delete Session", "Archived sessions cannot be deleted.", parent=details_window)
+            details_window.destroy()
+        
+        if detail["deletable"]:
+            ttk.Button(details_window, text="Delete Session", command=confirm_delete).pack(anchor=tk.E, padx=10, pady=10)
+
+    def refresh_after_edit(self, session_id=None):
+        """Bring every view up to date after workouts or sessions were edited or deleted.
+
+        A live session that held an edited workout (session_id) re-reads its
+        workouts, as its totals are only saved when it ends.
+        """
+        if session_id is not None and self.session_registry.reload(session_id):
+            self.update_session_status()
+            self.update_session_display()
+        self.personal_records = get_personal_records(self.user_id)
+        replica.invalidate()
+        self.heatmap_view.invalidate()
+        if hasattr(self, 'heatmap'):
+            self.load_heatmap()
+        self.load_history()
+        self.setup_dashboard()
 
     def setup_settings_tab(self):
         """Set up the settings tab with user profile and preferences."""
@@ -1332,12 +1585,30 @@ class FitnessTrackerApp:
 
     def setup_profile_tab(self, parent):
         """Set up the user profile settings tab."""
+        self.profile_tab = parent
+        
+        # Profile selector; each member using this station has their own profile
+        profile_bar = ttk.Frame(parent)
+        profile_bar.pack(fill=tk.X, padx=20, pady=(20, 0))
+        ttk.Label(profile_bar, text="Profile:").pack(side=tk.LEFT)
+        
+        profile_labels = {f"{user_id}: {name or 'Unnamed'}": user_id for user_id, name in get_user_profiles()}
+        current_label = next((label for label, user_id in profile_labels.items() if user_id == self.user_id),
+                             f"{self.user_id}: (not saved yet)")
+        profile_var = tk.StringVar(value=current_label)
+        profile_combo = ttk.Combobox(profile_bar, textvariable=profile_var, values=list(profile_labels),
+                                     state="readonly", width=30)
+        profile_combo.pack(side=tk.LEFT, padx=5)
+        profile_combo.bind("<<ComboboxSelected>>",
+                           lambda e: self.switch_profile(profile_labels[profile_var.get()]))
+        ttk.Button(profile_bar, text="New Profile...", command=self.create_profile).pack(side=tk.LEFT, padx=5)
+        
         # User profile form
         form_frame = ttk.Frame(parent)
         form_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
         
         # Get existing profile if available
-        profile = get_user_profile()
+        profile = get_user_profile(self.user_id)
         
         # Name field
         ttk.Label(form_frame, text="Name:").grid(row=0, column=0, sticky=tk.W, pady=5)
@@ -1392,11 +1663,16 @@ class FitnessTrackerApp:
                 gender = gender_var.get()
                 activity = activity_var.get()
                 
-                save_user_profile(name, age, weight, height, gender, activity)
+                previous = profile_body(self.user_id)
+                save_user_profile(name, age, weight, height, gender, activity, user_id=self.user_id)
                 messagebox.showinfo("Success", "User profile saved successfully!")
                 
+                # Re-estimate calories of past workouts when the weight or BMR (age, height, gender) changed
+                if profile_body(self.user_id) != previous:
+                    self.recompute_calories()
+                
                 # Update BMR display
-                profile = get_user_profile()
+                profile = get_user_profile(self.user_id)
                 if profile and profile[6]:
                     bmr_var.set(f"{profile[6]:.1f} calories/day")
                     
@@ -1408,6 +1684,41 @@ class FitnessTrackerApp:
         # Configure grid weights for responsive layout
         form_frame.columnconfigure(1, weight=1)
 
+    def create_profile(self):
+        """Ask for a name, create a profile and switch to it."""
+        name = simpledialog.askstring("New Profile", "Member name:", parent=self.root)
+        if name:
+            self.switch_profile(add_user_profile(name.strip()))
+
+    def switch_profile(self, user_id):
+        """Make another profile the one this window shows and logs for."""
+        self.user_id = user_id
+        self.personal_records = get_personal_records(user_id)
+        self.heatmap_view.invalidate(user_id)
+        if hasattr(self, 'heatmap'):
+            self.load_heatmap()
+        
+        for widget in self.profile_tab.winfo_children():
+            widget.destroy()
+        self.setup_profile_tab(self.profile_tab)
+        
+        # Sessions of other profiles keep running in the registry
+        active = self.session.is_active
+        self.start_button.config(state=tk.DISABLED if active else tk.NORMAL)
+        self.end_button.config(state=tk.NORMAL if active else tk.DISABLED)
+        self.add_workout_button.config(state=tk.NORMAL if active else tk.DISABLED)
+        self.update_session_status()
+        self.update_session_display()
+        self.setup_dashboard()
+        
+        profile = get_user_profile(user_id)
+        running = len(self.session_registry.active())
+        self.status_bar.config(text=f"Switched to profile {profile[1] if profile else user_id} "
+                                    f"({running} active session(s) on this station)")
+        
+        # The profile may have sessions left open by a crash
+        self.recover_open_sessions()
+
     def setup_appearance_tab(self, parent):
         """Set up the appearance settings tab."""
         appearance_frame = ttk.Frame(parent)
@@ -1468,9 +1779,9 @@ class FitnessTrackerApp:
         ttk.Checkbutton(notification_frame, text="Session Reminders", 
                        variable=remind_var).pack(anchor=tk.W, padx=10, pady=5)
         
-        goal_var = tk.BooleanVar(value=True)
+        self.goal_notify_var = tk.BooleanVar(value=True)
         ttk.Checkbutton(notification_frame, text="Goal Achievements", 
-                       variable=goal_var).pack(anchor=tk.W, padx=10, pady=5)
+                       variable=self.goal_notify_var).pack(anchor=tk.W, padx=10, pady=5)
         
         inactivity_var = tk.BooleanVar(value=False)
         ttk.Checkbutton(notification_frame, text="Inactivity Alerts", 
@@ -1486,9 +1797,13 @@ class FitnessTrackerApp:
         ttk.Button(data_frame, text="Import Data", 
                   command=self.import_data).pack(anchor=tk.W, padx=10, pady=5)
         
-        backup_var = tk.BooleanVar(value=False)
+        ttk.Button(data_frame, text="Archive Old Data...", 
+                  command=self.archive_old_data).pack(anchor=tk.W, padx=10, pady=5)
+        
+        self.auto_backup_var = tk.BooleanVar(value=self.backup_scheduler.running)
         ttk.Checkbutton(data_frame, text="Auto-backup Data", 
-                       variable=backup_var).pack(anchor=tk.W, padx=10, pady=5)
+                       variable=self.auto_backup_var,
+                       command=self.toggle_auto_backup).pack(anchor=tk.W, padx=10, pady=5)
         
         # Reset button
         reset_frame = ttk.Frame(preferences_frame)
@@ -1504,159 +1819,92 @@ class FitnessTrackerApp:
         ttk.Button(reset_frame, text="Reset All Data", 
                   command=confirm_reset).pack(side=tk.RIGHT)
 
-    def apply_theme(self, theme_name=None):
-        """Apply the selected theme to the application."""
-        if theme_name:
-            self.theme = theme_name
+    def archive_old_data(self):
+        """Move old finished sessions into per-year archive files."""
+        months = simpledialog.askinteger(
+            "Archive Old Data",
+            "Archive finished sessions older than how many months?\n"
+            "Archived data stays available in statistics and history.",
+            initialvalue=12, minvalue=1, parent=self.root
+        )
+        if not months:
+            return
         
-        style = self.style
+        cutoff = (datetime.now() - timedelta(days=months * 30)).strftime('%Y-%m-%d')
+        self.status_bar.config(text="Archiving old sessions...")
+        self.progress_bar.pack(side=tk.RIGHT, padx=5)
+        self.progress_bar.start(10)
         
-        if self.theme == "light":
-            bg_color = "#FFFFFF"
-            fg_color = "#333333"
-            selected_bg = self.accent_colors["primary"]
-            hover_bg = "#F5F5F5"
-            
-            style.configure(".", 
-                background=bg_color,
-                foreground=fg_color,
-                fieldbackground=bg_color,
-                selectbackground=selected_bg,
-                selectforeground="white"
-            )
-            
-            # Configure specific styles
-            style.configure("TFrame", background=bg_color)
-            style.configure("TLabel", background=bg_color, foreground=fg_color)
-            style.configure("TButton", 
-                background=self.accent_colors["primary"],
-                foreground="white",
-                padding=(10, 5)
-            )
-            style.map("TButton",
-                background=[("active", self.accent_colors["info"])],
-                foreground=[("active", "white")]
-            )
-            
-            style.configure("Success.TButton",
-                background=self.accent_colors["success"],
-                foreground="white"
-            )
-            style.map("Success.TButton",
-                background=[("active", "#45a049")]
-            )
-            
-            style.configure("Danger.TButton",
-                background=self.accent_colors["error"],
-                foreground="white"
-            )
-            style.map("Danger.TButton",
-                background=[("active", "#d32f2f")]
-            )
-            
-            style.configure("TNotebook", background=bg_color, tabmargins=[2, 5, 2, 0])
-            style.configure("TNotebook.Tab",
-                background="#e0e0e0",
-                foreground=fg_color,
-                padding=[15, 5],
-                font=("Helvetica", 10)
-            )
-            style.map("TNotebook.Tab",
-                background=[("selected", selected_bg)],
-                foreground=[("selected", "white")]
-            )
-            
-            # Update text widgets
-            self.details_text.configure(
-                background="white",
-                foreground=fg_color,
-                font=("Helvetica", 10),
-                selectbackground=selected_bg,
-                selectforeground="white",
-                insertbackground=fg_color
-            )
-            
-        else:  # Dark theme
-            bg_color = "#333333"
-            fg_color = "#FFFFFF"
-            selected_bg = self.accent_colors["primary"]
-            hover_bg = "#424242"
-            
-            style.configure(".", 
-                background=bg_color,
-                foreground=fg_color,
-                fieldbackground=bg_color,
-                selectbackground=selected_bg,
-                selectforeground="white"
-            )
-            
-            # Configure specific styles
-            style.configure("TFrame", background=bg_color)
-            style.configure("TLabel", background=bg_color, foreground=fg_color)
-            style.configure("TButton", 
-                background=self.accent_colors["primary"],
-                foreground="white",
-                padding=(10, 5)
-            )
-            style.map("TButton",
-                background=[("active", self.accent_colors["info"])],
-                foreground=[("active", "white")]
-            )
-            
-            style.configure("Success.TButton",
-                background=self.accent_colors["success"],
-                foreground="white"
-            )
-            style.map("Success.TButton",
-                background=[("active", "#45a049")]
-            )
-            
-            style.configure("Danger.TButton",
-                background=self.accent_colors["error"],
-                foreground="white"
-            )
-            style.map("Danger.TButton",
-                background=[("active", "#d32f2f")]
-            )
-            
-            style.configure("TNotebook", background=bg_color, tabmargins=[2, 5, 2, 0])
-            style.configure("TNotebook.Tab",
-                background="#424242",
-                foreground=fg_color,
-                padding=[15, 5],
-                font=("Helvetica", 10)
-            )
-            style.map("TNotebook.Tab",
-                background=[("selected", selected_bg)],
-                foreground=[("selected", "white")]
-            )
-            
-            # Update text widgets
-            self.details_text.configure(
-                background="#424242",
-                foreground=fg_color,
-                font=("Helvetica", 10),
-                selectbackground=selected_bg,
-                selectforeground="white",
-                insertbackground=fg_color
-            )
+        self.tasks.submit("archive", archive_sessions_before, cutoff, on_done=self.finish_archive, supersede=False,
+                          on_error=lambda e: self.handle_error(f"Error archiving data: {e}"))
+
+    def finish_archive(self, moved):
+        """Complete the archive operation."""
+        self.progress_bar.stop()
+        self.progress_bar.pack_forget()
+        self.status_bar.config(text=f"Archived {moved} sessions")
+
+    def toggle_auto_backup(self):
+        """Start or stop periodic database backups."""
+        if self.auto_backup_var.get():
+            self.backup_scheduler.start()
+            self.status_bar.config(text="Auto-backup enabled")
+        else:
+            self.backup_scheduler.stop()
+            self.status_bar.config(text="Auto-backup disabled")
+
+    def apply_theme(self, theme_name=None):
+        """Apply the selected theme to the application."""
+        palette = self.themes.apply(theme_name)
+        self.theme = self.themes.theme
+        self.style_widgets(palette)
+        self.restyle_charts()
+
+    def style_widgets(self, palette):
+        """Color the plain Tk widgets, which ttk themes do not reach."""
+        for chart in getattr(self, 'mini_charts', []):
+            chart.configure(background=palette["background"])
+        if hasattr(self, 'target_ring'):
+            self.target_ring.set_text_color(palette["foreground"])
+        if hasattr(self, 'heatmap'):
+            self.heatmap.configure(background=palette["background"])
+            self.heatmap.set_colors(palette["heatmap"], palette["foreground"])
+        self.details_text.configure(
+            background=palette["text"],
+            foreground=palette["foreground"],
+            font=("Helvetica", 10),
+            selectbackground=self.themes.accent,
+            selectforeground="white",
+            insertbackground=palette["foreground"]
+        )
+
+    def restyle_charts(self):
+        """Recolor the existing charts for the current theme; hidden ones redraw when shown."""
+        self.chart_canvases = [canvas for canvas in self.chart_canvases if canvas.get_tk_widget().winfo_exists()]
+        self.stale_charts.intersection_update(self.chart_canvases)
+        for canvas in self.chart_canvases:
+            style_figure(canvas.figure, self.theme)
+            if canvas.get_tk_widget().winfo_viewable():
+                canvas.draw_idle()
+            else:
+                self.stale_charts.add(canvas)
+
+    def redraw_stale_chart(self, canvas):
+        """Redraw a chart restyled while it was hidden."""
+        if canvas in self.stale_charts:
+            self.stale_charts.discard(canvas)
+            canvas.draw_idle()
 
     def apply_accent_color(self, color_code):
         """Apply the selected accent color to UI elements."""
-        style = self.style
-        style.configure("TButton", foreground=color_code)
-        style.configure("TNotebook.Tab", foreground=[("selected", color_code)])
-        self.header_label.config(background=color_code)
+        self.style_widgets(self.themes.apply(accent=color_code))
+        self.header_label.config(foreground=color_code)
+        self.root.after_idle(self.themes.precompile)
 
     def apply_font_size(self, size):
         """Change the application font size."""
-        sizes = {"Small": 9, "Medium": 11, "Large": 14}
-        font_size = sizes.get(size, 11)
-        
-        style = self.style
-        style.configure("TLabel", font=("Helvetica", font_size))
-        style.configure("TButton", font=("Helvetica", font_size))
-        style.configure("TNotebook.Tab", font=("Helvetica", font_size))
+        self.themes.apply(font_size=FONT_SIZES.get(size, 11))
+        self.root.after_idle(self.themes.precompile)
 
     def toggle_theme(self):
         """Toggle between light and dark theme."""
@@ -1713,31 +1961,16 @@ class FitnessTrackerApp:
         notes_text = tk.Text(form_frame, height=4, width=30)
         notes_text.grid(row=4, column=1, sticky=tk.W+tk.E, pady=5, padx=5)
         
-        # Calculate calories based on workout type and duration
+        # Calculate calories based on workout type, duration and the user profile
+        estimated_value = tk.StringVar()
+        
         def estimate_calories():
             try:
-                workout_type = workout_var.get()
                 duration = float(duration_var.get())
-                intensity = intensity_var.get()
-                
-                # Rough calories estimation based on workout type and intensity
-                # Values are approximate calories burned per minute for a 70kg person
-                calories_per_min = {
-                    "Running": {"Low": 8, "Medium": 10, "High": 14},
-                    "Walking": {"Low": 3, "Medium": 4, "High": 5},
-                    "Cycling": {"Low": 5, "Medium": 7, "High": 10},
-                    "Swimming": {"Low": 6, "Medium": 8, "High": 10},
-                    "Weight Training": {"Low": 3, "Medium": 5, "High": 6},
-                    "Yoga": {"Low": 2, "Medium": 3, "High": 4},
-                    "HIIT": {"Low": 8, "Medium": 12, "High": 15},
-                    "Other": {"Low": 4, "Medium": 6, "High": 8}
-                }
-                
-                # Calculate estimated calories
-                cal_per_min = calories_per_min.get(workout_type, {"Low": 5, "Medium": 7, "High": 10}).get(intensity, 7)
-                estimated_calories = round(cal_per_min * duration, 1)
-                
-                calories_var.set(str(estimated_calories))
+                estimated = str(estimate_workout_calories(workout_var.get(), intensity_var.get(), duration,
+                                                          user_id=self.user_id))
+                estimated_value.set(estimated)
+                calories_var.set(estimated)
             except ValueError:
                 messagebox.showerror("Input Error", "Please enter a valid duration.")
         
@@ -1773,10 +2006,14 @@ class FitnessTrackerApp:
                     estimate_calories()
                     calories = float(calories_var.get())
                 
+                # Estimated calories follow later profile weight changes, typed ones do not
+                calories_estimated = calories_var.get().strip() == estimated_value.get()
+                
                 notes = notes_text.get("1.0", tk.END).strip()
                 
                 # Create a workout and add to session
-                workout = Workout(workout_type, duration, calories, intensity=intensity, notes=notes)
+                workout = Workout(workout_type, duration, calories, intensity=intensity, notes=notes,
+                                  calories_estimated=calories_estimated)
                 self.session.add_workout(workout)
                 
                 # Update session display
@@ -1787,6 +2024,7 @@ class FitnessTrackerApp:
                 
                 # Show confirmation
                 self.status_bar.config(text=f"Added {workout_type} workout: {duration} minutes, {calories} calories")
+                self.check_personal_records()
                 
             except ValueError as e:
                 messagebox.showerror("Input Error", str(e))
@@ -1805,7 +2043,7 @@ class FitnessTrackerApp:
                 return
             self.end_session()
         
-        self.session = Session()  # Create new session
+        self.session = Session(self.user_id, self.db_writer)  # Create new session
         self.session.start()
         
         # Update UI
@@ -1820,6 +2058,55 @@ class FitnessTrackerApp:
         # Show confirmation
         self.status_bar.config(text="New session started")
 
+    def restore_open_sessions(self):
+        """Restore the sessions of every profile left open by a crash, then offer the current one."""
+        try:
+            self.recovered_sessions.update(self.session_registry.restore_open())
+        except Exception as e:
+            print(f"Error restoring open sessions: {e}")
+        self.recover_open_sessions()
+
+    def recover_open_sessions(self):
+        """Resume or close the session of the current profile that was still open when the app last stopped.
+
+        Runs at startup and whenever another profile is selected. The session
+        is already back in the registry; this asks whether to keep it going.
+        """
+        try:
+            # Also picks up sessions of this profile left open since startup
+            self.recovered_sessions.update(self.session_registry.restore_open(self.user_id))
+            recovered = self.recovered_sessions.pop(self.user_id, None)
+            if recovered is None:
+                return
+            
+            # The newest one can be resumed; anything older has been closed
+            session, closed = recovered
+            message = (f"A session started at {session.start_time:%Y-%m-%d %H:%M:%S} with "
+                       f"{len(session.workouts)} workout(s) was not ended.\n\n"
+                       f"Resume it? Choose 'No' to close it with the recorded workouts.")
+            if closed:
+                message += f"\n\n{closed} older unfinished session(s) have been closed."
+            
+            resume = messagebox.askyesno("Unfinished Session", message)
+            if resume:
+                self.start_button.config(state=tk.DISABLED)
+                self.end_button.config(state=tk.NORMAL)
+                self.add_workout_button.config(state=tk.NORMAL)
+            else:
+                session.close()
+            
+            # The dashboard's recent list still shows these sessions as active
+            self.setup_dashboard()
+            self.update_session_status()
+            self.update_session_display()
+            if resume:
+                self.status_bar.config(text="Unfinished session resumed")
+            else:
+                self.status_bar.config(text=f"Unfinished session closed - Duration: {session.duration:.1f} min, " +
+                                        f"Calories: {session.total_calories:.1f}")
+        except Exception as e:
+            print(f"Error recovering open sessions: {e}")
+
     def end_session(self):
         """End the current workout session."""
         if not self.session.is_active:
@@ -1843,44 +2130,8 @@ class FitnessTrackerApp:
                                 f"Calories: {self.session.total_calories:.1f}")
 
     def update_session_display(self):
-        """Update the session details display."""
-        # Enable text widget for updating
-        self.details_text.config(state=tk.NORMAL)
-        self.details_text.delete(1.0, tk.END)
-        
-        if not self.session.is_active and not self.session.workouts:
-            self.details_text.insert(tk.END, "No active session.\n\n")
-            self.details_text.insert(tk.END, "Click 'Start Session' to begin tracking your workout.")
-        else:
-            # Display session info
-            if self.session.is_active:
-                elapsed = datetime.now() - self.session.start_time
-                elapsed_str = str(elapsed).split('.')[0]  # Remove microseconds
-                self.details_text.insert(tk.END, f"Session active - started at {self.session.start_time.strftime('%H:%M:%S')}\n")
-                self.details_text.insert(tk.END, f"Elapsed time: {elapsed_str}\n\n")
-            else:
-                duration = self.session.duration
-                duration_str = f"{duration:.1f} minutes" if duration else "N/A"
-                self.details_text.insert(tk.END, f"Session ended\n")
-                self.details_text.insert(tk.END, f"Duration: {duration_str}\n\n")
-            
-            # Display workouts
-            if self.session.workouts:
-                self.details_text.insert(tk.END, "Workouts:\n")
-                for i, workout in enumerate(self.session.workouts, 1):
-                    self.details_text.insert(tk.END, f"{i}. {workout.workout_type} - {workout.duration:.1f} min, " +
-                                            f"{workout.calories:.1f} calories\n")
-                    if workout.notes:
-                        self.details_text.insert(tk.END, f"   Notes: {workout.notes}\n")
-                
-                # Display total calories
-                self.details_text.insert(tk.END, f"\nTotal Calories: {self.session.total_calories:.1f}\n")
-            else:
-                self.details_text.insert(tk.END, "No workouts added yet.\n\n")
-                self.details_text.insert(tk.END, "Click 'Add Workout' to record your activities.")
-        
-        # Disable text widget again
-        self.details_text.config(state=tk.DISABLED)
+        """Update the session details display, appending new workouts to the log."""
+        self.session_log.show(self.session)
 
     def add_workout_goal(self):
         """Add a new workout goal."""
@@ -1915,7 +2166,7 @@ class FitnessTrackerApp:
         # Time period
         ttk.Label(form_frame, text="Time Period:").grid(row=2, column=0, sticky=tk.W, pady=5)
         period_var = tk.StringVar(value="Weekly")
-        ttk.Combobox(form_frame, textvariable=period_var, values=["Daily", "Weekly", "Monthly"], 
+        ttk.Combobox(form_frame, textvariable=period_var, values=list(GOAL_PERIOD_DAYS), 
                     state="readonly").grid(row=2, column=1, sticky=tk.W+tk.E, pady=5, padx=5)
         
         # Description
@@ -1948,14 +2199,18 @@ class FitnessTrackerApp:
                     messagebox.showerror("Input Error", "Please enter a valid number for the target.")
                     return
                 
-                # Save goal to database
-                add_goal(goal_type, target_value, period, description)
+                # Save goal to database, running from today for one period
+                start = datetime.now()
+                end = start + timedelta(days=GOAL_PERIOD_DAYS[period] - 1)
+                add_goal(goal_type, target_value, start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'),
+                         description, user_id=self.user_id)
                 
                 # Show confirmation
                 messagebox.showinfo("Goal Added", f"Your {period.lower()} {goal_type.lower()} goal has been added.")
                 
                 # Close dialog
                 dialog.destroy()
+                self.setup_dashboard()
                 
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to add goal: {str(e)}")
@@ -1973,6 +2228,7 @@ class FitnessTrackerApp:
         print(f"ERROR: {message}")
 
 def launch_app():
+    create_db()
     root = tk.Tk()
     app = FitnessTrackerApp(root)
     root.mainloop()
\ No newline at end of file
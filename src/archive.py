@@ -0,0 +1,141 @@
+import os
+import sqlite3
+import time
+
+from database import create_history_indexes, create_history_tables, get_connection, to_epoch_seconds
+from replica import replica
+from storage import get_engine
+
+
+def archive_dir():
+    """Archive files live in an 'archive' folder in the storage engine's directory."""
+    return os.path.join(get_engine().directory, "archive")
+
+
+def archive_path(year):
+    """Path of the archive file holding one year of sessions."""
+    return os.path.join(archive_dir(), f"fitness_tracker_{year}.db")
+
+
+def table_columns(cursor, schema, table):
+    """Column names of a table, in storage order."""
+    cursor.execute(f"PRAGMA {schema}.table_info({table})")
+    return [row[1] for row in cursor.fetchall()]
+
+
+def shared_columns(cursor, table):
+    """Comma-separated columns present in both the hot and the archive table."""
+    archive_columns = set(table_columns(cursor, "archive", table))
+    return ", ".join(column for column in table_columns(cursor, "main", table) if column in archive_columns)
+
+
+def archive_sessions_before(cutoff_date):
+    """Move closed sessions that started before cutoff_date into per-year archives.
+
+    Each year's sessions and their workouts are copied into that year's
+    archive file and removed from the hot database in one transaction, and the
+    partition's date span and session id range are recorded in
+    archive_partitions so queries can route to it. Open sessions are never
+    archived. Returns the number of sessions moved.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    os.makedirs(archive_dir(), exist_ok=True)
+
+    cursor.execute('''
+        SELECT DISTINCT CAST(strftime('%Y', start_time, 'unixepoch') AS INTEGER)
+        FROM sessions
+        WHERE end_time IS NOT NULL AND start_time < ?
+        ORDER BY 1
+    ''', (to_epoch_seconds(cutoff_date),))
+    years = [row[0] for row in cursor.fetchall()]
+
+    moved = 0
+    try:
+        for year in years:
+            start = time.perf_counter()
+            count = _archive_year(conn, cursor, year, cutoff_date)
+            moved += count
+            print(f"Archived {count} sessions from {year} in {time.perf_counter() - start:.1f}s")
+    finally:
+        conn.close()
+        # Rows now live in archive files; a stale replica would count them twice
+        replica.invalidate()
+    return moved
+
+
+def _archive_year(conn, cursor, year, cutoff_date):
+    path = archive_path(year)
+    year_end = min(f"{year + 1}-01-01", cutoff_date)
+
+    cursor.execute("ATTACH DATABASE ? AS archive", (path,))
+    try:
+        create_history_tables(cursor, "archive")
+        create_history_indexes(cursor, "archive")
+        conn.commit()
+
+        # Copy by column name; older databases have columns in a different order
+        session_columns = shared_columns(cursor, "sessions")
+        workout_columns = shared_columns(cursor, "workouts")
+
+        cursor.execute("BEGIN")
+        cursor.execute("DROP TABLE IF EXISTS temp.archived_sessions")
+        cursor.execute('''
+            CREATE TEMP TABLE archived_sessions AS
+            SELECT id FROM main.sessions
+            WHERE end_time IS NOT NULL AND start_time >= ? AND start_time < ?
+        ''', (to_epoch_seconds(f"{year}-01-01"), to_epoch_seconds(year_end)))
+
+        cursor.execute(f'''
+            INSERT INTO archive.sessions ({session_columns})
+            SELECT {session_columns} FROM main.sessions
+            WHERE id IN (SELECT id FROM temp.archived_sessions)
+        ''')
+        count = cursor.rowcount
+        cursor.execute(f'''
+            INSERT INTO archive.workouts ({workout_columns})
+            SELECT {workout_columns} FROM main.workouts
+            WHERE session_id IN (SELECT id FROM temp.archived_sessions)
+        ''')
+        cursor.execute("DELETE FROM main.workouts WHERE session_id IN (SELECT id FROM temp.archived_sessions)")
+        cursor.execute("DELETE FROM main.sessions WHERE id IN (SELECT id FROM temp.archived_sessions)")
+
+        # The partition's span covers both session starts and workout dates
+        cursor.execute('''
+            SELECT MIN(first_date), MAX(last_date), MIN(min_id), MAX(max_id) FROM (
+                SELECT date(MIN(start_time), 'unixepoch') AS first_date, date(MAX(start_time), 'unixepoch') AS last_date,
+                       MIN(id) AS min_id, MAX(id) AS max_id
+                FROM archive.sessions
+                UNION ALL
+                SELECT date(MIN(date) * 86400, 'unixepoch'), date(MAX(date) * 86400, 'unixepoch'), NULL, NULL
+                FROM archive.workouts
+            )
+        ''')
+        first_date, last_date, min_id, max_id = cursor.fetchone()
+        if min_id is not None:
+            cursor.execute('''
+                INSERT INTO main.archive_partitions (year, path, first_date, last_date, min_session_id, max_session_id)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (year) DO UPDATE SET
+                    path = excluded.path, first_date = excluded.first_date, last_date = excluded.last_date,
+                    min_session_id = excluded.min_session_id, max_session_id = excluded.max_session_id
+            ''', (year, path, first_date, last_date, min_id, max_id))
+
+        cursor.execute("DROP TABLE temp.archived_sessions")
+        conn.commit()
+        return count
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute("DETACH DATABASE archive")
+
+
+def list_partitions():
+    """Return (year, path, first_date, last_date) for every archive partition."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT year, path, first_date, last_date FROM archive_partitions ORDER BY year")
+    partitions = cursor.fetchall()
+    conn.close()
+    return partitions
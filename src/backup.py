@@ -0,0 +1,232 @@
+import gzip
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import database
+from storage import get_engine
+
+SNAPSHOT_PREFIX = "fitness_tracker-"
+
+# Restarts of the paged copy caused by other writers before it falls back to one step
+MAX_BACKUP_RESTARTS = 3
+
+
+class BackupRestarted(Exception):
+    """Raised from the progress callback when writers keep restarting a paged copy."""
+
+
+def default_backup_dir():
+    """Backups live in a 'backups' folder in the storage engine's directory."""
+    return os.path.join(get_engine().directory, "backups")
+
+
+def verify_snapshot(path):
+    """Run PRAGMA quick_check on a snapshot and return True if it is healthy."""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        result = conn.execute("PRAGMA quick_check").fetchall()
+        return result == [("ok",)]
+    finally:
+        conn.close()
+
+
+def remove_partial(tmp_path):
+    """Delete an unfinished snapshot together with any -wal and -shm files next to it."""
+    for path in (tmp_path, tmp_path + "-wal", tmp_path + "-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def backup_database(dest_path, pages_per_step=256, step_pause=0.05, compress=False, stop_event=None,
+                    source_path=None):
+    """Copy the live database (or the database file at source_path) to dest_path with the online backup API.
+
+    The copy is made pages_per_step pages at a time with a short pause between
+    steps, so the source is never locked for long and writers can interleave.
+    A write from another connection restarts the copy; under steady write
+    load that could go on forever, so after MAX_BACKUP_RESTARTS the copy is
+    redone in a single step, which writers wait for instead. The copy takes
+    over the source's WAL mode, so it is switched back to a rollback journal
+    to make the snapshot a single self-contained file. It is verified with
+    quick_check before it is (optionally) gzip-compressed. Returns the final
+    snapshot path.
+    """
+    tmp_path = dest_path + ".partial"
+    source = sqlite3.connect(source_path) if source_path else database.get_connection()
+    target = sqlite3.connect(tmp_path)
+
+    restarts = 0
+    last_remaining = None
+
+    def progress(status, remaining, total):
+        nonlocal restarts, last_remaining
+        if stop_event is not None and stop_event.is_set():
+            raise InterruptedError("Backup cancelled")
+        # More pages left than after the previous step means the copy started over
+        if last_remaining is not None and remaining > last_remaining:
+            restarts += 1
+            if restarts > MAX_BACKUP_RESTARTS:
+                raise BackupRestarted()
+        last_remaining = remaining
+        time.sleep(step_pause)
+
+    try:
+        try:
+            source.backup(target, pages=pages_per_step, progress=progress)
+        except BackupRestarted:
+            print(f"Backup restarted {restarts} times by concurrent writes; copying in one step")
+            source.backup(target)
+        target.execute("PRAGMA journal_mode = DELETE")
+    except BaseException:
+        target.close()
+        source.close()
+        remove_partial(tmp_path)
+        raise
+    target.close()
+    source.close()
+
+    if not verify_snapshot(tmp_path):
+        remove_partial(tmp_path)
+        raise sqlite3.DatabaseError(f"Snapshot failed integrity check: {dest_path}")
+
+    if compress:
+        final_path = dest_path + ".gz"
+        with open(tmp_path, 'rb') as src, gzip.open(final_path, 'wb', compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.remove(tmp_path)
+    else:
+        final_path = dest_path
+        os.replace(tmp_path, final_path)
+    return final_path
+
+
+def backup_archives(backup_dir, pages_per_step=256, step_pause=0.05, stop_event=None):
+    """Copy archive partitions that changed since their last copy into backup_dir/archive.
+
+    Archived years are removed from the hot file, so snapshots alone no
+    longer hold them. Each copy keeps the modification time of its source,
+    which is how an unchanged partition is recognised and skipped. Returns the
+    paths copied.
+    """
+    conn = database.get_connection()
+    try:
+        partitions = database.archive_partitions_for(conn.cursor())
+    finally:
+        conn.close()
+
+    target_dir = os.path.join(backup_dir, "archive")
+    copied = []
+    for year, path in partitions:
+        if not os.path.exists(path):
+            print(f"Archive partition for {year} is missing: {path}")
+            continue
+        dest_path = os.path.join(target_dir, os.path.basename(path))
+        mtime = os.path.getmtime(path)
+        if os.path.exists(dest_path) and os.path.getmtime(dest_path) == mtime:
+            continue
+        os.makedirs(target_dir, exist_ok=True)
+        backup_database(dest_path, pages_per_step, step_pause, stop_event=stop_event, source_path=path)
+        # Stamped with the time read before copying, so a change made meanwhile is copied next time
+        os.utime(dest_path, (mtime, mtime))
+        copied.append(dest_path)
+    return copied
+
+
+def list_snapshots(backup_dir):
+    """Return snapshot file names in backup_dir, oldest first."""
+    if not os.path.isdir(backup_dir):
+        return []
+    return sorted(
+        name for name in os.listdir(backup_dir)
+        if name.startswith(SNAPSHOT_PREFIX) and (name.endswith(".db") or name.endswith(".db.gz"))
+    )
+
+
+def rotate_snapshots(backup_dir, keep):
+    """Delete the oldest snapshots so that at most keep remain."""
+    snapshots = list_snapshots(backup_dir)
+    removed = []
+    for name in snapshots[:max(0, len(snapshots) - keep)]:
+        os.remove(os.path.join(backup_dir, name))
+        removed.append(name)
+    return removed
+
+
+class BackupScheduler:
+    """Takes periodic database snapshots on a background thread."""
+
+    def __init__(self, backup_dir=None, interval_minutes=60, keep=5, compress=True,
+                 pages_per_step=256, step_pause=0.05, on_complete=None, on_error=None):
+        self.backup_dir = backup_dir
+        self.interval_minutes = interval_minutes
+        self.keep = keep
+        self.compress = compress
+        self.pages_per_step = pages_per_step
+        self.step_pause = step_pause
+        self.on_complete = on_complete
+        self.on_error = on_error
+        self.last_snapshot = None
+        self._stop_event = threading.Event()
+        self._run_now = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive() and not self._stop_event.is_set()
+
+    def start(self):
+        """Start the scheduler; the first snapshot is taken right away."""
+        if self.running:
+            return
+        if self._thread is not None:
+            # A stopped loop may still be finishing a backup step; it must end
+            # before its events are reused, or two loops would share the backup dir
+            self._thread.join()
+        self._stop_event.clear()
+        self._run_now.set()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the scheduler, cancelling a backup in progress."""
+        self._stop_event.set()
+        self._run_now.set()
+
+    def run_now(self):
+        """Ask the scheduler to take a snapshot as soon as possible."""
+        self._run_now.set()
+
+    def _loop(self):
+        while not self._stop_event.is_set():
+            self._run_now.wait(self.interval_minutes * 60)
+            self._run_now.clear()
+            if self._stop_event.is_set():
+                break
+            try:
+                self.last_snapshot = self.backup_once()
+                if self.on_complete:
+                    self.on_complete(self.last_snapshot)
+            except InterruptedError:
+                break
+            except Exception as e:
+                print(f"Error backing up database: {e}")
+                if self.on_error:
+                    self.on_error(e)
+
+    def backup_once(self):
+        """Take one snapshot, verify it, rotate old ones and copy changed archive partitions."""
+        backup_dir = self.backup_dir or default_backup_dir()
+        os.makedirs(backup_dir, exist_ok=True)
+        name = f"{SNAPSHOT_PREFIX}{datetime.now().strftime('%Y%m%d-%H%M%S')}.db"
+
+        start = time.perf_counter()
+        path = backup_database(os.path.join(backup_dir, name), self.pages_per_step,
+                               self.step_pause, self.compress, self._stop_event)
+        rotate_snapshots(backup_dir, self.keep)
+        backup_archives(backup_dir, self.pages_per_step, self.step_pause, self._stop_event)
+        print(f"Database backed up to {path} in {time.perf_counter() - start:.1f}s")
+        return path
@@ -0,0 +1,158 @@
+from database import (DEFAULT_USER_ID, adjust_activity_calendar, attach_archives, get_connection,
+                      get_user_profile, recompute_personal_records)
+
+# Formatted with the schema of the hot file or an attached archive partition
+ESTIMATED_BY_DAY = '''
+    SELECT date, SUM(calories_burned) FROM {schema}.workouts
+    WHERE calories_estimated = 1 AND user_id = ? AND deleted_at IS NULL
+    GROUP BY date
+'''
+
+# Metabolic equivalents (MET) per workout type and intensity, roughly following
+# the Compendium of Physical Activities.
+MET_VALUES = {
+    "Running": {"Low": 7.0, "Medium": 9.8, "High": 11.5},
+    "Walking": {"Low": 2.8, "Medium": 3.5, "High": 5.0},
+    "Cycling": {"Low": 4.0, "Medium": 6.8, "High": 10.0},
+    "Swimming": {"Low": 5.8, "Medium": 8.3, "High": 10.0},
+    "Weight Training": {"Low": 3.5, "Medium": 5.0, "High": 6.0},
+    "Yoga": {"Low": 2.0, "Medium": 2.5, "High": 4.0},
+    "HIIT": {"Low": 6.0, "Medium": 8.0, "High": 11.0},
+    "Other": {"Low": 3.5, "Medium": 5.0, "High": 7.0}
+}
+DEFAULT_MET = {"Low": 3.5, "Medium": 5.0, "High": 7.0}
+
+DEFAULT_WEIGHT_KG = 70.0
+
+
+def resting_rate(weight_kg, bmr=None):
+    """Calories burned per minute at rest (1 MET)."""
+    if bmr:
+        return bmr / 1440.0
+    return 3.5 * weight_kg / 200.0
+
+
+def calories_per_minute(workout_type, intensity, weight_kg=DEFAULT_WEIGHT_KG, bmr=None):
+    """Calories burned per minute for a workout type and intensity.
+
+    The active part scales with body weight (MET - 1) * 3.5 * kg / 200; the
+    resting part comes from the profile's BMR when one is known.
+    """
+    met = MET_VALUES.get(workout_type, DEFAULT_MET).get(intensity, DEFAULT_MET["Medium"])
+    return (met - 1.0) * 3.5 * weight_kg / 200.0 + resting_rate(weight_kg, bmr)
+
+
+def profile_body(user_id=DEFAULT_USER_ID):
+    """Return (weight_kg, bmr) from a saved user profile, with defaults."""
+    profile = get_user_profile(user_id)
+    if profile and profile[3]:
+        return profile[3], profile[6]
+    return DEFAULT_WEIGHT_KG, None
+
+
+def estimate_calories(workout_type, intensity, duration, weight_kg=None, bmr=None, user_id=DEFAULT_USER_ID):
+    """Estimate calories for one workout, using the user profile if no weight is given."""
+    if weight_kg is None:
+        weight_kg, bmr = profile_body(user_id)
+    return round(calories_per_minute(workout_type, intensity, weight_kg, bmr) * duration, 1)
+
+
+def rate_table(weight_kg, bmr=None):
+    """Calories per minute for every (workout type, intensity) pair."""
+    return {
+        (workout_type, intensity): calories_per_minute(workout_type, intensity, weight_kg, bmr)
+        for workout_type, mets in MET_VALUES.items()
+        for intensity in mets
+    }
+
+
+def estimate_many(workouts, weight_kg=None, bmr=None, user_id=DEFAULT_USER_ID):
+    """Estimate calories for many (workout_type, intensity, duration) tuples at once."""
+    if weight_kg is None:
+        weight_kg, bmr = profile_body(user_id)
+    rates = rate_table(weight_kg, bmr)
+    default_rate = calories_per_minute("Other", "Medium", weight_kg, bmr)
+    return [round(rates.get((workout_type, intensity), default_rate) * duration, 1)
+            for workout_type, intensity, duration in workouts]
+
+
+def recompute_estimated_calories(weight_kg=None, bmr=None, user_id=DEFAULT_USER_ID):
+    """Re-estimate every workout of a profile whose calories were estimated, in one UPDATE.
+
+    Called when the profile weight or BMR changes. Workouts with calories
+    entered by the user are left untouched. The hot file and the attached
+    archive partitions (the newest MAX_ATTACHED_PARTITIONS years) are
+    updated. Totals of the affected ended sessions, the calorie records and
+    the activity calendar are refreshed in the same transaction. Open
+    sessions get their totals when they end. Returns the number of workouts
+    updated.
+    """
+    if weight_kg is None:
+        weight_kg, bmr = profile_body(user_id)
+    rates = rate_table(weight_kg, bmr)
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        schemas = attach_archives(cursor)
+        type_ids = dict(cursor.execute("SELECT name, id FROM workout_types").fetchall())
+        intensity_ids = dict(cursor.execute("SELECT name, id FROM intensities").fetchall())
+        cursor.execute('''
+            CREATE TEMP TABLE IF NOT EXISTS calorie_rates (
+                type_id INTEGER NOT NULL,
+                intensity_id INTEGER NOT NULL,
+                rate REAL NOT NULL,
+                PRIMARY KEY (type_id, intensity_id)
+            )
+        ''')
+        cursor.execute("DELETE FROM temp.calorie_rates")
+        cursor.executemany(
+            "INSERT INTO temp.calorie_rates (type_id, intensity_id, rate) VALUES (?, ?, ?)",
+            [(type_ids[workout_type], intensity_ids[intensity], rate)
+             for (workout_type, intensity), rate in rates.items()
+             if workout_type in type_ids and intensity in intensity_ids]
+        )
+
+        updated = 0
+        fallback = calories_per_minute("Other", "Medium", weight_kg, bmr)
+        for schema in schemas:
+            before = dict(cursor.execute(ESTIMATED_BY_DAY.format(schema=schema), (user_id,)).fetchall())
+            cursor.execute(f'''
+                UPDATE {schema}.workouts
+                SET calories_burned = ROUND(duration * COALESCE(
+                    (SELECT rate FROM temp.calorie_rates r
+                     WHERE r.type_id = workouts.type_id AND r.intensity_id = workouts.intensity_id),
+                    ?), 1)
+                WHERE calories_estimated = 1 AND user_id = ? AND deleted_at IS NULL
+            ''', (fallback, user_id))
+            updated += cursor.rowcount
+            after = cursor.execute(ESTIMATED_BY_DAY.format(schema=schema), (user_id,)).fetchall()
+            adjust_activity_calendar(cursor, [(user_id, day, 0, 0, calories - before.get(day, 0))
+                                              for day, calories in after if calories != before.get(day, 0)])
+
+            # One grouped pass over workouts instead of a correlated subquery per session;
+            # a session and its workouts always sit in the same partition
+            cursor.execute(f'''
+                UPDATE {schema}.sessions
+                SET total_calories = totals.calories
+                FROM (
+                    SELECT session_id, SUM(calories_burned) AS calories
+                    FROM {schema}.workouts
+                    WHERE user_id = ? AND deleted_at IS NULL
+                    GROUP BY session_id
+                    HAVING MAX(calories_estimated) = 1
+                ) AS totals
+                WHERE sessions.id = totals.session_id AND sessions.end_time IS NOT NULL
+            ''', (user_id,))
+
+        # Calorie records may have been set by a workout that burns less now
+        cursor.execute("SELECT type_id FROM personal_records WHERE user_id = ? AND metric = 'calories'", (user_id,))
+        recompute_personal_records(cursor, [(user_id, type_id, "calories") for type_id, in cursor.fetchall()],
+                                   schemas)
+        conn.commit()
+        return updated
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
@@ -0,0 +1,63 @@
+from matplotlib.figure import Figure
+
+EMPTY_MESSAGE = "No data available for the selected period"
+
+
+def draw_chart(ax, data):
+    """Plot chart data from chart_data() on an empty axis.
+
+    The same definitions draw the Statistics charts on the Tk canvas and the
+    report sheets on the Agg backend, so neither depends on pyplot or Tk.
+    """
+    if data["kind"] == "bar":
+        bars = ax.bar(data["labels"], data["values"])
+
+        # Customize
+        ax.set_title(data["title"], fontsize=14)
+        ax.set_xlabel(data["xlabel"], fontsize=12)
+        ax.set_ylabel(data["ylabel"], fontsize=12)
+        ax.grid(axis='y', linestyle='--', alpha=0.7)
+
+        # Add value labels on bars
+        for bar in bars:
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width()/2., height,
+                    data["value_format"].format(height),
+                    ha='center', va='bottom', fontsize=10)
+
+    elif data["kind"] == "pie":
+        ax.pie(data["values"], labels=data["labels"], autopct='%1.1f%%',
+               startangle=90, shadow=True)
+        ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
+        ax.set_title(data["title"], fontsize=14)
+
+    elif data["kind"] in ("message", "empty"):
+        ax.text(0.5, 0.5, data.get("message", EMPTY_MESSAGE),
+               horizontalalignment='center', verticalalignment='center',
+               transform=ax.transAxes, fontsize=12)
+        if data["kind"] == "empty":
+            ax.set_axis_off()
+
+    elif data["kind"] == "load":
+        # Daily load as faint bars behind the fitness, fatigue and form curves
+        dates = data["dates"]
+        ax.bar(dates, data["load"], width=1.0, color='gray', alpha=0.3, label="Daily load")
+        ax.plot(dates, data["ctl"], linewidth=2, label="Fitness (CTL)")
+        ax.plot(dates, data["atl"], linewidth=1.5, label="Fatigue (ATL)")
+        ax.plot(dates, data["tsb"], linewidth=1.5, linestyle='--', label="Form (TSB)")
+        ax.axhline(0, color='black', linewidth=0.5)
+        ax.set_title(data["title"], fontsize=14)
+        ax.set_ylabel(data["ylabel"], fontsize=12)
+        ax.grid(axis='y', linestyle='--', alpha=0.7)
+        ax.legend(loc='upper left')
+        # Slanted dates, as fig.autofmt_xdate() but without touching other axes of the figure
+        ax.tick_params(axis='x', labelrotation=30)
+        for label in ax.get_xticklabels():
+            label.set_horizontalalignment('right')
+
+
+def chart_figure(data):
+    """A new figure holding one chart, sized for the Statistics tab."""
+    fig = Figure(figsize=(10, 6), dpi=100, tight_layout=True)
+    draw_chart(fig.add_subplot(111), data)
+    return fig
@@ -1,40 +1,339 @@
+import calendar
+import json
 import sqlite3
+import sys
 import datetime
+from array import array
 from typing import List, Dict, Any, Tuple, Optional
 
-def create_db():
-    """Create a SQLite database and tables if they don't exist."""
-    conn = sqlite3.connect('fitness_tracker.db')
-    cursor = conn.cursor()
+from query_profiler import profiler, ProfiledConnection
+from replica import replica
+from storage import get_engine
+
+def get_connection():
+    """Open a connection to the configured storage engine, profiled when query profiling is on."""
+    if profiler.enabled:
+        return get_engine().connect(factory=ProfiledConnection)
+    return get_engine().connect()
+
+def get_read_connection():
+    """Open a connection for statistics and history reads, on the analytics replica when it is enabled."""
+    if not replica.enabled:
+        return get_connection()
+    if profiler.enabled:
+        return replica.connect(factory=ProfiledConnection)
+    return replica.connect()
+
+# Profile that owns rows written without a user, and all pre-profile data
+DEFAULT_USER_ID = 1
+
+# Stored columns, in the order archive partitions are read back
+SESSION_COLUMNS = "id, start_time, end_time, total_duration, total_calories, notes, rating, user_id"
+WORKOUT_COLUMNS = ("id, type_id, duration, calories_burned, session_id, date, notes, intensity_id, "
+                   "calories_estimated, user_id, distance")
+
+# Session columns as the API returns them, with timestamps formatted back to text
+SESSION_FIELDS = ("sessions.id, datetime(sessions.start_time, 'unixepoch') AS start_time, "
+                  "datetime(sessions.end_time, 'unixepoch') AS end_time, "
+                  "sessions.total_duration, sessions.total_calories, sessions.notes, sessions.rating")
+
+# Lookup values with fixed ids, so archive files can share them with the hot file
+WORKOUT_TYPES = ["Running", "Walking", "Cycling", "Swimming", "Weight Training", "Yoga", "HIIT", "Other"]
+INTENSITY_LEVELS = {"Low": 1, "Medium": 2, "High": 3}
+
+# Deleted rows stay behind as tombstones (deleted_at set) and are left out
+# of every index except the session lookup that deleting and archiving use
+HISTORY_INDEXES = {
+    "idx_sessions_start_time": "sessions (start_time) WHERE deleted_at IS NULL",
+    "idx_workouts_date": "workouts (date) WHERE deleted_at IS NULL",
+    "idx_workouts_session_id": "workouts (session_id)",
+    # Only unfinished sessions, so crash recovery never scans the history
+    "idx_sessions_open": "sessions (user_id, start_time) WHERE end_time IS NULL AND deleted_at IS NULL",
+    "idx_sessions_user": "sessions (user_id, start_time) WHERE deleted_at IS NULL",
+    "idx_workouts_user": "workouts (user_id, date) WHERE deleted_at IS NULL",
+}
+
+# Columns added to existing history tables by migrate_database, in order
+ADDED_HISTORY_COLUMNS = [
+    # Every row belongs to a profile; existing data goes to the first one
+    ("sessions", "user_id", "INTEGER NOT NULL DEFAULT 1"),
+    ("workouts", "user_id", "INTEGER NOT NULL DEFAULT 1"),
+    # Kilometres, known for workouts imported from activity files
+    ("workouts", "distance", "REAL"),
+    # Epoch seconds of deletion; reads skip rows where it is set
+    ("sessions", "deleted_at", "INTEGER"),
+    ("workouts", "deleted_at", "INTEGER"),
+]
+
+# Personal record metrics, with the label and unit they are shown with
+RECORD_METRICS = {
+    "duration": ("Longest workout", "min"),
+    "calories": ("Most calories", "cal"),
+    "distance": ("Longest distance", "km"),
+    "weekly_duration": ("Best week", "min"),
+}
+
+# Activity calendar metrics, each stored as one float32 per day of the year
+CALENDAR_METRICS = ("workouts", "duration", "calories")
+CALENDAR_SLOTS = 366
+EPOCH_DATE = datetime.date(1970, 1, 1)
+
+# SQLite allows 10 attached databases by default; keep one slot spare
+MAX_ATTACHED_PARTITIONS = 9
+
+# Timestamps are stored as seconds of local wall-clock time (the naive
+# datetime read as if it were UTC) and workout dates as days since
+# 1970-01-01, so SQLite's 'unixepoch' modifier formats them back unchanged.
+
+def to_epoch_seconds(value):
+    """Convert 'YYYY-MM-DD[ HH:MM:SS]' text or a datetime to stored seconds."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    return calendar.timegm(value.timetuple())
+
+def to_epoch_day(value):
+    """Convert 'YYYY-MM-DD' text or a datetime to a stored day number."""
+    if value is None:
+        return None
+    return to_epoch_seconds(value) // 86400
 
-    # Create workouts table
+def create_lookup_tables(cursor):
+    """Create and seed the workout type and intensity lookup tables."""
     cursor.execute('''
-        CREATE TABLE IF NOT EXISTS workouts (
+        CREATE TABLE IF NOT EXISTS workout_types (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS intensities (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            level INTEGER NOT NULL DEFAULT 1
+        )
+    ''')
+    cursor.executemany("INSERT OR IGNORE INTO workout_types (id, name) VALUES (?, ?)",
+                       list(enumerate(WORKOUT_TYPES, 1)))
+    cursor.executemany("INSERT OR IGNORE INTO intensities (id, name, level) VALUES (?, ?, ?)",
+                       [(level, name, level) for name, level in INTENSITY_LEVELS.items()])
+
+def lookup_id(cursor, table, name):
+    """Id of a name in workout_types or intensities, adding the name if it is new."""
+    cursor.execute(f"SELECT id FROM main.{table} WHERE name = ?", (name,))
+    row = cursor.fetchone()
+    if row:
+        return row[0]
+    cursor.execute(f"INSERT INTO main.{table} (name) VALUES (?)", (name,))
+    return cursor.lastrowid
+
+def create_history_tables(cursor, schema="main"):
+    """Create the workouts and sessions tables in the given schema."""
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {schema}.workouts (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            workout_type TEXT NOT NULL,
+            type_id INTEGER NOT NULL REFERENCES workout_types (id),
             duration REAL NOT NULL,
             calories_burned REAL NOT NULL,
             session_id INTEGER,
-            date TEXT NOT NULL,
+            date INTEGER NOT NULL,
             notes TEXT,
-            intensity TEXT DEFAULT 'Medium',
+            intensity_id INTEGER NOT NULL DEFAULT 2 REFERENCES intensities (id),
+            calories_estimated INTEGER DEFAULT 0,
+            user_id INTEGER NOT NULL DEFAULT 1,
+            distance REAL,
+            deleted_at INTEGER,
             FOREIGN KEY (session_id) REFERENCES sessions (id)
         )
     ''')
 
-    # Create sessions table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS sessions (
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {schema}.sessions (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            start_time TEXT NOT NULL,
-            end_time TEXT,
+            start_time INTEGER NOT NULL,
+            end_time INTEGER,
             total_duration REAL,
             total_calories REAL,
             notes TEXT,
-            rating INTEGER
+            rating INTEGER,
+            user_id INTEGER NOT NULL DEFAULT 1,
+            deleted_at INTEGER
         )
     ''')
 
+def create_history_indexes(cursor, schema="main"):
+    """Create the indexes on the workouts and sessions tables in the given schema.
+
+    An index created with an older definition is dropped and rebuilt.
+    """
+    for name, target in HISTORY_INDEXES.items():
+        cursor.execute(f"SELECT sql FROM {schema}.sqlite_master WHERE type = 'index' AND name = ?", (name,))
+        row = cursor.fetchone()
+        if row and row[0] == f"CREATE INDEX {name} ON {target}":
+            continue
+        if row:
+            print(f"Migrating database: Rebuilding index {name}")
+            cursor.execute(f"DROP INDEX {schema}.{name}")
+        cursor.execute(f"CREATE INDEX {schema}.{name} ON {target}")
+
+def missing_history_columns(cursor, schema="main"):
+    """Columns of ADDED_HISTORY_COLUMNS that the history tables in schema lack."""
+    missing = []
+    for table, column, definition in ADDED_HISTORY_COLUMNS:
+        cursor.execute(f"PRAGMA {schema}.table_info({table})")
+        if column not in [info[1] for info in cursor.fetchall()]:
+            missing.append((table, column, definition))
+    return missing
+
+def add_history_columns(cursor, schema="main"):
+    """Add columns introduced after the history tables in schema were created."""
+    for table, column, definition in missing_history_columns(cursor, schema):
+        print(f"Migrating database: Adding '{column}' column to {table} table")
+        cursor.execute(f"ALTER TABLE {schema}.{table} ADD COLUMN {column} {definition}")
+
+def convert_history_tables(cursor, schema="main"):
+    """Rebuild text-column workouts and sessions tables in schema with integer columns.
+
+    Timestamps become epoch seconds, workout dates epoch days, and workout
+    types and intensities ids into the lookup tables of the main database.
+    Runs inside the caller's transaction.
+    """
+    create_lookup_tables(cursor)
+    cursor.execute(f"INSERT OR IGNORE INTO main.workout_types (name) SELECT DISTINCT workout_type FROM {schema}.workouts")
+    cursor.execute(f'''
+        INSERT OR IGNORE INTO main.intensities (name)
+        SELECT DISTINCT COALESCE(intensity, 'Medium') FROM {schema}.workouts
+    ''')
+
+    # The indexes may already sit on the text tables if create_db ran first
+    for name in HISTORY_INDEXES:
+        cursor.execute(f"DROP INDEX IF EXISTS {schema}.{name}")
+    cursor.execute(f"ALTER TABLE {schema}.workouts RENAME TO workouts_text")
+    cursor.execute(f"ALTER TABLE {schema}.sessions RENAME TO sessions_text")
+    create_history_tables(cursor, schema)
+
+    cursor.execute(f'''
+        INSERT INTO {schema}.sessions (id, start_time, end_time, total_duration, total_calories, notes, rating)
+        SELECT id, CAST(strftime('%s', start_time) AS INTEGER), CAST(strftime('%s', end_time) AS INTEGER),
+               total_duration, total_calories, notes, rating
+        FROM {schema}.sessions_text
+    ''')
+    cursor.execute(f'''
+        INSERT INTO {schema}.workouts (id, type_id, duration, calories_burned, session_id, date, notes,
+                                       intensity_id, calories_estimated)
+        SELECT w.id, t.id, w.duration, w.calories_burned, w.session_id,
+               CAST(strftime('%s', w.date) AS INTEGER) / 86400, w.notes, i.id, w.calories_estimated
+        FROM {schema}.workouts_text w
+        JOIN main.workout_types t ON t.name = w.workout_type
+        JOIN main.intensities i ON i.name = COALESCE(w.intensity, 'Medium')
+    ''')
+
+    # Keep AUTOINCREMENT counters so ids of deleted rows are not handed out again
+    for table in ("sessions", "workouts"):
+        cursor.execute(f'''
+            UPDATE {schema}.sqlite_sequence
+            SET seq = MAX(seq, COALESCE((SELECT seq FROM {schema}.sqlite_sequence WHERE name = '{table}_text'), 0))
+            WHERE name = '{table}'
+        ''')
+        cursor.execute(f"DROP TABLE {schema}.{table}_text")
+
+def archive_partitions_for(cursor, start_date=None, end_date=None, session_id=None):
+    """Return (year, path) of archive partitions a query needs to read.
+
+    Partitions are chosen by overlap of their date span with the query range,
+    or by session id when looking up a single session.
+    """
+    query = "SELECT year, path FROM main.archive_partitions"
+    conditions = []
+    params = []
+    if session_id is not None:
+        conditions.append("? BETWEEN min_session_id AND max_session_id")
+        params.append(session_id)
+    if start_date:
+        conditions.append("last_date >= ?")
+        params.append(start_date)
+    if end_date:
+        conditions.append("first_date <= ?")
+        params.append(end_date)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    cursor.execute(query + " ORDER BY year", params)
+    return cursor.fetchall()
+
+def live_sources(schemas):
+    """{workouts} and {sessions} placeholders reading the undeleted rows of the given schemas.
+
+    The deleted_at filter is what lets the planner use the partial indexes.
+    """
+    sources = {}
+    for table, columns in (("workouts", WORKOUT_COLUMNS), ("sessions", SESSION_COLUMNS)):
+        union = " UNION ALL ".join(f"SELECT {columns} FROM {schema}.{table} WHERE deleted_at IS NULL"
+                                   for schema in schemas)
+        sources[table] = f"({union}) AS {table}"
+    return sources
+
+def run_partitioned(cursor, query, params, partitions):
+    """Run query over the hot tables plus the given archive partitions.
+
+    The query names its tables as {workouts} and {sessions}, which only hold
+    rows that have not been deleted. Without partitions they read the hot
+    file alone. Otherwise partitions are attached in batches and each
+    placeholder becomes a UNION ALL across them. Returns one list of rows per
+    batch; callers merge when there is more than one.
+    """
+    if not partitions:
+        cursor.execute(query.format(**live_sources(["main"])), params)
+        return [cursor.fetchall()]
+
+    results = []
+    for start in range(0, len(partitions), MAX_ATTACHED_PARTITIONS):
+        batch = partitions[start:start + MAX_ATTACHED_PARTITIONS]
+        aliases = []
+        try:
+            for year, path in batch:
+                alias = f"archive_{year}"
+                cursor.execute("ATTACH DATABASE ? AS " + alias, (path,))
+                aliases.append(alias)
+
+            # The hot tables only take part in the first batch
+            schemas = (["main"] if start == 0 else []) + aliases
+            cursor.execute(query.format(**live_sources(schemas)), params)
+            results.append(cursor.fetchall())
+        finally:
+            for alias in aliases:
+                cursor.execute("DETACH DATABASE " + alias)
+    return results
+
+def enable_incremental_vacuum(conn):
+    """Switch the database to auto_vacuum=INCREMENTAL, rebuilding it once with VACUUM if it has data.
+
+    The mode itself records that this was done. The VACUUM rewrites the whole
+    file, so it runs as a one-off startup step rather than in the idle-time
+    maintenance slices, which interrupt it and would restart it every time.
+    """
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+        return
+    has_data = conn.execute("PRAGMA page_count").fetchone()[0] > 0
+    # Takes effect at once on a new database, and only after a VACUUM on an existing one
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    if has_data:
+        print("Migrating database: Enabling incremental vacuum")
+        try:
+            conn.execute("VACUUM")
+        except sqlite3.Error as e:
+            print(f"Error during migration: {e}")
+
+def create_db():
+    """Create a SQLite database and tables if they don't exist."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    enable_incremental_vacuum(conn)
+
+    # Create lookup, workouts and sessions tables
+    create_lookup_tables(cursor)
+    create_history_tables(cursor)
+
     # Create goals table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS goals (
@@ -44,7 +343,96 @@ def create_db():
             start_date TEXT NOT NULL,
             end_date TEXT NOT NULL,
             completed INTEGER DEFAULT 0,
-            notes TEXT
+            notes TEXT,
+            user_id INTEGER NOT NULL DEFAULT 1
+        )
+    ''')
+
+    # Chunked, delta-encoded sample streams of workouts (see samples.py)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS workout_samples (
+            workout_id INTEGER NOT NULL,
+            stream INTEGER NOT NULL,
+            first_time INTEGER NOT NULL,
+            last_time INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            first_value INTEGER NOT NULL,
+            width INTEGER NOT NULL,
+            data BLOB NOT NULL,
+            PRIMARY KEY (workout_id, stream, first_time)
+        )
+    ''')
+
+    # Analytics caches (see analytics.py): time in heart rate zone per
+    # workout, and daily training load with its fitness/fatigue curves
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS workout_zones (
+            workout_id INTEGER PRIMARY KEY,
+            max_hr INTEGER NOT NULL,
+            zone0 REAL NOT NULL,
+            zone1 REAL NOT NULL,
+            zone2 REAL NOT NULL,
+            zone3 REAL NOT NULL,
+            zone4 REAL NOT NULL,
+            zone5 REAL NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS training_load (
+            user_id INTEGER NOT NULL,
+            day INTEGER NOT NULL,
+            load REAL NOT NULL,
+            ctl REAL NOT NULL,
+            atl REAL NOT NULL,
+            PRIMARY KEY (user_id, day)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS training_load_state (
+            user_id INTEGER PRIMARY KEY,
+            max_hr INTEGER NOT NULL,
+            last_workout_id INTEGER NOT NULL,
+            dirty_from INTEGER
+        )
+    ''')
+
+    # Best value per profile, workout type and metric (see RECORD_METRICS),
+    # kept current by every insert so lookups never scan the history
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS personal_records (
+            user_id INTEGER NOT NULL,
+            type_id INTEGER NOT NULL,
+            metric TEXT NOT NULL,
+            value REAL NOT NULL,
+            workout_id INTEGER NOT NULL,
+            date INTEGER NOT NULL,
+            PRIMARY KEY (user_id, type_id, metric)
+        ) WITHOUT ROWID
+    ''')
+
+    # Daily totals per profile and year for the activity calendar, one
+    # 366-slot float32 array per metric (see CALENDAR_METRICS), kept current
+    # by every insert, edit and delete
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS activity_calendar (
+            user_id INTEGER NOT NULL,
+            year INTEGER NOT NULL,
+            workouts BLOB NOT NULL,
+            duration BLOB NOT NULL,
+            calories BLOB NOT NULL,
+            PRIMARY KEY (user_id, year)
+        ) WITHOUT ROWID
+    ''')
+
+    # Registry of per-year archive files (see archive.py)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS archive_partitions (
+            year INTEGER PRIMARY KEY,
+            path TEXT NOT NULL,
+            first_date TEXT NOT NULL,
+            last_date TEXT NOT NULL,
+            min_session_id INTEGER NOT NULL,
+            max_session_id INTEGER NOT NULL
         )
     ''')
 
@@ -71,39 +459,135 @@ def create_db():
 
 def migrate_database():
     """Update database schema if needed."""
-    conn = sqlite3.connect('fitness_tracker.db')
+    conn = get_connection()
     cursor = conn.cursor()
     
-    # Check if 'intensity' column exists in workouts table
     cursor.execute("PRAGMA table_info(workouts)")
     columns = [column[1] for column in cursor.fetchall()]
     
-    if 'intensity' not in columns:
+    if 'type_id' not in columns:
+        # Check if 'intensity' column exists in workouts table
+        if 'intensity' not in columns:
+            try:
+                print("Migrating database: Adding 'intensity' column to workouts table")
+                cursor.execute("ALTER TABLE workouts ADD COLUMN intensity TEXT DEFAULT 'Medium'")
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"Error during migration: {e}")
+        
+        # Check for other required columns
+        if 'notes' not in columns:
+            try:
+                print("Migrating database: Adding 'notes' column to workouts table")
+                cursor.execute("ALTER TABLE workouts ADD COLUMN notes TEXT")
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"Error during migration: {e}")
+        
+        # Track which calorie values were estimated so they can follow profile changes
+        if 'calories_estimated' not in columns:
+            try:
+                print("Migrating database: Adding 'calories_estimated' column to workouts table")
+                cursor.execute("ALTER TABLE workouts ADD COLUMN calories_estimated INTEGER DEFAULT 0")
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"Error during migration: {e}")
+        
+        # Text timestamps and type/intensity names become integers
         try:
-            print("Migrating database: Adding 'intensity' column to workouts table")
-            cursor.execute("ALTER TABLE workouts ADD COLUMN intensity TEXT DEFAULT 'Medium'")
+            print("Migrating database: Converting sessions and workouts to integer columns")
+            cursor.execute("BEGIN")
+            convert_history_tables(cursor)
             conn.commit()
+            cursor.execute("VACUUM")
         except sqlite3.Error as e:
+            conn.rollback()
             print(f"Error during migration: {e}")
     
-    # Check for other required columns
-    if 'notes' not in columns:
+    try:
+        add_history_columns(cursor)
+        cursor.execute("PRAGMA table_info(goals)")
+        if 'user_id' not in [column[1] for column in cursor.fetchall()]:
+            print("Migrating database: Adding 'user_id' column to goals table")
+            cursor.execute("ALTER TABLE goals ADD COLUMN user_id INTEGER NOT NULL DEFAULT 1")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_goals_user ON goals (user_id, end_date)")
+        create_history_indexes(cursor)
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"Error during migration: {e}")
+    
+    migrate_archives(conn, cursor)
+    
+    # Databases from before personal records get theirs from the history once
+    cursor.execute('''
+        SELECT NOT EXISTS (SELECT 1 FROM personal_records)
+               AND (EXISTS (SELECT 1 FROM workouts) OR EXISTS (SELECT 1 FROM archive_partitions))
+    ''')
+    needs_records = cursor.fetchone()[0]
+    cursor.execute('''
+        SELECT NOT EXISTS (SELECT 1 FROM activity_calendar)
+               AND (EXISTS (SELECT 1 FROM workouts) OR EXISTS (SELECT 1 FROM archive_partitions))
+    ''')
+    needs_calendar = cursor.fetchone()[0]
+    conn.close()
+    if needs_records:
+        print("Migrating database: Building personal records")
+        rebuild_personal_records()
+    if needs_calendar:
+        print("Migrating database: Building the activity calendar")
+        rebuild_activity_calendar()
+
+def migrate_archives(conn, cursor):
+    """Bring archive partitions up to the current history table layout."""
+    import os
+    try:
+        cursor.execute("SELECT year, path FROM archive_partitions ORDER BY year")
+        partitions = cursor.fetchall()
+    except sqlite3.Error:
+        return
+    
+    for year, path in partitions:
+        if not os.path.exists(path):
+            continue
+        cursor.execute("ATTACH DATABASE ? AS archive", (path,))
         try:
-            print("Migrating database: Adding 'notes' column to workouts table")
-            cursor.execute("ALTER TABLE workouts ADD COLUMN notes TEXT")
+            cursor.execute("PRAGMA archive.table_info(workouts)")
+            columns = [column[1] for column in cursor.fetchall()]
+            if 'type_id' in columns and not missing_history_columns(cursor, "archive"):
+                continue
+            print(f"Migrating database: Updating archive partition {year}")
+            cursor.execute("BEGIN")
+            if 'type_id' not in columns:
+                convert_history_tables(cursor, "archive")
+            add_history_columns(cursor, "archive")
+            create_history_indexes(cursor, "archive")
             conn.commit()
         except sqlite3.Error as e:
+            conn.rollback()
             print(f"Error during migration: {e}")
-    
-    conn.close()
+        finally:
+            cursor.execute("DETACH DATABASE archive")
 
 # Add function to reset database if needed (be careful with this!)
 def reset_database():
     """Delete and recreate the database with empty tables."""
     import os
     try:
-        if os.path.exists('fitness_tracker.db'):
-            os.remove('fitness_tracker.db')
+        # Archive files belong to this database and would clash with reused ids
+        engine = get_engine()
+        if engine.exists():
+            conn = get_connection()
+            try:
+                paths = [row[0] for row in conn.execute("SELECT path FROM archive_partitions")]
+            except sqlite3.Error:
+                paths = []
+            conn.close()
+            for path in paths:
+                if os.path.exists(path):
+                    os.remove(path)
+        
+        if engine.exists():
+            engine.destroy()
             print("Database reset: Deleted existing database.")
         create_db()
         print("Database reset: Created new empty database.")
@@ -112,122 +596,653 @@ def reset_database():
         print(f"Error resetting database: {e}")
         return False
 
-def add_workout(workout_type, duration, calories_burned, session_id, intensity="Medium", notes=""):
+def write_workout(cursor, workout_type, duration, calories_burned, session_id, intensity="Medium", notes="",
+                  calories_estimated=False, user_id=DEFAULT_USER_ID):
+    """Insert a workout using the caller's cursor and transaction."""
+    date = to_epoch_day(datetime.datetime.now())
+    type_id = lookup_id(cursor, "workout_types", workout_type)
+    intensity_id = lookup_id(cursor, "intensities", intensity)
+    cursor.execute('''
+        INSERT INTO workouts (type_id, duration, calories_burned, session_id, date, notes, intensity_id,
+                              calories_estimated, user_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (type_id, duration, calories_burned, session_id, date, notes, intensity_id,
+          1 if calories_estimated else 0, user_id))
+    workout_id = cursor.lastrowid
+    update_personal_records(cursor, [workout_id])
+    update_activity_calendar(cursor, [workout_id])
+    return workout_id
+
+def add_workout(workout_type, duration, calories_burned, session_id, intensity="Medium", notes="",
+                calories_estimated=False, user_id=DEFAULT_USER_ID):
     """Insert a new workout into the database."""
-    conn = sqlite3.connect('fitness_tracker.db')
+    conn = get_connection()
     cursor = conn.cursor()
-    date = datetime.datetime.now().strftime('%Y-%m-%d')
-    cursor.execute('''
-        INSERT INTO workouts (workout_type, duration, calories_burned, session_id, date, notes, intensity)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    ''', (workout_type, duration, calories_burned, session_id, date, notes, intensity))
+    write_workout(cursor, workout_type, duration, calories_burned, session_id, intensity, notes,
+                  calories_estimated, user_id)
     conn.commit()
     conn.close()
 
-def add_session(start_time, end_time, total_duration, total_calories, session_id=None, notes="", rating=None):
-    """Insert or update a session in the database."""
-    conn = sqlite3.connect('fitness_tracker.db')
-    cursor = conn.cursor()
-    
+def write_session(cursor, start_time, end_time, total_duration, total_calories, session_id=None, notes="",
+                  rating=None, user_id=DEFAULT_USER_ID):
+    """Insert or update a session using the caller's cursor and transaction."""
     if session_id:
         # Update existing session
         cursor.execute('''
             UPDATE sessions 
             SET end_time = ?, total_duration = ?, total_calories = ?, notes = ?, rating = ?
             WHERE id = ?
-        ''', (end_time, total_duration, total_calories, notes, rating, session_id))
+        ''', (to_epoch_seconds(end_time), total_duration, total_calories, notes, rating, session_id))
     else:
         # Insert new session
         cursor.execute('''
-            INSERT INTO sessions (start_time, end_time, total_duration, total_calories, notes, rating)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (start_time, end_time, total_duration, total_calories, notes, rating))
+            INSERT INTO sessions (start_time, end_time, total_duration, total_calories, notes, rating, user_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (to_epoch_seconds(start_time), to_epoch_seconds(end_time), total_duration, total_calories,
+              notes, rating, user_id))
         session_id = cursor.lastrowid
-    
+    return session_id
+
+def add_session(start_time, end_time, total_duration, total_calories, session_id=None, notes="", rating=None,
+                user_id=DEFAULT_USER_ID):
+    """Insert or update a session in the database."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    session_id = write_session(cursor, start_time, end_time, total_duration, total_calories, session_id,
+                               notes, rating, user_id)
     conn.commit()
     conn.close()
     return session_id
 
-def get_session_details(session_id):
-    """Retrieve all workouts for a session."""
-    conn = sqlite3.connect('fitness_tracker.db')
+def write_activities(cursor, activities, user_id=DEFAULT_USER_ID):
+    """Insert finished (start_time, workout) pairs as one-workout sessions in bulk.
+
+    Activities whose start time matches a session the profile already has,
+    in the hot file or an archive partition, or an earlier activity in the
+    list, are skipped, so importing the same files twice does not duplicate
+    them. Session and workout ids are
+    assigned up front so both tables are filled with a single executemany
+    each. Runs inside the caller's transaction and returns the new workout id
+    of every activity, None for skipped ones.
+    """
+    firsts = {}
+    for index, (start_time, workout) in enumerate(activities):
+        firsts.setdefault(to_epoch_seconds(start_time), index)
+    workout_ids = [None] * len(activities)
+    if not firsts:
+        return workout_ids
+    cursor.execute('''
+        SELECT start_time FROM sessions WHERE user_id = ? AND start_time BETWEEN ? AND ? AND deleted_at IS NULL
+    ''', (user_id, min(firsts), max(firsts)))
+    existing = {start for start, in cursor.fetchall()}
+    existing |= archived_session_starts(user_id, min(firsts), max(firsts))
+    for start in existing:
+        firsts.pop(start, None)
+    if not firsts:
+        return workout_ids
+
+    # AUTOINCREMENT never reuses ids, so start after the highest ever handed out
+    next_ids = {}
+    for table in ("sessions", "workouts"):
+        cursor.execute(f'''
+            SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = '{table}'), 0),
+                       COALESCE((SELECT MAX(id) FROM {table}), 0))
+        ''')
+        next_ids[table] = cursor.fetchone()[0] + 1
+    type_ids = {}
+    intensity_ids = {}
+    sessions = []
+    workouts = []
+    for offset, (start, index) in enumerate(sorted(firsts.items())):
+        workout = activities[index][1]
+        session_id = next_ids["sessions"] + offset
+        workout_ids[index] = next_ids["workouts"] + offset
+        if workout.workout_type not in type_ids:
+            type_ids[workout.workout_type] = lookup_id(cursor, "workout_types", workout.workout_type)
+        if workout.intensity not in intensity_ids:
+            intensity_ids[workout.intensity] = lookup_id(cursor, "intensities", workout.intensity)
+        sessions.append((session_id, start, start + round(workout.duration * 60), workout.duration,
+                         workout.calories_burned, workout.notes, user_id))
+        workouts.append((workout_ids[index], type_ids[workout.workout_type], workout.duration,
+                         workout.calories_burned, session_id, start // 86400, workout.notes,
+                         intensity_ids[workout.intensity], 1 if workout.calories_estimated else 0, user_id,
+                         workout.distance))
+
+    cursor.executemany('''
+        INSERT INTO sessions (id, start_time, end_time, total_duration, total_calories, notes, user_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', sessions)
+    cursor.executemany('''
+        INSERT INTO workouts (id, type_id, duration, calories_burned, session_id, date, notes, intensity_id,
+                              calories_estimated, user_id, distance)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', workouts)
+    update_personal_records(cursor, workout_ids)
+    update_activity_calendar(cursor, workout_ids)
+    return workout_ids
+
+def archived_session_starts(user_id, first, last):
+    """Start times (stored seconds) of a profile's archived sessions from first to last.
+
+    Reads on a connection of its own: the caller is inside a transaction,
+    where archives cannot be attached, and archives only hold committed
+    history anyway.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        partitions = archive_partitions_for(cursor, (EPOCH_DATE + datetime.timedelta(days=first // 86400)).isoformat(),
+                                            (EPOCH_DATE + datetime.timedelta(days=last // 86400)).isoformat())
+        if not partitions:
+            return set()
+        batches = run_partitioned(cursor, '''
+            SELECT start_time FROM {sessions} WHERE user_id = ? AND start_time BETWEEN ? AND ?
+        ''', (user_id, first, last), partitions)
+        return {start for rows in batches for start, in rows}
+    finally:
+        conn.close()
+
+def add_activities(activities, user_id=DEFAULT_USER_ID):
+    """Insert finished (start_time, workout) pairs in one transaction; see write_activities.
+
+    Returns the number of activities inserted.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        workout_ids = write_activities(cursor, activities, user_id)
+        conn.commit()
+        return sum(1 for workout_id in workout_ids if workout_id is not None)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def update_personal_records(cursor, workout_ids):
+    """Raise the personal records beaten by newly inserted workouts.
+
+    Runs inside the caller's transaction. Each workout is compared with the
+    stored record of its type, and the week it falls in is re-summed, so
+    the cost does not grow with the history. Weeks are totalled from the
+    hot tables only; a rebuild also counts archived workouts. Returns
+    (user_id, type_id, metric, value) for every record set.
+    """
+    ids = [workout_id for workout_id in workout_ids if workout_id is not None]
+    best = {}
+
+    def offer(key, value, workout_id, date):
+        if value is not None and (key not in best or value > best[key][0]):
+            best[key] = (value, workout_id, date)
+
+    weeks = set()
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        cursor.execute(f'''
+            SELECT id, user_id, type_id, date, duration, calories_burned, distance FROM main.workouts
+            WHERE id IN ({", ".join("?" * len(chunk))}) AND deleted_at IS NULL
+        ''', chunk)
+        for workout_id, user_id, type_id, date, duration, calories, distance in cursor.fetchall():
+            offer((user_id, type_id, "duration"), duration, workout_id, date)
+            offer((user_id, type_id, "calories"), calories, workout_id, date)
+            offer((user_id, type_id, "distance"), distance, workout_id, date)
+            weeks.add((user_id, type_id, (date + 3) // 7))
+    for user_id, type_id, week in weeks:
+        first_day = week * 7 - 3
+        cursor.execute('''
+            SELECT SUM(duration), MAX(id) FROM main.workouts
+            WHERE user_id = ? AND date BETWEEN ? AND ? AND type_id = ? AND deleted_at IS NULL
+        ''', (user_id, first_day, first_day + 6, type_id))
+        total, last_id = cursor.fetchone()
+        offer((user_id, type_id, "weekly_duration"), total, last_id, first_day)
+
+    records = []
+    for (user_id, type_id, metric), (value, workout_id, date) in best.items():
+        cursor.execute('''
+            SELECT value FROM main.personal_records WHERE user_id = ? AND type_id = ? AND metric = ?
+        ''', (user_id, type_id, metric))
+        current = cursor.fetchone()
+        if current is None or value > current[0]:
+            cursor.execute('''
+                INSERT OR REPLACE INTO main.personal_records (user_id, type_id, metric, value, workout_id, date)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (user_id, type_id, metric, value, workout_id, date))
+            records.append((user_id, type_id, metric, value))
+    return records
+
+def rebuild_personal_records(user_id=None):
+    """Recompute the personal records of one profile, or of all, from the full history.
+
+    One windowed query finds the best workout (and weekly total) per type
+    and metric, the earliest one on ties. Per-type maxima come from a
+    window rather than ranking each metric separately, so the history is
+    sorted once instead of once per metric.
+    """
+    query = '''
+        WITH history AS (
+            SELECT id, user_id, type_id, date, duration, calories_burned, distance,
+                   MAX(duration) OVER profile_type AS best_duration,
+                   MAX(calories_burned) OVER profile_type AS best_calories,
+                   MAX(distance) OVER profile_type AS best_distance
+            FROM {workouts}
+            WHERE ? IS NULL OR workouts.user_id = ?
+            WINDOW profile_type AS (PARTITION BY user_id, type_id)
+        ), weeks AS (
+            SELECT user_id, type_id, (date + 3) / 7 AS week, SUM(duration) AS total, MAX(id) AS id
+            FROM {workouts}
+            WHERE ? IS NULL OR workouts.user_id = ?
+            GROUP BY user_id, type_id, week
+        ), candidates AS (
+            SELECT user_id, type_id, 'duration' AS metric, duration AS value, id, date FROM history
+            WHERE duration = best_duration
+            UNION ALL
+            SELECT user_id, type_id, 'calories', calories_burned, id, date FROM history
+            WHERE calories_burned = best_calories
+            UNION ALL
+            SELECT user_id, type_id, 'distance', distance, id, date FROM history
+            WHERE distance = best_distance
+            UNION ALL
+            SELECT user_id, type_id, 'weekly_duration', total, id, week * 7 - 3 FROM weeks
+        )
+        SELECT user_id, type_id, metric, value, id, date FROM (
+            SELECT *, ROW_NUMBER() OVER (
+                PARTITION BY user_id, type_id, metric ORDER BY value DESC, date, id
+            ) AS position
+            FROM candidates
+        )
+        WHERE position = 1
+    '''
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        batches = run_partitioned(cursor, query, (user_id,) * 4, archive_partitions_for(cursor))
+        # With more archives than can be attached at once each batch ranks
+        # its own years; the best of the batches wins
+        best = {}
+        for rows in batches:
+            for row in rows:
+                key = row[:3]
+                if key not in best or row[3] > best[key][3]:
+                    best[key] = row
+        cursor.execute("BEGIN IMMEDIATE")
+        if user_id is None:
+            cursor.execute("DELETE FROM personal_records")
+        else:
+            cursor.execute("DELETE FROM personal_records WHERE user_id = ?", (user_id,))
+        cursor.executemany('''
+            INSERT INTO personal_records (user_id, type_id, metric, value, workout_id, date)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', best.values())
+        conn.commit()
+        return len(best)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def get_personal_records(user_id=DEFAULT_USER_ID):
+    """Return {(workout_type, metric): (value, workout_id, date)} of a profile."""
+    conn = get_connection()
     cursor = conn.cursor()
     cursor.execute('''
-        SELECT workout_type, duration, calories_burned, intensity, notes
-        FROM workouts
-        WHERE session_id = ?
-    ''', (session_id,))
-    workouts = cursor.fetchall()
+        SELECT workout_types.name, r.metric, r.value, r.workout_id, date(r.date * 86400, 'unixepoch')
+        FROM personal_records r JOIN workout_types ON workout_types.id = r.type_id
+        WHERE r.user_id = ?
+    ''', (user_id,))
+    records = {(name, metric): (value, workout_id, date) for name, metric, value, workout_id, date in cursor.fetchall()}
     conn.close()
-    return workouts
+    return records
+
+def calendar_slot(day):
+    """(year, slot) of a stored day number; slot 0 is January 1st, 365 only exists in leap years."""
+    value = EPOCH_DATE + datetime.timedelta(days=day)
+    return value.year, value.timetuple().tm_yday - 1
+
+def empty_calendar():
+    return {metric: array('f', bytes(4 * CALENDAR_SLOTS)) for metric in CALENDAR_METRICS}
+
+def decode_calendar(row):
+    """{metric: array('f') of CALENDAR_SLOTS daily totals} from the BLOBs of an activity_calendar row."""
+    arrays = {}
+    for metric, blob in zip(CALENDAR_METRICS, row):
+        values = array('f')
+        values.frombytes(blob)
+        if sys.byteorder == "big":
+            values.byteswap()
+        arrays[metric] = values
+    return arrays
+
+def encode_calendar(arrays):
+    """Little-endian BLOBs of calendar arrays, in CALENDAR_METRICS order."""
+    blobs = []
+    for metric in CALENDAR_METRICS:
+        values = arrays[metric]
+        if sys.byteorder == "big":
+            values = array('f', values)
+            values.byteswap()
+        blobs.append(values.tobytes())
+    return blobs
+
+def adjust_activity_calendar(cursor, deltas):
+    """Add (user_id, day, workouts, duration, calories) deltas to the stored calendar arrays.
+
+    Runs inside the caller's transaction. Each profile-year touched is read,
+    changed and written back once, however many deltas fall into it.
+    """
+    years = {}
+    for user_id, day, workouts, duration, calories in deltas:
+        year, slot = calendar_slot(day)
+        years.setdefault((user_id, year), []).append((slot, workouts, duration or 0.0, calories or 0.0))
+    for (user_id, year), changes in years.items():
+        cursor.execute(f'''
+            SELECT {", ".join(CALENDAR_METRICS)} FROM main.activity_calendar WHERE user_id = ? AND year = ?
+        ''', (user_id, year))
+        row = cursor.fetchone()
+        arrays = decode_calendar(row) if row else empty_calendar()
+        for slot, workouts, duration, calories in changes:
+            arrays["workouts"][slot] += workouts
+            arrays["duration"][slot] += duration
+            arrays["calories"][slot] += calories
+        cursor.execute('''
+            INSERT OR REPLACE INTO main.activity_calendar (user_id, year, workouts, duration, calories)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [user_id, year] + encode_calendar(arrays))
+
+def update_activity_calendar(cursor, workout_ids):
+    """Count newly inserted workouts into the activity calendar; runs inside the caller's transaction."""
+    ids = [workout_id for workout_id in workout_ids if workout_id is not None]
+    deltas = []
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        cursor.execute(f'''
+            SELECT user_id, date, 1, duration, calories_burned FROM main.workouts
+            WHERE id IN ({", ".join("?" * len(chunk))}) AND deleted_at IS NULL
+        ''', chunk)
+        deltas.extend(cursor.fetchall())
+    adjust_activity_calendar(cursor, deltas)
+
+def rebuild_activity_calendar(user_id=None):
+    """Recompute the activity calendar of one profile, or of all, from the full history."""
+    query = '''
+        SELECT user_id, date, COUNT(*), SUM(duration), SUM(calories_burned) FROM {workouts}
+        WHERE ? IS NULL OR workouts.user_id = ?
+        GROUP BY user_id, date
+    '''
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        batches = run_partitioned(cursor, query, (user_id, user_id), archive_partitions_for(cursor))
+        cursor.execute("BEGIN IMMEDIATE")
+        if user_id is None:
+            cursor.execute("DELETE FROM activity_calendar")
+        else:
+            cursor.execute("DELETE FROM activity_calendar WHERE user_id = ?", (user_id,))
+        adjust_activity_calendar(cursor, [row for rows in batches for row in rows])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def get_activity_calendar(year, user_id=DEFAULT_USER_ID):
+    """{metric: list of CALENDAR_SLOTS daily totals} of a profile's year; zeros if nothing was logged."""
+    conn = get_read_connection()
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        SELECT {", ".join(CALENDAR_METRICS)} FROM activity_calendar WHERE user_id = ? AND year = ?
+    ''', (user_id, year))
+    row = cursor.fetchone()
+    conn.close()
+    arrays = decode_calendar(row) if row else empty_calendar()
+    return {metric: values.tolist() for metric, values in arrays.items()}
 
-def get_sessions(start_date=None, end_date=None):
-    """Retrieve sessions from the database with optional date filtering."""
-    conn = sqlite3.connect('fitness_tracker.db')
+def get_activity_years(user_id=DEFAULT_USER_ID):
+    """Years the profile has calendar data for, oldest first."""
+    conn = get_read_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT year FROM activity_calendar WHERE user_id = ? ORDER BY year", (user_id,))
+    years = [row[0] for row in cursor.fetchall()]
+    conn.close()
+    return years
+
+def invalidate_workout_analytics(cursor, workout_id):
+    """Drop cached analytics that depend on a workout whose data changed.
+
+    Its zone times are recomputed on next use, and the training load of its
+    profile from the workout's day onwards. Runs inside the caller's
+    transaction.
+    """
+    cursor.execute("DELETE FROM main.workout_zones WHERE workout_id = ?", (workout_id,))
+    cursor.execute('''
+        UPDATE main.training_load_state
+        SET dirty_from = MIN(COALESCE(dirty_from, w.date), w.date)
+        FROM (SELECT user_id, date FROM main.workouts WHERE id = ?) AS w
+        WHERE training_load_state.user_id = w.user_id
+    ''', (workout_id,))
+
+def get_open_sessions(user_id=None):
+    """Return sessions that were started but never ended, newest first.
+
+    Rows are SESSION_FIELDS followed by the user id of the session.
+    """
+    conn = get_connection()
     cursor = conn.cursor()
     
-    query = 'SELECT * FROM sessions'
+    # Pinned to idx_sessions_open: without statistics the planner prefers
+    # idx_sessions_user or idx_sessions_start_time, which walk the whole
+    # history. Archives only ever hold closed sessions
+    query = f'SELECT {SESSION_FIELDS}, sessions.user_id FROM sessions INDEXED BY idx_sessions_open WHERE sessions.end_time IS NULL AND sessions.deleted_at IS NULL'
+    params = []
+    if user_id is not None:
+        query += ' AND sessions.user_id = ?'
+        params.append(user_id)
+    cursor.execute(query + ' ORDER BY sessions.start_time DESC', params)
+    sessions = cursor.fetchall()
+    conn.close()
+    return sessions
+
+def get_session_details(session_id):
+    """Retrieve all workouts for a session.
+
+    Rows are (type, duration, calories, intensity, notes, workout id).
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    # Archives whose id range covers the session; imported sessions can make
+    # ranges overlap with hot ids, so the hot file is always read as well
+    partitions = archive_partitions_for(cursor, session_id=session_id)
+    batches = run_partitioned(cursor, '''
+        SELECT workout_types.name, workouts.duration, workouts.calories_burned, intensities.name, workouts.notes,
+               workouts.id
+        FROM {workouts}
+        JOIN main.workout_types ON workout_types.id = workouts.type_id
+        JOIN main.intensities ON intensities.id = workouts.intensity_id
+        WHERE workouts.session_id = ?
+        ORDER BY workouts.id
+    ''', (session_id,), partitions)
+    workouts = [row for rows in batches for row in rows]
+    conn.close()
+    return workouts
+
+def session_filter(start_date=None, end_date=None, user_id=None):
+    """WHERE clause and parameters selecting sessions by start date and profile."""
+    conditions = []
     params = []
     
     if start_date and end_date:
-        query += ' WHERE start_time BETWEEN ? AND ?'
-        params = [start_date, end_date]
+        conditions.append('sessions.start_time BETWEEN ? AND ?')
+        params = [to_epoch_seconds(start_date), to_epoch_seconds(end_date)]
     elif start_date:
-        query += ' WHERE start_time >= ?'
-        params = [start_date]
+        conditions.append('sessions.start_time >= ?')
+        params = [to_epoch_seconds(start_date)]
     elif end_date:
-        query += ' WHERE start_time <= ?'
-        params = [end_date]
+        conditions.append('sessions.start_time <= ?')
+        params = [to_epoch_seconds(end_date)]
     
-    query += ' ORDER BY start_time DESC'
+    if user_id is not None:
+        conditions.append('sessions.user_id = ?')
+        params.append(user_id)
     
-    cursor.execute(query, params)
-    sessions = cursor.fetchall()
+    where = (' WHERE ' + ' AND '.join(conditions)) if conditions else ''
+    return where, params
+
+def get_sessions(start_date=None, end_date=None, user_id=None, limit=None):
+    """Retrieve sessions from the database with optional date and profile filtering, newest first."""
+    conn = get_read_connection()
+    cursor = conn.cursor()
+    
+    where, params = session_filter(start_date, end_date, user_id)
+    query = f'SELECT {SESSION_FIELDS} FROM {{sessions}}{where} ORDER BY sessions.start_time DESC'
+    if limit is not None:
+        # Each batch keeps its newest rows; the merge below cuts the combined list
+        query += ' LIMIT ?'
+        params.append(limit)
+    
+    partitions = archive_partitions_for(cursor, start_date, end_date)
+    batches = run_partitioned(cursor, query, params, partitions)
     conn.close()
-    return sessions
+    
+    if len(batches) == 1:
+        return batches[0]
+    return sorted((row for rows in batches for row in rows), key=lambda row: row[1], reverse=True)[:limit]
 
-def get_stats_by_workout_type(start_date=None, end_date=None):
-    """Get statistics grouped by workout type."""
-    conn = sqlite3.connect('fitness_tracker.db')
+def get_session(session_id):
+    """Return one session in the get_sessions format, or None."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    partitions = archive_partitions_for(cursor, session_id=session_id)
+    batches = run_partitioned(cursor, f'SELECT {SESSION_FIELDS} FROM {{sessions}} WHERE sessions.id = ?',
+                              (session_id,), partitions)
+    conn.close()
+    return next((row for rows in batches for row in rows), None)
+
+def get_session_totals(start_date=None, end_date=None, user_id=None):
+    """(sessions, workouts, total duration, total calories) of the sessions get_sessions would return.
+
+    Workouts are counted per session, whatever their own date.
+    """
+    conn = get_read_connection()
     cursor = conn.cursor()
     
-    query = '''
-        SELECT 
-            workout_type, 
-            COUNT(*) as count, 
-            SUM(duration) as total_duration, 
-            AVG(duration) as avg_duration,
-            SUM(calories_burned) as total_calories,
-            AVG(calories_burned) as avg_calories,
-            AVG(CASE 
-                WHEN intensity = 'High' THEN 3
-                WHEN intensity = 'Medium' THEN 2
-                ELSE 1
-            END) as avg_intensity
-        FROM workouts
+    where, params = session_filter(start_date, end_date, user_id)
+    # A session and its workouts always sit in the same partition, so each batch counts its own
+    query = f'''
+        SELECT COUNT(*), TOTAL(sessions.total_duration), TOTAL(sessions.total_calories),
+               (SELECT COUNT(*) FROM {{workouts}}
+                WHERE workouts.session_id IN (SELECT sessions.id FROM {{sessions}}{where}))
+        FROM {{sessions}}{where}
     '''
+    partitions = archive_partitions_for(cursor, start_date, end_date)
+    batches = run_partitioned(cursor, query, params + params, partitions)
+    conn.close()
+    
+    totals = [0, 0, 0.0, 0.0]
+    for rows in batches:
+        sessions, duration, calories, workouts = rows[0]
+        totals[0] += sessions
+        totals[1] += workouts
+        totals[2] += duration
+        totals[3] += calories
+    return tuple(totals)
+
+def get_session_workout_types(start_date=None, end_date=None, user_id=None):
+    """{session id: [workout type names in logged order]} for the sessions get_sessions would return."""
+    conn = get_read_connection()
+    cursor = conn.cursor()
     
+    where, params = session_filter(start_date, end_date, user_id)
+    query = f'''
+        SELECT workouts.session_id, workouts.type_id FROM {{workouts}}
+        WHERE workouts.session_id IN (SELECT sessions.id FROM {{sessions}}{where})
+        ORDER BY workouts.id
+    '''
+    names = dict(cursor.execute("SELECT id, name FROM workout_types"))
+    partitions = archive_partitions_for(cursor, start_date, end_date)
+    batches = run_partitioned(cursor, query, params, partitions)
+    conn.close()
+    
+    types = {}
+    for rows in batches:
+        for session_id, type_id in rows:
+            types.setdefault(session_id, []).append(names[type_id])
+    return types
+
+def get_stats_by_workout_type(start_date=None, end_date=None, user_id=None):
+    """Get statistics grouped by workout type."""
+    conn = get_read_connection()
+    cursor = conn.cursor()
+    
+    conditions = []
     params = []
     if start_date and end_date:
-        query += ' WHERE date BETWEEN ? AND ?'
-        params = [start_date, end_date]
+        conditions.append('workouts.date BETWEEN ? AND ?')
+        params = [to_epoch_day(start_date), to_epoch_day(end_date)]
     elif start_date:
-        query += ' WHERE date >= ?'
-        params = [start_date]
+        conditions.append('workouts.date >= ?')
+        params = [to_epoch_day(start_date)]
     elif end_date:
-        query += ' WHERE date <= ?'
-        params = [end_date]
+        conditions.append('workouts.date <= ?')
+        params = [to_epoch_day(end_date)]
+    if user_id is not None:
+        conditions.append('workouts.user_id = ?')
+        params.append(user_id)
+    where = (' WHERE ' + ' AND '.join(conditions)) if conditions else ''
     
-    query += ' GROUP BY workout_type ORDER BY total_duration DESC'
+    # Group on the integer type id; names are joined onto the grouped rows only
+    query = f'''
+        SELECT workout_types.name, type_stats.count, type_stats.total_duration, type_stats.avg_duration,
+               type_stats.total_calories, type_stats.avg_calories, type_stats.avg_intensity
+        FROM (
+            SELECT 
+                workouts.type_id,
+                COUNT(*) as count, 
+                SUM(duration) as total_duration, 
+                AVG(duration) as avg_duration,
+                SUM(calories_burned) as total_calories,
+                AVG(calories_burned) as avg_calories,
+                AVG(intensities.level) as avg_intensity
+            FROM {{workouts}}
+            JOIN main.intensities ON intensities.id = workouts.intensity_id{where}
+            GROUP BY workouts.type_id
+        ) AS type_stats
+        JOIN main.workout_types ON workout_types.id = type_stats.type_id
+        ORDER BY type_stats.total_duration DESC
+    '''
     
-    cursor.execute(query, params)
-    stats = cursor.fetchall()
+    partitions = archive_partitions_for(cursor, start_date, end_date)
+    batches = run_partitioned(cursor, query, params, partitions)
     conn.close()
+    
+    if len(batches) == 1:
+        return batches[0]
+    return merge_type_stats(batches)
+
+def merge_type_stats(batches):
+    """Combine per-batch workout type statistics into one result."""
+    merged = {}
+    for rows in batches:
+        for workout_type, count, total_duration, _, total_calories, _, avg_intensity in rows:
+            entry = merged.setdefault(workout_type, [0, 0.0, 0.0, 0.0])
+            entry[0] += count
+            entry[1] += total_duration
+            entry[2] += total_calories
+            entry[3] += avg_intensity * count
+    
+    stats = [
+        (workout_type, count, total_duration, total_duration / count,
+         total_calories, total_calories / count, intensity_sum / count)
+        for workout_type, (count, total_duration, total_calories, intensity_sum) in merged.items()
+    ]
+    stats.sort(key=lambda row: row[2], reverse=True)
     return stats
 
 def update_session(session_id, end_time=None, total_duration=None, total_calories=None, notes=None, rating=None):
     """Update session details."""
-    conn = sqlite3.connect('fitness_tracker.db')
+    conn = get_connection()
     cursor = conn.cursor()
     
     updates = []
@@ -235,7 +1250,7 @@ def update_session(session_id, end_time=None, total_duration=None, total_calorie
     
     if end_time is not None:
         updates.append("end_time = ?")
-        params.append(end_time)
+        params.append(to_epoch_seconds(end_time))
     
     if total_duration is not None:
         updates.append("total_duration = ?")
@@ -261,36 +1276,280 @@ def update_session(session_id, end_time=None, total_duration=None, total_calorie
     
     conn.close()
 
-def add_goal(goal_type, target_value, start_date, end_date, notes=""):
+def attach_archives(cursor):
+    """Attach archive partitions so a transaction can read them; returns their schema names.
+
+    ATTACH is not allowed inside a transaction, so writers call this before
+    BEGIN. Only the newest MAX_ATTACHED_PARTITIONS years fit.
+    """
+    aliases = []
+    for year, path in archive_partitions_for(cursor)[-MAX_ATTACHED_PARTITIONS:]:
+        alias = f"archive_{year}"
+        cursor.execute("ATTACH DATABASE ? AS " + alias, (path,))
+        aliases.append(alias)
+    return ["main"] + aliases
+
+def held_records(cursor, workouts):
+    """Personal record keys that (id, user_id, type_id, date) workouts hold or count towards.
+
+    A workout holds a single-workout record by its id, and counts towards
+    the weekly record if it falls in the record week.
+    """
+    records = {}
+    held = set()
+    for workout_id, user_id, type_id, date in workouts:
+        if (user_id, type_id) not in records:
+            cursor.execute('''
+                SELECT metric, workout_id, date FROM main.personal_records WHERE user_id = ? AND type_id = ?
+            ''', (user_id, type_id))
+            records[(user_id, type_id)] = cursor.fetchall()
+        for metric, record_id, record_date in records[(user_id, type_id)]:
+            if record_id == workout_id or (metric == "weekly_duration" and record_date == (date + 3) // 7 * 7 - 3):
+                held.add((user_id, type_id, metric))
+    return held
+
+def recompute_personal_records(cursor, keys, schemas):
+    """Recompute (user_id, type_id, metric) records from the undeleted workouts in schemas.
+
+    A maximum cannot be lowered by a delta, so this is what runs when the
+    workout behind a record is deleted or edited; it reads only the
+    profile's rows of one type. Runs inside the caller's transaction.
+    """
+    for user_id, type_id, metric in keys:
+        history = " UNION ALL ".join(f'''
+            SELECT id, date, duration, calories_burned, distance FROM {schema}.workouts
+            WHERE user_id = ? AND type_id = ? AND deleted_at IS NULL
+        ''' for schema in schemas)
+        params = (user_id, type_id) * len(schemas)
+        if metric == "weekly_duration":
+            cursor.execute(f'''
+                SELECT SUM(duration) AS total, MAX(id), (date + 3) / 7 * 7 - 3 AS first_day
+                FROM ({history}) GROUP BY first_day ORDER BY total DESC, first_day LIMIT 1
+            ''', params)
+        else:
+            column = {"duration": "duration", "calories": "calories_burned", "distance": "distance"}[metric]
+            cursor.execute(f'''
+                SELECT {column}, id, date FROM ({history})
+                WHERE {column} IS NOT NULL ORDER BY {column} DESC, date, id LIMIT 1
+            ''', params)
+        best = cursor.fetchone()
+        if best is None:
+            cursor.execute('''
+                DELETE FROM main.personal_records WHERE user_id = ? AND type_id = ? AND metric = ?
+            ''', (user_id, type_id, metric))
+        else:
+            cursor.execute('''
+                INSERT OR REPLACE INTO main.personal_records (user_id, type_id, metric, value, workout_id, date)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (user_id, type_id, metric) + best)
+
+def update_workout(workout_id, workout_type=None, duration=None, calories_burned=None, intensity=None,
+                   notes=None, distance=None):
+    """Change fields of a workout; fields left as None keep their value.
+
+    In the same transaction the totals of an ended session move by the
+    change in duration and calories, and the workout's personal records,
+    zone cache and training load are brought up to date. Archived and
+    deleted workouts cannot be edited. Returns True if the workout was
+    updated.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        schemas = attach_archives(cursor)
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute('''
+            SELECT user_id, type_id, date, duration, calories_burned, session_id FROM main.workouts
+            WHERE id = ? AND deleted_at IS NULL
+        ''', (workout_id,))
+        row = cursor.fetchone()
+        if row is None:
+            conn.rollback()
+            return False
+        user_id, type_id, date, old_duration, old_calories, session_id = row
+        held = held_records(cursor, [(workout_id, user_id, type_id, date)])
+
+        updates = []
+        params = []
+        if workout_type is not None:
+            updates.append("type_id = ?")
+            params.append(lookup_id(cursor, "workout_types", workout_type))
+        if duration is not None:
+            updates.append("duration = ?")
+            params.append(duration)
+        if calories_burned is not None:
+            # Typed calories no longer follow profile changes
+            updates.append("calories_burned = ?, calories_estimated = 0")
+            params.append(calories_burned)
+        if intensity is not None:
+            updates.append("intensity_id = ?")
+            params.append(lookup_id(cursor, "intensities", intensity))
+        if notes is not None:
+            updates.append("notes = ?")
+            params.append(notes)
+        if distance is not None:
+            updates.append("distance = ?")
+            params.append(distance)
+        if updates:
+            cursor.execute(f"UPDATE main.workouts SET {', '.join(updates)} WHERE id = ?", params + [workout_id])
+
+        duration_delta = 0 if duration is None else duration - old_duration
+        calories_delta = 0 if calories_burned is None else calories_burned - old_calories
+        if session_id is not None and (duration_delta or calories_delta):
+            # Open sessions get their totals from their workouts when they end
+            cursor.execute('''
+                UPDATE main.sessions
+                SET total_duration = total_duration + ?, total_calories = total_calories + ?
+                WHERE id = ? AND end_time IS NOT NULL
+            ''', (duration_delta, calories_delta, session_id))
+
+        invalidate_workout_analytics(cursor, workout_id)
+        recompute_personal_records(cursor, held, schemas)
+        update_personal_records(cursor, [workout_id])
+        if duration_delta or calories_delta:
+            adjust_activity_calendar(cursor, [(user_id, date, 0, duration_delta, calories_delta)])
+        conn.commit()
+        return True
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def delete_workout(workout_id):
+    """Delete a workout, keeping it as a tombstone.
+
+    The totals of its session, if ended, drop by its duration and calories,
+    and the personal records, zone cache and training load it fed are
+    updated, all in one transaction. Returns True if a workout was deleted.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        schemas = attach_archives(cursor)
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute('''
+            SELECT user_id, type_id, date, duration, calories_burned, session_id FROM main.workouts
+            WHERE id = ? AND deleted_at IS NULL
+        ''', (workout_id,))
+        row = cursor.fetchone()
+        if row is None:
+            conn.rollback()
+            return False
+        user_id, type_id, date, duration, calories, session_id = row
+
+        invalidate_workout_analytics(cursor, workout_id)
+        held = held_records(cursor, [(workout_id, user_id, type_id, date)])
+        cursor.execute("UPDATE main.workouts SET deleted_at = ? WHERE id = ?",
+                       (to_epoch_seconds(datetime.datetime.now()), workout_id))
+        if session_id is not None:
+            # Open sessions get their totals from their workouts when they end
+            cursor.execute('''
+                UPDATE main.sessions
+                SET total_duration = total_duration - ?, total_calories = total_calories - ?
+                WHERE id = ? AND end_time IS NOT NULL
+            ''', (duration, calories, session_id))
+        recompute_personal_records(cursor, held, schemas)
+        adjust_activity_calendar(cursor, [(user_id, date, -1, -duration, -calories)])
+        conn.commit()
+        return True
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def delete_sessions(condition, params):
+    """Tombstone the undeleted sessions matching condition and their workouts in one transaction.
+
+    Each table is updated by a single statement. Returns the number of
+    sessions deleted.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        schemas = attach_archives(cursor)
+        cursor.execute("BEGIN IMMEDIATE")
+        deleted_at = to_epoch_seconds(datetime.datetime.now())
+        cursor.execute(f'''
+            UPDATE main.sessions SET deleted_at = ?
+            WHERE {condition} AND deleted_at IS NULL
+            RETURNING id
+        ''', [deleted_at] + list(params))
+        session_ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute('''
+            UPDATE main.workouts SET deleted_at = ?
+            WHERE session_id IN (SELECT value FROM json_each(?)) AND deleted_at IS NULL
+            RETURNING id, user_id, type_id, date, duration, calories_burned
+        ''', (deleted_at, json.dumps(session_ids)))
+        rows = cursor.fetchall()
+        workouts = [row[:4] for row in rows]
+
+        # Cached zones of the deleted workouts go, and each profile's load
+        # is recomputed from its earliest deleted day
+        cursor.executemany("DELETE FROM main.workout_zones WHERE workout_id = ?",
+                           [(workout[0],) for workout in workouts])
+        first_days = {}
+        for _, user_id, _, date in workouts:
+            first_days[user_id] = min(date, first_days.get(user_id, date))
+        cursor.executemany('''
+            UPDATE main.training_load_state SET dirty_from = MIN(COALESCE(dirty_from, ?), ?) WHERE user_id = ?
+        ''', [(day, day, user_id) for user_id, day in first_days.items()])
+        recompute_personal_records(cursor, held_records(cursor, workouts), schemas)
+        adjust_activity_calendar(cursor, [(user_id, date, -1, -(duration or 0), -(calories or 0))
+                                          for _, user_id, _, date, duration, calories in rows])
+        conn.commit()
+        return len(session_ids)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def delete_session(session_id):
+    """Delete a session and its workouts, keeping them as tombstones. Returns True if it existed."""
+    return delete_sessions("id = ?", [session_id]) > 0
+
+def delete_sessions_between(start_date, end_date, user_id=DEFAULT_USER_ID):
+    """Delete a profile's finished sessions that started between two dates (inclusive).
+
+    Open sessions and sessions already archived are left alone. Returns the
+    number of sessions deleted.
+    """
+    return delete_sessions("user_id = ? AND start_time >= ? AND start_time < ? AND end_time IS NOT NULL",
+                           [user_id, to_epoch_day(start_date) * 86400, (to_epoch_day(end_date) + 1) * 86400])
+
+def add_goal(goal_type, target_value, start_date, end_date, notes="", user_id=DEFAULT_USER_ID):
     """Add a new fitness goal."""
-    conn = sqlite3.connect('fitness_tracker.db')
+    conn = get_connection()
     cursor = conn.cursor()
     cursor.execute('''
-        INSERT INTO goals (goal_type, target_value, start_date, end_date, notes)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (goal_type, target_value, start_date, end_date, notes))
+        INSERT INTO goals (goal_type, target_value, start_date, end_date, notes, user_id)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', (goal_type, target_value, start_date, end_date, notes, user_id))
     goal_id = cursor.lastrowid
     conn.commit()
     conn.close()
     return goal_id
 
-def get_active_goals():
-    """Get all active goals (end date in the future)."""
-    conn = sqlite3.connect('fitness_tracker.db')
+def get_active_goals(user_id=None):
+    """Get all active goals (end date in the future), optionally for one profile."""
+    conn = get_connection()
     cursor = conn.cursor()
     today = datetime.datetime.now().strftime('%Y-%m-%d')
-    cursor.execute('''
-        SELECT * FROM goals 
-        WHERE end_date >= ? AND completed = 0
-        ORDER BY end_date ASC
-    ''', (today,))
+    query = 'SELECT * FROM goals WHERE end_date >= ? AND completed = 0'
+    params = [today]
+    if user_id is not None:
+        query += ' AND user_id = ?'
+        params.append(user_id)
+    cursor.execute(query + ' ORDER BY end_date ASC', params)
     goals = cursor.fetchall()
     conn.close()
     return goals
 
 def update_goal_progress(goal_id, completed=None):
     """Update the status of a goal."""
-    conn = sqlite3.connect('fitness_tracker.db')
+    conn = get_connection()
     cursor = conn.cursor()
     
     if completed is not None:
@@ -303,9 +1562,9 @@ def update_goal_progress(goal_id, completed=None):
     conn.commit()
     conn.close()
 
-def save_user_profile(name, age, weight, height, gender, activity_level, bmr=None):
-    """Save user profile information."""
-    conn = sqlite3.connect('fitness_tracker.db')
+def save_user_profile(name, age, weight, height, gender, activity_level, bmr=None, user_id=DEFAULT_USER_ID):
+    """Save user profile information for a profile, creating it if needed."""
+    conn = get_connection()
     cursor = conn.cursor()
     
     # Calculate BMR if not provided
@@ -316,7 +1575,7 @@ def save_user_profile(name, age, weight, height, gender, activity_level, bmr=Non
             bmr = 447.593 + (9.247 * weight) + (3.098 * height) - (4.330 * age)
     
     # Check if profile exists
-    cursor.execute("SELECT COUNT(*) FROM user_profile")
+    cursor.execute("SELECT COUNT(*) FROM user_profile WHERE id = ?", (user_id,))
     count = cursor.fetchone()[0]
     
     date_updated = datetime.datetime.now().strftime('%Y-%m-%d')
@@ -325,33 +1584,56 @@ def save_user_profile(name, age, weight, height, gender, activity_level, bmr=Non
         # Insert new profile
         cursor.execute('''
             INSERT INTO user_profile 
-            (name, age, weight, height, gender, activity_level, bmr, date_updated)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (name, age, weight, height, gender, activity_level, bmr, date_updated))
+            (id, name, age, weight, height, gender, activity_level, bmr, date_updated)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (user_id, name, age, weight, height, gender, activity_level, bmr, date_updated))
     else:
         # Update existing profile
         cursor.execute('''
             UPDATE user_profile 
             SET name = ?, age = ?, weight = ?, height = ?, gender = ?,
                 activity_level = ?, bmr = ?, date_updated = ?
-            WHERE id = 1
-        ''', (name, age, weight, height, gender, activity_level, bmr, date_updated))
+            WHERE id = ?
+        ''', (name, age, weight, height, gender, activity_level, bmr, date_updated, user_id))
     
     conn.commit()
     conn.close()
 
-def get_user_profile():
-    """Get the user profile information."""
-    conn = sqlite3.connect('fitness_tracker.db')
+def add_user_profile(name):
+    """Create a new, otherwise empty profile and return its user id."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    # Profile 1 owns all data from before profiles existed, so never hand it to someone else
+    cursor.execute("SELECT MAX(COALESCE(MAX(id), 0), ?) + 1 FROM user_profile", (DEFAULT_USER_ID,))
+    user_id = cursor.fetchone()[0]
+    cursor.execute('''
+        INSERT INTO user_profile (id, name, date_updated) VALUES (?, ?, ?)
+    ''', (user_id, name, datetime.datetime.now().strftime('%Y-%m-%d')))
+    conn.commit()
+    conn.close()
+    return user_id
+
+def get_user_profiles():
+    """Return (id, name) of every profile."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, name FROM user_profile ORDER BY id")
+    profiles = cursor.fetchall()
+    conn.close()
+    return profiles
+
+def get_user_profile(user_id=DEFAULT_USER_ID):
+    """Get the profile information of one user."""
+    conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM user_profile LIMIT 1")
+    cursor.execute("SELECT * FROM user_profile WHERE id = ?", (user_id,))
     profile = cursor.fetchone()
     conn.close()
     return profile
 
-def get_trends(period_days=30):
+def get_trends(period_days=30, user_id=None):
     """Get workout trends over a specified period."""
-    conn = sqlite3.connect('fitness_tracker.db')
+    conn = get_read_connection()
     cursor = conn.cursor()
     
     # Calculate the date range
@@ -359,18 +1641,36 @@ def get_trends(period_days=30):
     start_date = end_date - datetime.timedelta(days=period_days)
     
     # Query for daily workout stats
-    cursor.execute('''
+    start_str = start_date.strftime('%Y-%m-%d')
+    end_str = end_date.strftime('%Y-%m-%d')
+    params = [to_epoch_day(start_str), to_epoch_day(end_str)]
+    user_filter = ''
+    if user_id is not None:
+        user_filter = ' AND workouts.user_id = ?'
+        params.append(user_id)
+    partitions = archive_partitions_for(cursor, start_str, end_str)
+    batches = run_partitioned(cursor, f'''
         SELECT 
-            date,
+            date(workouts.date * 86400, 'unixepoch') AS date,
             COUNT(*) as workout_count,
             SUM(duration) as total_duration,
             SUM(calories_burned) as total_calories
-        FROM workouts
-        WHERE date BETWEEN ? AND ?
-        GROUP BY date
-        ORDER BY date ASC
-    ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')))
-    
-    trends = cursor.fetchall()
+        FROM {{workouts}}
+        WHERE workouts.date BETWEEN ? AND ?{user_filter}
+        GROUP BY workouts.date
+        ORDER BY workouts.date ASC
+    ''', params, partitions)
     conn.close()
-    return trends
\ No newline at end of file
+    
+    if len(batches) == 1:
+        return batches[0]
+    
+    # Add up days that appear in more than one batch
+    merged = {}
+    for rows in batches:
+        for date, count, duration, calories in rows:
+            entry = merged.setdefault(date, [0, 0.0, 0.0])
+            entry[0] += count
+            entry[1] += duration
+            entry[2] += calories
+    return [(date, *merged[date]) for date in sorted(merged)]
@@ -0,0 +1,120 @@
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+from database import get_connection
+
+
+class DatabaseWriter:
+    """Funnels writes from many threads through one connection.
+
+    Callers submit functions that take a cursor, such as
+    database.write_workout. A single thread takes everything queued while
+    the previous batch was committing (up to max_batch calls, optionally
+    waiting max_delay_ms for more) and runs it in one transaction, so many
+    simultaneous loggers share one commit instead of each opening a
+    connection and waiting for the write lock. Every call runs under its own
+    savepoint, so one failing call does not undo the others.
+    """
+
+    def __init__(self, max_batch=200, max_delay_ms=0, busy_timeout_ms=5000):
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000.0
+        self.busy_timeout_ms = busy_timeout_ms
+        self.batches = 0
+        self.writes = 0
+        self._queue = queue.Queue()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the writer thread."""
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Write everything submitted so far, then stop the writer thread."""
+        if self.running:
+            self._queue.put(None)
+            self._thread.join()
+
+    def submit(self, func, *args, **kwargs):
+        """Queue func(cursor, *args, **kwargs) and return a Future for its result."""
+        future = Future()
+        self._queue.put((func, args, kwargs, future))
+        return future
+
+    def call(self, func, *args, **kwargs):
+        """Run func(cursor, *args, **kwargs) in the next batch and wait until it is committed."""
+        return self.submit(func, *args, **kwargs).result()
+
+    def _loop(self):
+        conn = get_connection()
+        conn.isolation_level = None  # transactions are managed explicitly
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        # WAL lets the UI and other readers keep reading while a batch commits
+        conn.execute("PRAGMA journal_mode = WAL")
+        cursor = conn.cursor()
+        try:
+            while True:
+                batch = self._collect()
+                stopping = batch and batch[-1] is None
+                batch = [item for item in batch if item is not None]
+                if batch:
+                    self._write_batch(conn, cursor, batch)
+                if stopping:
+                    break
+        finally:
+            conn.close()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while batch[-1] is not None and len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_batch(self, conn, cursor, batch):
+        results = []
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            for func, args, kwargs, future in batch:
+                cursor.execute("SAVEPOINT write")
+                try:
+                    results.append((future, func(cursor, *args, **kwargs), None))
+                    cursor.execute("RELEASE write")
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO write")
+                    cursor.execute("RELEASE write")
+                    results.append((future, None, e))
+            cursor.execute("COMMIT")
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.rollback()
+            print(f"Error writing batch of {len(batch)}: {e}")
+            for _, _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        # Results are only handed out once the batch is durable
+        self.batches += 1
+        self.writes += len(batch)
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
@@ -0,0 +1,135 @@
+import json
+import math
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+
+def percentile(values, pct):
+    """Return the pct-th percentile of a sequence using nearest rank.
+
+    >>> percentile(range(1, 101), 95)
+    95
+    >>> percentile([15, 20, 35, 40, 50], 40)
+    20
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct * len(ordered) / 100.0) - 1))
+    return ordered[rank]
+
+
+class LagMonitor:
+    """Watchdog that measures how late Tk runs a recurring heartbeat.
+
+    The heartbeat is scheduled with root.after every interval_ms. The time it
+    actually fires minus the time it was due is the event-loop lag. A sampling
+    thread watches the heartbeat as well; when it falls behind by more than
+    stall_ms it captures the main thread's Python stack so the stall can be
+    traced back to the code that blocked the loop.
+    """
+
+    def __init__(self, root, interval_ms=50, stall_ms=200, window=1200, max_stalls=100):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.stall_ms = stall_ms
+        self.lags = deque(maxlen=window)
+        self.stalls = deque(maxlen=max_stalls)
+        self.running = False
+        self._after_id = None
+        self._due = None
+        self._last_beat = None
+        self._stall_stacks = []
+        self._lock = threading.Lock()
+        self._main_thread_id = threading.main_thread().ident
+        self._sampler = None
+
+    def start(self):
+        """Start the heartbeat and the stall sampling thread."""
+        if self.running:
+            return
+        self.running = True
+        self._last_beat = time.perf_counter()
+        self._schedule()
+        # After a quick stop() and start() the old sampler has not seen running go False
+        # yet and simply carries on
+        if self._sampler is not None and self._sampler.is_alive():
+            return
+        self._sampler = threading.Thread(target=self._sample_loop, daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        """Stop monitoring."""
+        self.running = False
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _schedule(self):
+        self._due = time.perf_counter() + self.interval_ms / 1000.0
+        self._after_id = self.root.after(self.interval_ms, self._heartbeat)
+
+    def _heartbeat(self):
+        now = time.perf_counter()
+        lag_ms = max(0.0, (now - self._due) * 1000.0)
+        with self._lock:
+            self.lags.append(lag_ms)
+            self._last_beat = now
+            stacks = self._stall_stacks
+            self._stall_stacks = []
+
+        if lag_ms >= self.stall_ms:
+            self.stalls.append({
+                "time": time.strftime('%Y-%m-%d %H:%M:%S'),
+                "lag_ms": round(lag_ms, 2),
+                "stacks": stacks
+            })
+            print(f"UI stall: event loop blocked for {lag_ms:.0f} ms")
+
+        if self.running:
+            self._schedule()
+
+    def _sample_loop(self):
+        # Sample a few times per stall threshold so long stalls collect several stacks
+        period = max(self.stall_ms / 4000.0, 0.01)
+        while self.running:
+            time.sleep(period)
+            with self._lock:
+                behind_ms = (time.perf_counter() - self._last_beat) * 1000.0 - self.interval_ms
+                if behind_ms < self.stall_ms or len(self._stall_stacks) >= 5:
+                    continue
+            frame = sys._current_frames().get(self._main_thread_id)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame))
+            with self._lock:
+                # Only keep distinct stacks for the current stall
+                if stack not in self._stall_stacks:
+                    self._stall_stacks.append(stack)
+
+    def summary(self):
+        """Return the rolling lag percentiles and the recorded stalls."""
+        with self._lock:
+            lags = list(self.lags)
+        return {
+            "interval_ms": self.interval_ms,
+            "stall_threshold_ms": self.stall_ms,
+            "samples": len(lags),
+            "p50_ms": round(percentile(lags, 50), 2),
+            "p95_ms": round(percentile(lags, 95), 2),
+            "p99_ms": round(percentile(lags, 99), 2),
+            "max_ms": round(max(lags), 2) if lags else 0.0,
+            "stall_count": len(self.stalls),
+            "stalls": list(self.stalls)
+        }
+
+    def export_json(self, file_path):
+        """Write the responsiveness summary to a JSON file."""
+        with open(file_path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
@@ -0,0 +1,179 @@
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from database import get_connection
+
+# Events that count as user activity and pause maintenance immediately
+ACTIVITY_EVENTS = ("<Any-KeyPress>", "<Any-ButtonPress>", "<Motion>", "<MouseWheel>")
+
+
+class MaintenanceScheduler:
+    """Runs database housekeeping in small slices while the app is idle.
+
+    The app counts as idle when there has been no keyboard or mouse input and
+    no committed database write (PRAGMA data_version) for idle_seconds. Each
+    idle period runs the pending tasks in bounded slices on a worker thread.
+    Any input interrupts the running statement through a SQLite progress
+    handler, and the task resumes from its next slice once the app is idle
+    again.
+    """
+
+    def __init__(self, root, idle_seconds=60, check_ms=1000, cycle_hours=6,
+                 vacuum_pages_per_slice=256, analysis_limit=400):
+        self.root = root
+        self.idle_seconds = idle_seconds
+        self.check_ms = check_ms
+        self.cycle_seconds = cycle_hours * 3600
+        self.vacuum_pages_per_slice = vacuum_pages_per_slice
+        self.analysis_limit = analysis_limit
+        self.log = deque(maxlen=200)
+        self.last_activity = time.monotonic()
+        self.last_cycle = None
+        self.running = False
+        self._pending = []
+        self._interrupt = threading.Event()
+        self._worker = None
+        self._worker_done_at = None
+        self._probe = None
+        self._data_version = None
+        self._after_id = None
+
+    def start(self):
+        """Start watching for idle periods."""
+        if self.running:
+            return
+        self.running = True
+        for sequence in ACTIVITY_EVENTS:
+            self.root.bind_all(sequence, self.note_activity, add="+")
+        self._probe = get_connection()
+        self._data_version = self._read_data_version()
+        self._after_id = self.root.after(self.check_ms, self._check)
+
+    def stop(self):
+        """Stop scheduling and interrupt any running task."""
+        self.running = False
+        self._interrupt.set()
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        if self._probe is not None:
+            self._probe.close()
+            self._probe = None
+
+    def note_activity(self, event=None):
+        """Record user activity and pause maintenance if it is running."""
+        self.last_activity = time.monotonic()
+        if self._worker is not None and self._worker.is_alive():
+            self._interrupt.set()
+
+    def _read_data_version(self):
+        return self._probe.execute("PRAGMA data_version").fetchone()[0]
+
+    def _check(self):
+        self._after_id = None
+        if not self.running:
+            return
+
+        # Commits from other connections bump data_version; count them as activity
+        version = self._read_data_version()
+        worker_busy = self._worker is not None and self._worker.is_alive()
+        if version != self._data_version:
+            if not worker_busy and not self._worker_finished_recently():
+                self.last_activity = time.monotonic()
+            self._data_version = version
+
+        now = time.monotonic()
+        if not worker_busy and now - self.last_activity >= self.idle_seconds:
+            if not self._pending and (self.last_cycle is None or now - self.last_cycle >= self.cycle_seconds):
+                self._pending = self._build_cycle()
+            if self._pending:
+                self._interrupt.clear()
+                self._worker = threading.Thread(target=self._run_pending, daemon=True)
+                self._worker_done_at = None
+                self._worker.start()
+
+        self._after_id = self.root.after(self.check_ms, self._check)
+
+    def _worker_finished_recently(self):
+        # Our own commits change data_version too; ignore them for one check
+        done_at = self._worker_done_at
+        return done_at is not None and time.monotonic() - done_at < self.check_ms / 1000.0 * 2
+
+    def _build_cycle(self):
+        return [
+            ("optimize", self._task_optimize),
+            ("incremental_vacuum", self._task_incremental_vacuum),
+            ("wal_checkpoint", self._task_checkpoint),
+            ("quick_check", self._task_quick_check),
+        ]
+
+    def _run_pending(self):
+        conn = get_connection()
+        conn.set_progress_handler(lambda: 1 if self._interrupt.is_set() else 0, 1000)
+        try:
+            while self._pending and not self._interrupt.is_set():
+                name, task = self._pending[0]
+                start = time.perf_counter()
+                try:
+                    finished, effect = task(conn)
+                except sqlite3.OperationalError as e:
+                    if self._interrupt.is_set():
+                        self._record(name, start, "paused (user activity)")
+                        break
+                    self._record(name, start, f"failed: {e}")
+                    finished = True
+                else:
+                    self._record(name, start, effect)
+                if finished:
+                    self._pending.pop(0)
+            if not self._pending:
+                self.last_cycle = time.monotonic()
+        finally:
+            conn.close()
+            self._worker_done_at = time.monotonic()
+
+    def _record(self, name, start, effect):
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        entry = {"time": time.strftime('%Y-%m-%d %H:%M:%S'), "task": name,
+                 "elapsed_ms": round(elapsed_ms, 1), "effect": effect}
+        self.log.append(entry)
+        print(f"Maintenance: {name} took {elapsed_ms:.1f} ms - {effect}")
+
+    # Each task returns (finished, effect description). Unfinished tasks are
+    # called again for their next slice.
+
+    def _task_optimize(self, conn):
+        # analysis_limit bounds how many rows ANALYZE looks at per index
+        conn.execute(f"PRAGMA analysis_limit = {int(self.analysis_limit)}")
+        conn.execute("PRAGMA optimize")
+        conn.commit()
+        return True, "planner statistics refreshed"
+
+    def _task_incremental_vacuum(self, conn):
+        free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if free_before == 0:
+            return True, "no free pages"
+        mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        if mode != 2:
+            # create_db switches the mode with a one-off VACUUM at startup
+            return True, "skipped, auto_vacuum is not incremental"
+        conn.execute(f"PRAGMA incremental_vacuum({int(self.vacuum_pages_per_slice)})").fetchall()
+        conn.commit()
+        free_after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return free_after == 0, f"released {free_before - free_after} pages, {free_after} free pages left"
+
+    def _task_checkpoint(self, conn):
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        if mode.lower() != "wal":
+            return True, f"skipped, journal_mode is {mode}"
+        busy, log_frames, checkpointed = conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+        return True, f"checkpointed {checkpointed} of {log_frames} WAL frames" + (" (busy)" if busy else "")
+
+    def _task_quick_check(self, conn):
+        result = [row[0] for row in conn.execute("PRAGMA quick_check").fetchall()]
+        if result == ["ok"]:
+            return True, "ok"
+        print(f"WARNING: database quick_check reported problems: {result[:5]}")
+        return True, f"{len(result)} problems: {'; '.join(result[:3])}"
@@ -0,0 +1,195 @@
+import calendar
+import tkinter as tk
+
+
+def sparkline_points(values, width, height, pad=3):
+    """Flat [x0, y0, x1, y1, ...] canvas coordinates of values scaled into a width x height box."""
+    lo, hi = min(values), max(values)
+    span = hi - lo
+    step = (width - 2 * pad) / max(1, len(values) - 1)
+    bottom = height - pad
+    scale = (height - 2 * pad) / span if span else 0
+    # A flat series is drawn along the middle, or the bottom when it is all zeros
+    base = bottom if span or not hi else height / 2
+    points = []
+    for i, value in enumerate(values):
+        points.append(pad + i * step)
+        points.append(bottom - (value - lo) * scale if span else base)
+    return points
+
+
+def bar_rects(values, width, height, pad=2, gap=2, maximum=None):
+    """(x0, y0, x1, y1) of one bar per value, scaled to maximum (default: the largest value)."""
+    top = maximum if maximum is not None else max(values, default=0)
+    scale = (height - 2 * pad) / top if top else 0
+    bar_width = max(1.0, (width - 2 * pad - gap * (len(values) - 1)) / max(1, len(values)))
+    bottom = height - pad
+    rects = []
+    for i, value in enumerate(values):
+        x0 = pad + i * (bar_width + gap)
+        rects.append((x0, bottom - min(value, top) * scale, x0 + bar_width, bottom))
+    return rects
+
+
+class Sparkline(tk.Canvas):
+    """A small line chart of recent values drawn straight on a Canvas.
+
+    The line, the shaded area under it and the dot on the latest value are
+    created once; set_values() only moves their coordinates, so refreshing
+    a sparkline redraws nothing else.
+    """
+
+    def __init__(self, parent, width=160, height=36, color="#2196F3", fill="#BBDEFB", **kwargs):
+        super().__init__(parent, width=width, height=height, highlightthickness=0, **kwargs)
+        self.size = (width, height)
+        self._area = self.create_polygon(0, 0, 0, 0, 0, 0, fill=fill, outline="")
+        self._line = self.create_line(0, 0, 0, 0, fill=color, width=2)
+        self._dot = self.create_oval(0, 0, 0, 0, fill=color, outline="")
+
+    def set_values(self, values):
+        state = tk.NORMAL if len(values) > 1 else tk.HIDDEN
+        for item in (self._area, self._line, self._dot):
+            self.itemconfigure(item, state=state)
+        if state == tk.HIDDEN:
+            return
+        width, height = self.size
+        points = sparkline_points(values, width, height)
+        self.coords(self._line, *points)
+        self.coords(self._area, *points, points[-2], height, points[0], height)
+        x, y = points[-2], points[-1]
+        self.coords(self._dot, x - 2.5, y - 2.5, x + 2.5, y + 2.5)
+
+
+class MiniBars(tk.Canvas):
+    """A small bar chart with an optional dashed target line, updated in place."""
+
+    def __init__(self, parent, width=160, height=48, color="#2196F3", over_color="#4CAF50", **kwargs):
+        super().__init__(parent, width=width, height=height, highlightthickness=0, **kwargs)
+        self.size = (width, height)
+        self.color = color
+        self.over_color = over_color
+        self._bars = []
+        self._target = self.create_line(0, 0, 0, 0, fill="#9E9E9E", dash=(3, 2), state=tk.HIDDEN)
+
+    def set_values(self, values, target=None):
+        # Reuse the bar items; only a change in the number of bars creates or deletes any
+        while len(self._bars) < len(values):
+            self._bars.append(self.create_rectangle(0, 0, 0, 0, outline=""))
+        while len(self._bars) > len(values):
+            self.delete(self._bars.pop())
+
+        width, height = self.size
+        maximum = max(max(values, default=0), target or 0)
+        for item, value, rect in zip(self._bars, values, bar_rects(values, width, height, maximum=maximum)):
+            self.coords(item, *rect)
+            self.itemconfigure(item, fill=self.over_color if target and value >= target else self.color)
+
+        if target and maximum:
+            y = height - 2 - target * (height - 4) / maximum
+            self.coords(self._target, 0, y, width, y)
+            self.itemconfigure(self._target, state=tk.NORMAL)
+        else:
+            self.itemconfigure(self._target, state=tk.HIDDEN)
+
+
+class ProgressRing(tk.Canvas):
+    """A progress ring with the percentage in the middle, updated in place."""
+
+    def __init__(self, parent, size=56, thickness=6, color="#2196F3", track="#E0E0E0", font=("Helvetica", 9, "bold"),
+                 **kwargs):
+        super().__init__(parent, width=size, height=size, highlightthickness=0, **kwargs)
+        inset = thickness / 2 + 1
+        box = (inset, inset, size - inset, size - inset)
+        self.create_oval(*box, outline=track, width=thickness)
+        self._arc = self.create_arc(*box, start=90, extent=0, style=tk.ARC, outline=color, width=thickness)
+        self._text = self.create_text(size / 2, size / 2, text="0%", font=font)
+
+    def set_value(self, percent):
+        percent = max(0, min(100, percent))
+        # An extent of exactly -360 would draw nothing
+        self.itemconfigure(self._arc, extent=-min(359.9, percent * 3.6))
+        self.itemconfigure(self._text, text=f"{percent:.0f}%")
+
+    def set_text_color(self, color):
+        self.itemconfigure(self._text, fill=color)
+
+
+def heatmap_cell(slot, first_weekday, cell=11, gap=2, left=30, top=16):
+    """(x0, y0, x1, y1) of a day of the year in a week-per-column calendar grid, Mondays on top."""
+    index = slot + first_weekday
+    x0 = left + (index // 7) * (cell + gap)
+    y0 = top + (index % 7) * (cell + gap)
+    return x0, y0, x0 + cell, y0 + cell
+
+
+class ActivityHeatmap(tk.Canvas):
+    """A year of days as a grid of squares, one column per week, shaded by level.
+
+    The 366 squares and the month and weekday labels are created once.
+    Showing another year moves them only if its layout (weekday of January
+    1st, leap year) differs, and only squares whose level changed are
+    recolored, so switching years costs a few dozen item updates.
+    """
+
+    def __init__(self, parent, colors, cell=11, gap=2, on_hover=None, **kwargs):
+        self.cell = cell
+        self.gap = gap
+        width = 30 + 54 * (cell + gap)
+        height = 16 + 7 * (cell + gap)
+        super().__init__(parent, width=width, height=height, highlightthickness=0, **kwargs)
+        self.colors = list(colors)
+        self.on_hover = on_hover
+        self._layout = None
+        self._levels = [None] * 366
+        self._cells = [self.create_rectangle(0, 0, 0, 0, outline="", fill=self.colors[0]) for _ in range(366)]
+        self._months = [self.create_text(0, 0, text=name, anchor=tk.SW, font=("Helvetica", 8))
+                        for name in calendar.month_abbr[1:]]
+        for row, name in ((0, "Mon"), (2, "Wed"), (4, "Fri")):
+            y = 16 + row * (cell + gap) + cell / 2
+            self.create_text(26, y, text=name, anchor=tk.E, font=("Helvetica", 8), tags=("label",))
+        if on_hover:
+            self.bind("<Motion>", self._motion)
+
+    def set_levels(self, levels, first_weekday, days):
+        """Show a year: the shade level of each day, the weekday of January 1st (0 is Monday) and its length."""
+        if self._layout != (first_weekday, days):
+            self._layout = (first_weekday, days)
+            for slot, item in enumerate(self._cells):
+                if slot < days:
+                    self.coords(item, *heatmap_cell(slot, first_weekday, self.cell, self.gap))
+                    self.itemconfigure(item, state=tk.NORMAL)
+                else:
+                    self.itemconfigure(item, state=tk.HIDDEN)
+            start = 0
+            for month, item in enumerate(self._months, 1):
+                x0, _, _, _ = heatmap_cell(start, first_weekday, self.cell, self.gap)
+                self.coords(item, x0, 14)
+                start += calendar.monthrange(2000 if days == 366 else 2001, month)[1]
+
+        for slot in range(days):
+            level = levels[slot]
+            if self._levels[slot] != level:
+                self._levels[slot] = level
+                self.itemconfigure(self._cells[slot], fill=self.colors[level])
+
+    def set_colors(self, colors, text_color):
+        """Switch the level shades and label color, e.g. after a theme change."""
+        self.colors = list(colors)
+        for slot, level in enumerate(self._levels):
+            if level is not None:
+                self.itemconfigure(self._cells[slot], fill=self.colors[level])
+        for item in self._months:
+            self.itemconfigure(item, fill=text_color)
+        self.itemconfigure("label", fill=text_color)
+
+    def _motion(self, event):
+        if self._layout is None:
+            return
+        first_weekday, days = self._layout
+        column = (event.x - 30) // (self.cell + self.gap)
+        row = (event.y - 16) // (self.cell + self.gap)
+        slot = column * 7 + row - first_weekday
+        if 0 <= row < 7 and column >= 0 and 0 <= slot < days:
+            self.on_hover(slot)
+        else:
+            self.on_hover(None)
@@ -0,0 +1,274 @@
+import sqlite3
+import threading
+import time
+import weakref
+from collections import deque
+
+# Upper bounds (in milliseconds) of the latency histogram buckets.
+# Anything slower than the last bound lands in an overflow bucket.
+HISTOGRAM_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+def normalize_sql(sql):
+    """Collapse whitespace so the same statement always maps to one key."""
+    return " ".join(sql.split())
+
+
+class QueryStats:
+    def __init__(self, sql):
+        self.sql = sql
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+
+    def add(self, elapsed_ms, rows):
+        """Record one execution of this statement."""
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.rows += rows
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+        for i, bound in enumerate(HISTOGRAM_BOUNDS_MS):
+            if elapsed_ms <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def percentile(self, pct):
+        """Estimate a latency percentile from the histogram buckets."""
+        if not self.count:
+            return 0.0
+        target = self.count * pct / 100.0
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return HISTOGRAM_BOUNDS_MS[i] if i < len(HISTOGRAM_BOUNDS_MS) else self.max_ms
+        return self.max_ms
+
+
+class QueryProfiler:
+    """Collects per-statement timings for every query run through the database module."""
+
+    def __init__(self):
+        self.enabled = False
+        self.slow_query_ms = 100.0
+        self.max_slow_queries = 50
+        self.stats = {}
+        self.slow_queries = deque(maxlen=self.max_slow_queries)
+        self._lock = threading.Lock()
+
+    def configure(self, enabled=None, slow_query_ms=None):
+        """Turn profiling on or off and set the slow query threshold."""
+        if enabled is not None:
+            self.enabled = enabled
+        if slow_query_ms is not None:
+            self.slow_query_ms = float(slow_query_ms)
+
+    def reset(self):
+        """Forget everything recorded so far."""
+        with self._lock:
+            self.stats = {}
+            self.slow_queries.clear()
+
+    def record(self, conn, sql, params, elapsed_ms, rows):
+        """Add a finished query to the histogram and log it if it was slow."""
+        key = normalize_sql(sql)
+        with self._lock:
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = self.stats[key] = QueryStats(key)
+            stats.add(elapsed_ms, rows)
+
+        if elapsed_ms >= self.slow_query_ms:
+            plan = explain_query_plan(conn, sql, params)
+            with self._lock:
+                self.slow_queries.append({
+                    "sql": key,
+                    "params": params,
+                    "elapsed_ms": elapsed_ms,
+                    "rows": rows,
+                    "plan": plan,
+                    "time": time.strftime('%Y-%m-%d %H:%M:%S')
+                })
+            print(f"Slow query ({elapsed_ms:.1f} ms, {rows} rows): {key}")
+            for line in plan:
+                print(f"    {line}")
+
+    def summary(self):
+        """Return the recorded statements, slowest total time first."""
+        with self._lock:
+            stats = sorted(self.stats.values(), key=lambda s: s.total_ms, reverse=True)
+            return [
+                {
+                    "sql": s.sql,
+                    "count": s.count,
+                    "total_ms": s.total_ms,
+                    "avg_ms": s.total_ms / s.count,
+                    "p95_ms": s.percentile(95),
+                    "max_ms": s.max_ms,
+                    "rows": s.rows
+                }
+                for s in stats
+            ]
+
+    def format_report(self):
+        """Format the recorded statistics as a plain-text report."""
+        if not self.enabled and not self.stats:
+            return ("Query profiling is disabled.\n\n"
+                    "Enable it from the Help menu or start the app with --profile-queries.")
+
+        lines = [f"Query profile (slow query threshold: {self.slow_query_ms:.1f} ms)", ""]
+        summary = self.summary()
+        if not summary:
+            lines.append("No queries recorded yet.")
+
+        for entry in summary:
+            lines.append(
+                f"{entry['count']:6d} calls │ total {entry['total_ms']:9.2f} ms │ "
+                f"avg {entry['avg_ms']:7.2f} ms │ p95 ≤{entry['p95_ms']:7.2f} ms │ "
+                f"max {entry['max_ms']:7.2f} ms │ {entry['rows']:8d} rows"
+            )
+            lines.append(f"    {entry['sql']}")
+
+        with self._lock:
+            slow_queries = list(self.slow_queries)
+        if slow_queries:
+            lines.extend(["", f"Slow queries (last {len(slow_queries)}):"])
+            for entry in slow_queries:
+                lines.append(f"[{entry['time']}] {entry['elapsed_ms']:.1f} ms, {entry['rows']} rows")
+                lines.append(f"    {entry['sql']}")
+                for plan_line in entry["plan"]:
+                    lines.append(f"        {plan_line}")
+
+        return "\n".join(lines)
+
+
+def explain_query_plan(conn, sql, params):
+    """Return the EXPLAIN QUERY PLAN output for a statement as indented lines."""
+    try:
+        # Use a plain cursor so the EXPLAIN itself is not profiled
+        cursor = sqlite3.Cursor(conn)
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        rows = cursor.fetchall()
+    except sqlite3.Error as e:
+        return [f"(no plan available: {e})"]
+
+    # Rows are (id, parent, notused, detail); indent children under their parent
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return lines
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """Cursor that times each statement together with the fetch of its rows."""
+
+    _pending = None
+
+    def execute(self, sql, parameters=()):
+        self.finish()
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._pending = [sql, parameters, time.perf_counter() - start, 0]
+
+    def executemany(self, sql, seq_of_parameters):
+        self.finish()
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            # There is no single parameter set to explain a batch with
+            self._pending = [sql, None, time.perf_counter() - start, 0]
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._add_fetch(time.perf_counter() - start, 1 if row is not None else 0)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._add_fetch(time.perf_counter() - start, len(rows))
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._add_fetch(time.perf_counter() - start, len(rows))
+        return rows
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        # Rows read by iterating (for row in cursor, dict(cursor)) count like fetchone
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._add_fetch(time.perf_counter() - start, 0)
+            raise
+        self._add_fetch(time.perf_counter() - start, 1)
+        return row
+
+    def _add_fetch(self, elapsed, rows):
+        if self._pending is not None:
+            self._pending[2] += elapsed
+            self._pending[3] += rows
+
+    def __del__(self):
+        # A cursor dropped without another statement or close() still reports its last one
+        self.finish()
+
+    def finish(self):
+        """Hand the statement in flight over to the profiler."""
+        pending = self._pending
+        if pending is None:
+            return
+        self._pending = None
+        sql, params, elapsed, rows = pending
+        profiler.record(self.connection, sql, params if params is not None else (), elapsed * 1000, rows)
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """Connection whose cursors report to the profiler.
+
+    Cursors are tracked weakly: long-lived connections (the database writer,
+    the replica, maintenance) create cursors for as long as the app runs, and
+    each one reports on its own when it is garbage-collected.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cursors = weakref.WeakSet()
+
+    def cursor(self, factory=ProfiledCursor):
+        cursor = super().cursor(factory)
+        self._cursors.add(cursor)
+        return cursor
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def close(self):
+        # Flush pending statements while the connection can still run EXPLAIN
+        for cursor in list(self._cursors):
+            cursor.finish()
+        self._cursors.clear()
+        super().close()
+
+
+# Shared profiler used by the database module
+profiler = QueryProfiler()
@@ -0,0 +1,160 @@
+import threading
+import time
+
+from storage import MemoryEngine, get_engine
+
+
+class AnalyticsReplica:
+    """An in-memory copy of the database that statistics and history are read from.
+
+    The copy is made with the online backup API. A connection kept open on
+    the live database watches PRAGMA data_version, which changes whenever
+    another connection commits, so the replica is only copied again after a
+    write. Reads are served from the copy while it is at most max_staleness
+    seconds behind the first write it has missed; older than that, the read
+    refreshes it first. Each refresh fills a new in-memory database and swaps
+    it in, so reads never wait for a copy in progress. start() runs a thread
+    that refreshes in the background so reads rarely have to copy at all.
+
+    Archive partitions are still attached from their files on disk.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.max_staleness = 5.0
+        self.refreshes = 0
+        self.last_refresh_ms = None
+        self._engine = None
+        self._source_engine = None
+        self._watcher = None
+        self._version = None
+        self._stale_since = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def configure(self, enabled=None, max_staleness=None):
+        """Turn the replica on or off and set how many seconds behind it may fall."""
+        if max_staleness is not None:
+            self.max_staleness = float(max_staleness)
+        if enabled is not None and enabled != self.enabled:
+            self.enabled = enabled
+            if not enabled:
+                self.stop()
+                with self._lock:
+                    self.close()
+
+    def connect(self, **kwargs):
+        """Open a connection on the replica, refreshing it first if it is too stale."""
+        with self._lock:
+            engine = self._engine if self._fresh(time.monotonic() - self.max_staleness) else None
+        if engine is None:
+            engine = self._refresh()
+        return engine.connect(**kwargs)
+
+    def refresh(self):
+        """Copy the live database now if it changed since the last copy. Returns True if copied."""
+        with self._lock:
+            fresh = self._fresh(time.monotonic())
+        if not fresh:
+            self._refresh()
+        return not fresh
+
+    def invalidate(self):
+        """Make the next read copy the database again, for writes that must show up at once."""
+        with self._lock:
+            self._version = None
+
+    def _fresh(self, deadline):
+        """True if the copy may still be served: unchanged, or changed no earlier than deadline."""
+        # A different engine (reset, --db) means a different database to copy
+        if self._engine is None or self._version is None or self._source_engine is not get_engine():
+            return False
+        version = self._watcher.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._version:
+            return True
+        if self._stale_since is None:
+            self._stale_since = time.monotonic()
+        return self._stale_since > deadline
+
+    def _refresh(self):
+        # One copy at a time; readers keep using the previous copy until the new one is swapped in
+        with self._refresh_lock:
+            with self._lock:
+                if self._source_engine is not get_engine():
+                    self.close()
+                    self._source_engine = get_engine()
+                    self._watcher = self._source_engine.connect(check_same_thread=False)
+                version = self._watcher.execute("PRAGMA data_version").fetchone()[0]
+                if self._engine is not None and version == self._version:
+                    return self._engine  # another thread copied while this one waited
+                source_engine = self._source_engine
+
+            # A commit after the version was read makes the next check copy again
+            start = time.perf_counter()
+            engine = MemoryEngine()
+            source = source_engine.connect()
+            target = engine.connect()
+            try:
+                source.backup(target)
+            except BaseException:
+                engine.close()
+                raise
+            finally:
+                target.close()
+                source.close()
+
+            with self._lock:
+                previous, self._engine = self._engine, engine
+                self._version = version
+                self._stale_since = None
+                self.refreshes += 1
+                self.last_refresh_ms = (time.perf_counter() - start) * 1000
+            # Connections already open on the previous copy keep it alive until they close
+            if previous is not None:
+                previous.close()
+            return engine
+
+    def close(self):
+        """Drop the in-memory copy; the next read makes a new one."""
+        if self._watcher is not None:
+            self._watcher.close()
+            self._watcher = None
+        if self._engine is not None:
+            self._engine.close()
+            self._engine = None
+        self._source_engine = None
+        self._version = None
+        self._stale_since = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval=None):
+        """Refresh in the background every interval seconds (default: half of max_staleness)."""
+        if self.running:
+            return
+        if interval is None:
+            interval = self.max_staleness / 2
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, args=(interval,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background refresh thread."""
+        self._stop_event.set()
+        if self.running:
+            self._thread.join()
+        self._thread = None
+
+    def _loop(self, interval):
+        while not self._stop_event.wait(interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error refreshing analytics replica: {e}")
+
+
+replica = AnalyticsReplica()
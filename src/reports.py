@@ -0,0 +1,183 @@
+import base64
+import html
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import matplotlib
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import storage
+from chart_figures import draw_chart
+from database import DEFAULT_USER_ID, get_user_profile
+from themes import chart_style
+from viewmodels import chart_data, summary_texts, summary_totals
+
+# Report periods: (summary period, chart period)
+REPORT_PERIODS = {
+    "Week": ("This Week", "Last 7 Days"),
+    "Month": ("This Month", "Last 30 Days"),
+    "Year": ("This Year", "This Year"),
+    "All Time": ("All Time", "All Time"),
+}
+
+# Charts of a report sheet, in reading order after the summary panel
+REPORT_CHARTS = ["Calories by Workout Type", "Duration by Workout Type", "Workout Frequency",
+                 "Fitness, Fatigue and Form", "Time in Heart Rate Zones"]
+
+REPORT_FORMATS = ("pdf", "png", "html")
+
+SUMMARY_ROWS = [("Sessions", "total_sessions"), ("Workouts", "total_workouts"),
+                ("Total duration (min)", "total_duration"), ("Total calories", "total_calories"),
+                ("Average session (min)", "avg_duration"), ("Average calories per session", "avg_calories")]
+
+
+def report_data(user_id=DEFAULT_USER_ID, period="Week"):
+    """Everything a report shows: profile name, period, summary texts and the data of each chart."""
+    summary_period, chart_period = REPORT_PERIODS[period]
+    profile = get_user_profile(user_id)
+    return {
+        "profile": profile[1] if profile else f"Profile {user_id}",
+        "period": period,
+        "generated": datetime.now().strftime('%Y-%m-%d %H:%M'),
+        "summary": summary_texts(summary_totals(summary_period, user_id)),
+        "charts": [chart_data(chart_type, chart_period, user_id) for chart_type in REPORT_CHARTS],
+    }
+
+
+def report_html(report, png):
+    """A standalone HTML report: the summary as a table and the sheet as an inline PNG."""
+    rows = "\n".join(f"<tr><th>{html.escape(label)}</th><td>{html.escape(report['summary'][key])}</td></tr>"
+                     for label, key in SUMMARY_ROWS)
+    title = html.escape(f"{report['profile']} - {report['period']} report")
+    image = base64.b64encode(png).decode('ascii')
+    return f"""<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>{title}</title></head>
+<body style="font-family: Helvetica, Arial, sans-serif">
+<h1>{title}</h1>
+<p>Generated {html.escape(report['generated'])}</p>
+<table>
+{rows}
+</table>
+<img src="data:image/png;base64,{image}" alt="Charts" style="max-width: 100%">
+</body>
+</html>
+"""
+
+
+class ReportRenderer:
+    """Draws report sheets on the Agg backend, without Tk or pyplot.
+
+    A sheet is a summary panel and the REPORT_CHARTS in a 3 x 2 grid. The
+    figure, its axes and its Agg canvas are built once and every report
+    clears and redraws the axes, which is much cheaper than a figure per
+    chart. warm_up() draws a sample sheet so font loading and glyph caching
+    happen before the first real report.
+    """
+
+    def __init__(self, theme="light", dpi=100):
+        self.theme = theme
+        with matplotlib.rc_context(chart_style(theme)):
+            self.fig = Figure(figsize=(16, 12), dpi=dpi)
+            FigureCanvasAgg(self.fig)
+            self.fig.subplots_adjust(left=0.06, right=0.97, top=0.9, bottom=0.07, hspace=0.55, wspace=0.25)
+            self.axes = list(self.fig.subplots(3, 2).flat)
+            self.title = self.fig.suptitle("", fontsize=18, fontweight="bold")
+            self.subtitle = self.fig.text(0.5, 0.935, "", ha="center", fontsize=11)
+
+    def draw(self, report):
+        with matplotlib.rc_context(chart_style(self.theme)):
+            for ax in self.axes:
+                # clear() keeps the equal aspect a pie chart sets
+                ax.clear()
+                ax.set_axis_on()
+                ax.set_aspect('auto')
+            self.title.set_text(f"{report['profile']} - {report['period']} report")
+            self.subtitle.set_text(f"Generated {report['generated']}")
+
+            panel = self.axes[0]
+            panel.set_axis_off()
+            panel.set_title("Summary", fontsize=14)
+            for row, (label, key) in enumerate(SUMMARY_ROWS):
+                y = 0.9 - row * 0.16
+                panel.text(0.02, y, label, fontsize=12, transform=panel.transAxes)
+                panel.text(0.98, y, report["summary"][key], fontsize=12, fontweight="bold", ha="right",
+                           transform=panel.transAxes)
+
+            for ax, data in zip(self.axes[1:], report["charts"]):
+                draw_chart(ax, data)
+
+    def save(self, report, fmt, path):
+        """Draw a report and write it to path as pdf, png or html."""
+        self.draw(report)
+        if fmt == "html":
+            buffer = io.BytesIO()
+            self.fig.savefig(buffer, format="png")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(report_html(report, buffer.getvalue()))
+        else:
+            self.fig.savefig(path, format=fmt)
+
+    def warm_up(self):
+        """Draw a sample sheet with the report's chart kinds, loading fonts and caching glyphs."""
+        bar = {"kind": "bar", "title": "Sample", "xlabel": "Type", "ylabel": "Value", "labels": ["A", "B"],
+               "values": [1.0, 2.0], "value_format": "{:.1f}"}
+        sample = {
+            "profile": "Sample", "period": "Week", "generated": "",
+            "summary": {key: "0.0" for _, key in SUMMARY_ROWS},
+            "charts": [bar, bar, {"kind": "pie", "title": "Sample", "labels": ["A", "B"], "values": [1, 2]},
+                       {"kind": "empty"}, bar],
+        }
+        self.draw(sample)
+        self.fig.canvas.draw()
+
+
+# The renderer of a pool worker, built by init_worker
+_renderer = None
+
+
+def init_worker(location, theme="light"):
+    """Pool initializer: open the database file and build and warm up this process's renderer."""
+    global _renderer
+    storage.configure(location)
+    _renderer = ReportRenderer(theme)
+    _renderer.warm_up()
+
+
+def render_report(job):
+    """Render one (user_id, period, format, path) job in a worker; returns (path, seconds)."""
+    user_id, period, fmt, path = job
+    start = time.perf_counter()
+    _renderer.save(report_data(user_id, period), fmt, path)
+    return path, time.perf_counter() - start
+
+
+def report_jobs(user_ids, periods, fmt, output_dir):
+    """(user_id, period, format, path) of each report, saved as profile<id>-<period>.<format>."""
+    return [(user_id, period, fmt,
+             os.path.join(output_dir, f"profile{user_id}-{period.lower().replace(' ', '-')}.{fmt}"))
+            for user_id in user_ids for period in periods]
+
+
+def render_reports(jobs, workers=None, theme="light", progress=None):
+    """Render report jobs across a process pool; returns (paths, seconds including pool start-up).
+
+    Workers open the configured database file themselves, so an in-memory
+    database cannot be reported on. progress(done, total) is called as
+    reports complete.
+    """
+    engine = storage.get_engine()
+    if isinstance(engine, storage.MemoryEngine):
+        raise ValueError("Reports are rendered in worker processes and need a database file, not an in-memory one")
+    start = time.perf_counter()
+    paths = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(engine.path, theme)) as pool:
+        for path, _ in pool.map(render_report, jobs):
+            paths.append(path)
+            if progress:
+                progress(len(paths), len(jobs))
+    return paths, time.perf_counter() - start
@@ -0,0 +1,116 @@
+import time
+from collections import deque
+
+from lag_monitor import percentile
+
+
+class ResizeManager:
+    """Turns the flood of <Configure> events of a window resize into a few layout passes.
+
+    A binding on the root sees the <Configure> of every widget in the window
+    through the bind tags. on_configure() drops all but the root's own events
+    whose size changed, with no work beyond two comparisons. Accepted events
+    only record the size: at most one frame pass runs every frame_ms, calling
+    the on_frame callbacks with the latest size, and the on_settle callbacks
+    run once the size has not changed for settle_ms.
+
+    Matplotlib canvases re-rasterize their figure on every <Configure> of
+    their widget; defer_canvas() takes that binding over so the figure is
+    resized once, after the resize settles.
+    """
+
+    def __init__(self, root, frame_ms=16, settle_ms=150, window=1000):
+        self.root = root
+        self.frame_ms = frame_ms
+        self.settle_ms = settle_ms
+        self.width = None
+        self.height = None
+        self.counts = {"events": 0, "accepted": 0, "frames": 0, "settles": 0, "canvas_redraws": 0}
+        self.frame_lag_ms = deque(maxlen=window)
+        self._frame_callbacks = []
+        self._settle_callbacks = []
+        self._canvases = {}  # canvas widget -> [resize function, latest pending event]
+        self._frame_due = None
+        self._frame_id = None
+        self._settle_id = None
+        self._last_change = 0.0
+
+    def on_frame(self, callback):
+        """Call callback(width, height) at most once per frame while the window resizes."""
+        self._frame_callbacks.append(callback)
+
+    def on_settle(self, callback):
+        """Call callback(width, height) once the window has stopped resizing."""
+        self._settle_callbacks.append(callback)
+
+    def on_configure(self, event):
+        """<Configure> handler for the root window."""
+        self.counts["events"] += 1
+        if event.widget is not self.root or (event.width == self.width and event.height == self.height):
+            return
+        self.counts["accepted"] += 1
+        self.width = event.width
+        self.height = event.height
+        self._changed()
+
+    def defer_canvas(self, widget, resize):
+        """Route the <Configure> events of a canvas widget to resize(event), after resizing settles.
+
+        resize is what the widget was bound to before, e.g. the resize
+        method of a FigureCanvasTkAgg. The first event, when the canvas is
+        first laid out, is passed through so the figure fills its space.
+        """
+        def configure(event):
+            entry = self._canvases.get(widget)
+            if entry is None:
+                self._canvases[widget] = [resize, None]
+                self.counts["canvas_redraws"] += 1
+                resize(event)
+            else:
+                entry[1] = event
+                self._changed()
+
+        widget.bind("<Configure>", configure)
+        widget.bind("<Destroy>", lambda e: self._canvases.pop(widget, None), add="+")
+
+    def _changed(self):
+        self._last_change = time.perf_counter()
+        if self._frame_id is None:
+            self._frame_due = self._last_change + self.frame_ms / 1000.0
+            self._frame_id = self.root.after(self.frame_ms, self._frame)
+        if self._settle_id is None:
+            self._settle_id = self.root.after(self.settle_ms, self._settle)
+
+    def _frame(self):
+        self._frame_id = None
+        self.frame_lag_ms.append((time.perf_counter() - self._frame_due) * 1000)
+        self.counts["frames"] += 1
+        for callback in self._frame_callbacks:
+            callback(self.width, self.height)
+
+    def _settle(self):
+        # One timer for the whole resize instead of cancelling and rescheduling on every event
+        quiet_ms = (time.perf_counter() - self._last_change) * 1000
+        if quiet_ms < self.settle_ms:
+            self._settle_id = self.root.after(max(1, int(self.settle_ms - quiet_ms)), self._settle)
+            return
+        self._settle_id = None
+        self.counts["settles"] += 1
+        if self.width is not None:
+            for callback in self._settle_callbacks:
+                callback(self.width, self.height)
+        for entry in self._canvases.values():
+            resize, event = entry
+            if event is not None:
+                entry[1] = None
+                self.counts["canvas_redraws"] += 1
+                resize(event)
+
+    def stats(self):
+        """Event counts and p50/p95/max frame lag (ms)."""
+        stats = dict(self.counts)
+        lags = list(self.frame_lag_ms)
+        stats["frame_lag_p50_ms"] = round(percentile(lags, 50), 2)
+        stats["frame_lag_p95_ms"] = round(percentile(lags, 95), 2)
+        stats["frame_lag_max_ms"] = round(max(lags), 2) if lags else 0.0
+        return stats
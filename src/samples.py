@@ -0,0 +1,160 @@
+import zlib
+
+import numpy as np
+
+from database import get_connection, invalidate_workout_analytics
+
+# Streams that can be stored per workout, with their ids in workout_samples
+STREAMS = {"heart_rate": 1, "pace": 2, "power": 3}
+
+# Samples per chunk; a 2 hour ride at 1 Hz is 8 chunks per stream
+CHUNK_SAMPLES = 1024
+
+DELTA_TYPES = [np.int8, np.int16, np.int32]
+
+# Sample values are whole numbers (bpm, seconds per km, watts). Each chunk
+# stores its first time and value in columns and the remaining samples as
+# successive differences, time deltas first, then value deltas, in the
+# smallest integer width that fits both, zlib-compressed into one BLOB.
+
+
+def delta_type(*deltas):
+    """Smallest integer dtype that holds every delta."""
+    low = min((int(d.min()) for d in deltas if len(d)), default=0)
+    high = max((int(d.max()) for d in deltas if len(d)), default=0)
+    for dtype in DELTA_TYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    raise ValueError("sample deltas do not fit in 32 bits")
+
+
+def encode_chunks(times, values):
+    """Yield (first_time, last_time, count, first_value, width, blob) for sorted samples."""
+    for i in range(0, len(times), CHUNK_SAMPLES):
+        t = times[i:i + CHUNK_SAMPLES]
+        v = values[i:i + CHUNK_SAMPLES]
+        time_deltas = np.diff(t)
+        value_deltas = np.diff(v)
+        dtype = delta_type(time_deltas, value_deltas)
+        payload = time_deltas.astype(dtype).tobytes() + value_deltas.astype(dtype).tobytes()
+        yield (int(t[0]), int(t[-1]), len(t), int(v[0]), np.dtype(dtype).itemsize, zlib.compress(payload, 6))
+
+
+def write_samples(cursor, workout_id, stream, times, values):
+    """Store one stream of a workout using the caller's cursor and transaction.
+
+    times are seconds from the start of the workout, values are rounded to
+    whole numbers, and samples whose value is NaN are left out. Any samples
+    the workout already had for the stream are replaced. Returns the number
+    of samples stored.
+    """
+    stream_id = STREAMS[stream]
+    times = np.asarray(times, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    keep = ~np.isnan(values)
+    times = np.rint(times[keep]).astype(np.int64)
+    values = np.rint(values[keep]).astype(np.int64)
+    order = np.argsort(times, kind="stable")
+    times, values = times[order], values[order]
+
+    cursor.execute("DELETE FROM workout_samples WHERE workout_id = ? AND stream = ?", (workout_id, stream_id))
+    if stream == "heart_rate":
+        invalidate_workout_analytics(cursor, workout_id)
+    cursor.executemany('''
+        INSERT INTO workout_samples (workout_id, stream, first_time, last_time, count, first_value, width, data)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', [(workout_id, stream_id) + chunk for chunk in encode_chunks(times, values)])
+    return len(times)
+
+
+def save_samples(workout_id, streams):
+    """Store {stream: (times, values)} for a workout in one transaction."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        for stream, (times, values) in streams.items():
+            write_samples(cursor, workout_id, stream, times, values)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def decode_chunks(rows):
+    """Decode (first_time, count, first_value, width, blob) rows into time and value arrays."""
+    total = sum(row[1] for row in rows)
+    times = np.empty(total, dtype=np.int32)
+    values = np.empty(total, dtype=np.int32)
+    pos = 0
+    for first_time, count, first_value, width, blob in rows:
+        # Views straight onto the decompressed buffer; cumsum writes into the result
+        raw = zlib.decompress(blob)
+        dtype = DELTA_TYPES[width.bit_length() - 1]
+        time_deltas = np.frombuffer(raw, dtype=dtype, count=count - 1)
+        value_deltas = np.frombuffer(raw, dtype=dtype, count=count - 1, offset=(count - 1) * width)
+        times[pos] = first_time
+        values[pos] = first_value
+        np.cumsum(time_deltas, dtype=np.int32, out=times[pos + 1:pos + count])
+        np.cumsum(value_deltas, dtype=np.int32, out=values[pos + 1:pos + count])
+        times[pos + 1:pos + count] += first_time
+        values[pos + 1:pos + count] += first_value
+        pos += count
+    return times, values
+
+
+def read_samples(workout_id, stream, start=None, end=None, cursor=None):
+    """Return (times, values) int32 arrays of a stream, optionally limited to start <= time <= end.
+
+    Only the chunks that overlap the range are read and decompressed.
+    """
+    params = [workout_id, STREAMS[stream]]
+    query = '''
+        SELECT first_time, count, first_value, width, data FROM workout_samples
+        WHERE workout_id = ? AND stream = ?
+    '''
+    if end is not None:
+        query += " AND first_time <= ?"
+        params.append(end)
+    if start is not None:
+        query += " AND last_time >= ?"
+        params.append(start)
+    query += " ORDER BY first_time"
+
+    conn = None
+    if cursor is None:
+        conn = get_connection()
+        cursor = conn.cursor()
+    try:
+        rows = cursor.execute(query, params).fetchall()
+    finally:
+        if conn is not None:
+            conn.close()
+
+    times, values = decode_chunks(rows)
+    if start is not None or end is not None:
+        lo = 0 if start is None else np.searchsorted(times, start, side="left")
+        hi = len(times) if end is None else np.searchsorted(times, end, side="right")
+        times, values = times[lo:hi], values[lo:hi]
+    return times, values
+
+
+def read_all_samples(workout_id, start=None, end=None):
+    """Return {stream: (times, values)} for every stream the workout has."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT DISTINCT stream FROM workout_samples WHERE workout_id = ?", (workout_id,))
+        stream_ids = {row[0] for row in cursor.fetchall()}
+        return {name: read_samples(workout_id, name, start, end, cursor)
+                for name, stream_id in STREAMS.items() if stream_id in stream_ids}
+    finally:
+        conn.close()
+
+
+def delete_samples(cursor, workout_id):
+    """Remove every stream of a workout using the caller's cursor and transaction."""
+    cursor.execute("DELETE FROM workout_samples WHERE workout_id = ?", (workout_id,))
+    invalidate_workout_analytics(cursor, workout_id)
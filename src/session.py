@@ -1,8 +1,13 @@
-from datetime import datetime
-from database import add_workout, add_session, get_session_details, get_sessions
+import threading
+from datetime import datetime, timedelta
+from database import (DEFAULT_USER_ID, add_workout, add_session, get_open_sessions, get_session_details,
+                      write_session, write_workout)
+from workout import Workout
 
 class Session:
-    def __init__(self):
+    def __init__(self, user_id=DEFAULT_USER_ID, writer=None):
+        self.user_id = user_id
+        self.writer = writer  # shared DatabaseWriter, or None to write directly
         self.workouts = []
         self.is_active = False
         self.start_time = None
@@ -29,7 +34,43 @@ class Session:
             self.duration = (self.end_time - self.start_time).total_seconds() / 60
             self.total_calories = sum(w.calories_burned for w in self.workouts)
             # Update session in database
-            add_session(
+            self._save_session(
+                self.start_time.strftime('%Y-%m-%d %H:%M:%S'),
+                self.end_time.strftime('%Y-%m-%d %H:%M:%S'),
+                self.duration,
+                self.total_calories,
+                session_id=self.session_id
+            )
+            return True
+        return False
+
+    @classmethod
+    def restore(cls, session_id, start_time, user_id=DEFAULT_USER_ID, writer=None):
+        """Rebuild an unfinished session from its saved workouts."""
+        session = cls(user_id, writer)
+        session.session_id = session_id
+        session.start_time = datetime.strptime(start_time, '%Y-%m-%d %H:%M:%S')
+        session.is_active = True
+        session.reload()
+        return session
+
+    def reload(self):
+        """Re-read the saved workouts, after one of them was edited or deleted."""
+        self.workouts = [Workout(workout_type, duration, calories, intensity=intensity, notes=notes or "")
+                         for workout_type, duration, calories, intensity, notes, _ in get_session_details(self.session_id)]
+        self.total_calories = sum(w.calories_burned for w in self.workouts)
+        self.duration = sum(w.duration for w in self.workouts)
+
+    def close(self):
+        """End a restored session using totals computed from its workouts.
+
+        The time the app stopped is unknown, so the session is taken to have
+        lasted as long as its workouts.
+        """
+        if self.is_active:
+            self.is_active = False
+            self.end_time = self.start_time + timedelta(minutes=self.duration)
+            self._save_session(
                 self.start_time.strftime('%Y-%m-%d %H:%M:%S'),
                 self.end_time.strftime('%Y-%m-%d %H:%M:%S'),
                 self.duration,
@@ -45,13 +86,14 @@ class Session:
             try:
                 self.workouts.append(workout)
                 # Save the workout to the database
-                add_workout(
+                self._save_workout(
                     workout.workout_type, 
                     workout.duration, 
                     workout.calories_burned, 
                     self.session_id,
                     intensity=workout.intensity,
-                    notes=workout.notes
+                    notes=workout.notes,
+                    calories_estimated=workout.calories_estimated
                 )
                 # Update session totals
                 self.total_calories = sum(w.calories_burned for w in self.workouts)
@@ -62,6 +104,16 @@ class Session:
                 return False
         return False
 
+    def _save_session(self, *args, **kwargs):
+        if self.writer:
+            return self.writer.call(write_session, *args, user_id=self.user_id, **kwargs)
+        return add_session(*args, user_id=self.user_id, **kwargs)
+
+    def _save_workout(self, *args, **kwargs):
+        if self.writer:
+            return self.writer.call(write_workout, *args, user_id=self.user_id, **kwargs)
+        return add_workout(*args, user_id=self.user_id, **kwargs)
+
     def get_session_stats(self):
         """Get current session statistics."""
         if not self.workouts:
@@ -111,11 +163,96 @@ class Session:
     def start_new_session(self):
         """Initialize a new session in the database."""
         try:
-            session_id = add_session(
+            session_id = self._save_session(
                 self.start_time.strftime('%Y-%m-%d %H:%M:%S'),
                 None, 0, 0
             )
             return session_id
         except Exception as e:
             print(f"Error creating new session: {e}")
-            return None
\ No newline at end of file
+            return None
+
+
+class SessionRegistry:
+    """Sessions of many profiles at once, as on a shared gym-floor kiosk.
+
+    Holds the current (active or last ended) Session of each user id. All
+    sessions share one DatabaseWriter, if given, so simultaneous loggers are
+    committed together.
+    """
+
+    def __init__(self, writer=None):
+        self.writer = writer
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id=DEFAULT_USER_ID):
+        """Return the current session of a user, creating an idle one if needed."""
+        with self._lock:
+            session = self._sessions.get(user_id)
+            if session is None:
+                session = self._sessions[user_id] = Session(user_id, self.writer)
+            return session
+
+    def put(self, session):
+        """Make session the current session of its user."""
+        if session.writer is None:
+            session.writer = self.writer
+        with self._lock:
+            self._sessions[session.user_id] = session
+
+    def start(self, user_id=DEFAULT_USER_ID):
+        """Start a fresh session for a user, ending any active one first."""
+        current = self.get(user_id)
+        if current.is_active:
+            current.end()
+        session = Session(user_id, self.writer)
+        session.start()
+        self.put(session)
+        return session
+
+    def end(self, user_id=DEFAULT_USER_ID):
+        """End the active session of a user; returns False if there was none."""
+        return self.get(user_id).end()
+
+    def add_workout(self, user_id, workout):
+        """Log a workout in the active session of a user."""
+        return self.get(user_id).add_workout(workout)
+
+    def active(self):
+        """Return the active sessions, keyed by user id."""
+        with self._lock:
+            return {user_id: s for user_id, s in self._sessions.items() if s.is_active}
+
+    def reload(self, session_id):
+        """Re-read the workouts of the active session with session_id; returns it, or None."""
+        for session in self.active().values():
+            if session.session_id == session_id:
+                session.reload()
+                return session
+        return None
+
+    def restore_open(self, user_id=None):
+        """Put sessions left open by a crash back into the registry.
+
+        Covers every user, or only user_id if given. The newest open session
+        of a user becomes their current session; older ones are closed. A
+        user who already has an active session gets all of theirs closed.
+        Returns {user_id: (restored session, number closed)} of the users
+        whose session was restored.
+        """
+        live = {s.session_id for s in self.active().values()}
+        restored = {}
+        closed = {}
+        for row in get_open_sessions(user_id):
+            session_id, start_time, owner = row[0], row[1], row[-1]
+            if session_id in live:
+                continue
+            session = Session.restore(session_id, start_time, owner, self.writer)
+            if self.get(owner).is_active:
+                session.close()
+                closed[owner] = closed.get(owner, 0) + 1
+            else:
+                self.put(session)
+                restored[owner] = session
+        return {owner: (session, closed.get(owner, 0)) for owner, session in restored.items()}
@@ -0,0 +1,144 @@
+import tkinter as tk
+from datetime import datetime
+
+
+def format_elapsed(start_time, now=None):
+    """Elapsed time since start_time as H:MM:SS."""
+    seconds = int(((now or datetime.now()) - start_time).total_seconds())
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+class SessionClock:
+    """Ticks the elapsed time of the active session into a StringVar.
+
+    There is at most one pending after() timer, due on the next whole second
+    of the session, and it only exists while a session is running and the
+    widget is viewable: switching tabs or minimizing the window stops it, so
+    a hidden clock costs nothing. The variable is only set when its text
+    changes.
+    """
+
+    def __init__(self, widget, variable):
+        self.widget = widget
+        self.variable = variable
+        self.start_time = None
+        self._after_id = None
+
+    def set_session(self, session):
+        """Follow session, or show that there is none running."""
+        self.start_time = session.start_time if session.is_active else None
+        self._cancel()
+        if self.start_time is None:
+            self._set("No active session")
+        else:
+            self.tick()
+
+    def visibility_changed(self, event=None):
+        """Start or stop ticking when the widget is shown or hidden."""
+        if self.start_time is not None and self.widget.winfo_viewable():
+            if self._after_id is None:
+                self.tick()
+        else:
+            self._cancel()
+
+    def tick(self):
+        self._after_id = None
+        if self.start_time is None:
+            return
+        now = datetime.now()
+        self._set(f"Session active - started at {self.start_time.strftime('%H:%M:%S')} "
+                  f"(Elapsed: {format_elapsed(self.start_time, now)})")
+        if self.widget.winfo_viewable():
+            # Wake up just after the next whole second of the session
+            ms = 1000 - int((now - self.start_time).total_seconds() * 1000) % 1000
+            self._after_id = self.widget.after(ms + 5, self.tick)
+
+    def stop(self):
+        self._cancel()
+
+    def _cancel(self):
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _set(self, text):
+        if self.variable.get() != text:
+            self.variable.set(text)
+
+
+class SessionLog:
+    """Session details in a Text widget, appended to as workouts are added.
+
+    show() rewrites the widget only when the session, whether it is running
+    or its workout list changed (Session.reload replaces the list after an
+    edit); otherwise it takes off the total line, appends the new workout
+    lines and puts the total back, so adding a workout costs the same with
+    three workouts or three hundred.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self._session = None
+        self._active = None
+        self._workouts = None
+        self._count = 0
+
+    def show(self, session):
+        self.text.config(state=tk.NORMAL)
+        try:
+            if (session is self._session and session.is_active == self._active
+                    and session.workouts is self._workouts):
+                self._append(session)
+            else:
+                self._render(session)
+        finally:
+            self.text.config(state=tk.DISABLED)
+
+    def _render(self, session):
+        text = self.text
+        text.delete("1.0", tk.END)
+        self._session, self._active, self._workouts, self._count = session, session.is_active, session.workouts, 0
+
+        if not session.is_active and not session.workouts:
+            text.insert(tk.END, "No active session.\n\n")
+            text.insert(tk.END, "Click 'Start Session' to begin tracking your workout.")
+            self._session = None
+            return
+
+        if session.is_active:
+            # The elapsed time ticks in the Session Status label above
+            text.insert(tk.END, f"Session active - started at {session.start_time.strftime('%H:%M:%S')}\n\n")
+        else:
+            duration_str = f"{session.duration:.1f} minutes" if session.duration else "N/A"
+            text.insert(tk.END, f"Session ended\nDuration: {duration_str}\n\n")
+
+        if not session.workouts:
+            text.insert(tk.END, "No workouts added yet.\n\nClick 'Add Workout' to record your activities.\n",
+                        "placeholder")
+        else:
+            text.insert(tk.END, "Workouts:\n")
+        self._append(session)
+
+    def _append(self, session):
+        text = self.text
+        new = session.workouts[self._count:]
+        if not new:
+            return
+        # Keep following the log if it was scrolled to the bottom
+        at_bottom = text.yview()[1] >= 1.0
+        if text.tag_ranges("total"):
+            text.delete("total.first", "total.last")
+        if text.tag_ranges("placeholder"):
+            text.delete("placeholder.first", "placeholder.last")
+            text.insert(tk.END, "Workouts:\n")
+
+        lines = []
+        for i, workout in enumerate(new, self._count + 1):
+            lines.append(f"{i}. {workout.workout_type} - {workout.duration:.1f} min, {workout.calories:.1f} calories\n")
+            if workout.notes:
+                lines.append(f"   Notes: {workout.notes}\n")
+        text.insert(tk.END, "".join(lines))
+        self._count = len(session.workouts)
+        text.insert(tk.END, f"\nTotal Calories: {session.total_calories:.1f}\n", "total")
+        if at_bottom:
+            text.see(tk.END)
@@ -0,0 +1,128 @@
+import itertools
+import os
+import shutil
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+
+# Used when neither --db nor the environment variable names a database
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fitness_tracker.db")
+ENV_VAR = "FITNESS_TRACKER_DB"
+MEMORY = ":memory:"
+
+
+class FileEngine:
+    """A database file on disk; archives and backups go in folders beside it."""
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self.directory = os.path.dirname(self.path)
+
+    def connect(self, **kwargs):
+        return sqlite3.connect(self.path, **kwargs)
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def destroy(self):
+        """Delete the database file; the next connection starts an empty one."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def close(self):
+        pass
+
+    def __repr__(self):
+        return f"FileEngine({self.path!r})"
+
+
+class MemoryEngine:
+    """A database in RAM that every connection of the process shares until close().
+
+    Uses SQLite's memdb VFS, which locks like a file so a writer thread waits
+    for the lock as usual, and falls back to a shared-cache :memory: database
+    on SQLite older than 3.36. Archives and backups go to a temporary
+    directory that is removed on close().
+    """
+
+    _names = itertools.count(1)
+
+    def __init__(self):
+        name = f"fitness_tracker_{os.getpid()}_{next(self._names)}"
+        if sqlite3.sqlite_version_info >= (3, 36, 0):
+            self.path = f"file:/{name}?vfs=memdb"
+        else:
+            self.path = f"file:{name}?mode=memory&cache=shared"
+        self._directory = None
+        # The database lives as long as one connection to it is open; any thread may close it
+        self._keeper = self.connect(check_same_thread=False)
+
+    @property
+    def directory(self):
+        if self._directory is None:
+            self._directory = tempfile.mkdtemp(prefix="fitness_tracker_")
+        return self._directory
+
+    def connect(self, **kwargs):
+        return sqlite3.connect(self.path, uri=True, **kwargs)
+
+    def exists(self):
+        return self._keeper is not None
+
+    def destroy(self):
+        """Discard the data; once other connections are closed the next one starts empty."""
+        self._keeper.close()
+        self._keeper = self.connect(check_same_thread=False)
+
+    def close(self):
+        if self._keeper is not None:
+            self._keeper.close()
+            self._keeper = None
+        if self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._directory = None
+
+    def __repr__(self):
+        return f"MemoryEngine({self.path!r})"
+
+
+def open_engine(location):
+    """Engine for a file path, or a fresh in-memory one for ':memory:'."""
+    if location == MEMORY:
+        return MemoryEngine()
+    return FileEngine(location)
+
+
+_engine = None
+
+
+def configure(location=None):
+    """Route every connection to location and return its engine.
+
+    location is a path, ':memory:' or an engine. Without one the path comes
+    from the FITNESS_TRACKER_DB environment variable, else DEFAULT_PATH.
+    """
+    global _engine
+    if location is None:
+        location = os.environ.get(ENV_VAR) or DEFAULT_PATH
+    _engine = open_engine(location) if isinstance(location, str) else location
+    return _engine
+
+
+def get_engine():
+    """The engine connections are opened on, configured from the environment on first use."""
+    if _engine is None:
+        configure()
+    return _engine
+
+
+@contextmanager
+def using(engine):
+    """Route every connection to engine for the duration of the block."""
+    global _engine
+    previous = _engine
+    _engine = engine
+    try:
+        yield engine
+    finally:
+        _engine = previous
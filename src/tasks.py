@@ -0,0 +1,211 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from lag_monitor import percentile
+
+
+class Task:
+    """One unit of background work submitted to a TaskScheduler slot."""
+
+    def __init__(self, slot, func, args, kwargs, on_done, on_error):
+        self.slot = slot
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.on_done = on_done
+        self.on_error = on_error
+        self.submitted_at = time.perf_counter()
+        self.started_at = None
+        self.finished_at = None
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Drop the task: it does not start if it has not yet, and its result is never delivered.
+
+        Work already running is not interrupted; long tasks can check
+        cancelled between steps and return early.
+        """
+        self._cancelled.set()
+
+
+class TaskScheduler:
+    """Runs background work for the UI and hands the results back on the Tk thread.
+
+    Work is submitted to a named slot. Tasks of one slot run one at a time:
+    a task submitted while another waits in the slot supersedes it, and with
+    supersede=True the running one is cancelled as well, so repeated clicks
+    on Refresh do the work once. Results go to on_done (exceptions to
+    on_error) through a queue that a pump scheduled with root.after drains
+    on the Tk thread, so callbacks may touch widgets and workers never do.
+    call_soon() sends any other call, such as a progress update, the same
+    way.
+    """
+
+    def __init__(self, root, workers=4, pump_ms=20, pump_budget_ms=15, window=500):
+        self.root = root
+        self.pump_ms = pump_ms
+        self.pump_budget = pump_budget_ms / 1000.0
+        self.counts = {"submitted": 0, "completed": 0, "failed": 0, "cancelled": 0, "superseded": 0}
+        self.wait_ms = deque(maxlen=window)
+        self.run_ms = deque(maxlen=window)
+        self.delivery_ms = deque(maxlen=window)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ui-task")
+        self._slots = {}  # slot -> [running task, waiting task]
+        self._results = queue.Queue()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._after_id = None
+        self.running = False
+
+    def start(self):
+        """Start pumping results into the Tk event loop."""
+        if self.running:
+            return
+        self.running = True
+        self._after_id = self.root.after(self.pump_ms, self._pump)
+
+    def stop(self):
+        """Cancel everything that has not run yet and stop the pump and the workers."""
+        self.running = False
+        with self._lock:
+            for slot in self._slots.values():
+                for task in slot:
+                    if task is not None:
+                        task.cancel()
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, slot, func, *args, on_done=None, on_error=None, supersede=True, **kwargs):
+        """Run func(*args, **kwargs) in the background under slot and return its Task."""
+        task = Task(slot, func, args, kwargs, on_done, on_error)
+        with self._lock:
+            self.counts["submitted"] += 1
+            running, waiting = self._slots.setdefault(slot, [None, None])
+            if waiting is not None:
+                waiting.cancel()
+                self.counts["superseded"] += 1
+            if running is None:
+                self._slots[slot] = [task, None]
+                self._executor.submit(self._run, task)
+            else:
+                if supersede and not running.cancelled:
+                    running.cancel()
+                    self.counts["superseded"] += 1
+                self._slots[slot][1] = task
+        return task
+
+    def cancel(self, slot):
+        """Cancel the running and waiting task of a slot; returns how many were cancelled."""
+        cancelled = 0
+        with self._lock:
+            for task in self._slots.get(slot, [None, None]):
+                if task is not None and not task.cancelled:
+                    task.cancel()
+                    cancelled += 1
+            self.counts["cancelled"] += cancelled
+        return cancelled
+
+    def current(self):
+        """The Task running on the calling worker thread, or None."""
+        return getattr(self._local, "task", None)
+
+    def call_soon(self, func, *args):
+        """Run func(*args) on the Tk thread at the next pump; safe from any thread."""
+        self._results.put((None, func, args))
+
+    def busy(self, slot):
+        """True while a task of slot is running or waiting."""
+        with self._lock:
+            return any(task is not None for task in self._slots.get(slot, ()))
+
+    def _run(self, task):
+        if not task.cancelled:
+            task.started_at = time.perf_counter()
+            self._local.task = task
+            try:
+                result = task.func(*task.args, **task.kwargs)
+                delivery = (task.on_done, (result,)) if task.on_done else None
+            except Exception as e:
+                with self._lock:
+                    self.counts["failed"] += 1
+                if task.on_error:
+                    delivery = (task.on_error, (e,))
+                else:
+                    print(f"Error in background task '{task.slot}': {e}")
+                    delivery = None
+            finally:
+                self._local.task = None
+            task.finished_at = time.perf_counter()
+            with self._lock:
+                self.wait_ms.append((task.started_at - task.submitted_at) * 1000)
+                self.run_ms.append((task.finished_at - task.started_at) * 1000)
+            if delivery is not None:
+                self._results.put((task,) + delivery)
+
+        # Start whatever arrived in the slot meanwhile
+        with self._lock:
+            slot = self._slots[task.slot]
+            slot[0], slot[1] = slot[1], None
+            if slot[0] is None:
+                del self._slots[task.slot]
+            else:
+                try:
+                    self._executor.submit(self._run, slot[0])
+                except RuntimeError:
+                    # stop() shut the workers down; the task never runs
+                    del self._slots[task.slot]
+
+    def _pump(self):
+        deadline = time.perf_counter() + self.pump_budget
+        while time.perf_counter() < deadline:
+            try:
+                task, func, args = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if task is not None:
+                # Results of superseded or cancelled work are dropped here
+                if task.cancelled:
+                    continue
+                self.delivery_ms.append((time.perf_counter() - task.finished_at) * 1000)
+                with self._lock:
+                    self.counts["completed"] += 1
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"Error delivering background task result: {e}")
+        if self.running:
+            self._after_id = self.root.after(self.pump_ms, self._pump)
+
+    def stats(self):
+        """Queue depth, counters and p50/p95 latencies (ms) of the recent tasks."""
+        with self._lock:
+            waiting = sum(1 for _, task in self._slots.values() if task is not None)
+            running = sum(1 for task, _ in self._slots.values() if task is not None)
+            stats = dict(self.counts)
+            samples = {"wait": list(self.wait_ms), "run": list(self.run_ms), "delivery": list(self.delivery_ms)}
+        stats.update({"queue_depth": waiting + self._results.qsize(), "waiting": waiting, "running": running,
+                      "undelivered": self._results.qsize()})
+        for name, values in samples.items():
+            stats[f"{name}_p50_ms"] = round(percentile(values, 50), 2)
+            stats[f"{name}_p95_ms"] = round(percentile(values, 95), 2)
+        return stats
+
+    def format_report(self):
+        """Plain-text summary of stats()."""
+        s = self.stats()
+        return (f"Queue depth: {s['queue_depth']} ({s['waiting']} waiting, {s['undelivered']} results undelivered)\n"
+                f"Running: {s['running']}\n"
+                f"Submitted: {s['submitted']}, completed: {s['completed']}, failed: {s['failed']}, "
+                f"superseded: {s['superseded']}, cancelled: {s['cancelled']}\n\n"
+                f"Wait before start:  p50 {s['wait_p50_ms']:.1f} ms, p95 {s['wait_p95_ms']:.1f} ms\n"
+                f"Run time:           p50 {s['run_p50_ms']:.1f} ms, p95 {s['run_p95_ms']:.1f} ms\n"
+                f"Delivery to UI:     p50 {s['delivery_p50_ms']:.1f} ms, p95 {s['delivery_p95_ms']:.1f} ms")
@@ -0,0 +1,119 @@
+PALETTES = {
+    "light": {"background": "#FFFFFF", "foreground": "#333333", "tab": "#e0e0e0", "text": "white",
+              "grid": "#b0b0b0", "heatmap": ["#ebedf0", "#c6e48b", "#7bc96f", "#239a3b", "#196127"]},
+    "dark": {"background": "#333333", "foreground": "#FFFFFF", "tab": "#424242", "text": "#424242",
+             "grid": "#5a5a5a", "heatmap": ["#424242", "#0e4429", "#006d32", "#26a641", "#39d353"]},
+}
+
+FONT_SIZES = {"Small": 9, "Medium": 11, "Large": 14}
+
+BASE_THEME = "clam"
+
+
+def theme_settings(palette, accent, info, success, error, font_size=None):
+    """ttk.Style.theme_create settings for one profile."""
+    label_font = {"font": ("Helvetica", font_size)} if font_size else {}
+    return {
+        ".": {"configure": {"background": palette["background"], "foreground": palette["foreground"],
+                            "fieldbackground": palette["background"], "selectbackground": accent,
+                            "selectforeground": "white"}},
+        "TFrame": {"configure": {"background": palette["background"]}},
+        "TLabel": {"configure": dict(background=palette["background"], foreground=palette["foreground"],
+                                     **label_font)},
+        "TButton": {"configure": dict(background=accent, foreground="white", padding=(10, 5), **label_font),
+                    "map": {"background": [("active", info)], "foreground": [("active", "white")]}},
+        "Success.TButton": {"configure": {"background": success, "foreground": "white"},
+                            "map": {"background": [("active", "#45a049")]}},
+        "Danger.TButton": {"configure": {"background": error, "foreground": "white"},
+                           "map": {"background": [("active", "#d32f2f")]}},
+        "TNotebook": {"configure": {"background": palette["background"], "tabmargins": [2, 5, 2, 0]}},
+        "TNotebook.Tab": {"configure": {"background": palette["tab"], "foreground": palette["foreground"],
+                                        "padding": [15, 5], "font": ("Helvetica", font_size or 10)},
+                          "map": {"background": [("selected", accent)], "foreground": [("selected", "white")]}},
+    }
+
+
+def chart_style(theme):
+    """matplotlib rcParams that match a theme, for plt.rc_context when creating figures."""
+    palette = PALETTES[theme]
+    return {
+        "figure.facecolor": palette["background"],
+        "axes.facecolor": palette["background"],
+        "axes.edgecolor": palette["foreground"],
+        "axes.labelcolor": palette["foreground"],
+        "axes.titlecolor": palette["foreground"],
+        "text.color": palette["foreground"],
+        "xtick.color": palette["foreground"],
+        "ytick.color": palette["foreground"],
+        "grid.color": palette["grid"],
+        "legend.facecolor": palette["background"],
+        "legend.edgecolor": palette["grid"],
+    }
+
+
+def style_figure(fig, theme):
+    """Recolor an existing figure for theme in place, without recreating its artists."""
+    palette = PALETTES[theme]
+    foreground = palette["foreground"]
+    fig.set_facecolor(palette["background"])
+    for ax in fig.get_axes():
+        ax.set_facecolor(palette["background"])
+        for spine in ax.spines.values():
+            spine.set_edgecolor(foreground)
+        ax.tick_params(colors=foreground, which="both")
+        for label in (ax.title, ax.xaxis.label, ax.yaxis.label):
+            label.set_color(foreground)
+        for line in ax.get_xgridlines() + ax.get_ygridlines():
+            line.set_color(palette["grid"])
+        # Value labels on bars, pie labels and chart messages
+        for text in ax.texts:
+            text.set_color(foreground)
+        legend = ax.get_legend()
+        if legend is not None:
+            legend.get_frame().set_facecolor(palette["background"])
+            legend.get_frame().set_edgecolor(palette["grid"])
+            for text in legend.get_texts():
+                text.set_color(foreground)
+
+
+class ThemeManager:
+    """Compiles theme profiles into ttk themes on first use and switches between them.
+
+    A profile is a palette plus the accent color and font size chosen in the
+    Appearance settings. Each becomes a ttk theme with style.theme_create the
+    first time it is used, so switching is a single theme_use instead of
+    reconfiguring every style.
+    """
+
+    def __init__(self, style, accent_colors):
+        self.style = style
+        self.accent_colors = accent_colors
+        self.theme = "light"
+        self.accent = accent_colors["primary"]
+        self.font_size = None
+        self.compiled = {}  # (theme, accent, font size) -> ttk theme name
+
+    def compile(self, theme, accent=None, font_size=None):
+        """Create the ttk theme of a profile if it does not exist yet and return its name."""
+        key = (theme, accent or self.accent, font_size)
+        name = self.compiled.get(key)
+        if name is None:
+            name = f"fitness-{len(self.compiled)}-{theme}"
+            colors = self.accent_colors
+            self.style.theme_create(name, parent=BASE_THEME, settings=theme_settings(
+                PALETTES[theme], key[1], colors["info"], colors["success"], colors["error"], font_size))
+            self.compiled[key] = name
+        return name
+
+    def apply(self, theme=None, accent=None, font_size=None):
+        """Switch to a profile; unspecified parts keep their current value. Returns its palette."""
+        self.theme = theme or self.theme
+        self.accent = accent or self.accent
+        self.font_size = font_size or self.font_size
+        self.style.theme_use(self.compile(self.theme, self.accent, self.font_size))
+        return PALETTES[self.theme]
+
+    def precompile(self):
+        """Compile the light and dark profiles of the current accent and font size ahead of a toggle."""
+        for theme in PALETTES:
+            self.compile(theme, self.accent, self.font_size)
@@ -0,0 +1,12 @@
+"""Data for each screen of the app, computed without Tk.
+
+Every function returns plain rows, totals and chart series, so the views
+can be benchmarked, cached and run off the UI thread or without a display;
+app.py only turns them into widgets.
+"""
+from viewmodels.charts import CHART_TYPES, chart_data, chart_stats, training_load_series, zone_minutes
+from viewmodels.dashboard import dashboard_data, format_record, goal_progress, trend_series
+from viewmodels.heatmap import HEATMAP_METRICS, HeatmapViewModel, day_date
+from viewmodels.history import HistoryViewModel, session_detail
+from viewmodels.periods import CHART_PERIODS, SUMMARY_PERIODS, chart_period_start, summary_period_start
+from viewmodels.summary import summary_texts, summary_totals
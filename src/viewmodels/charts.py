@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+
+from analytics import ZONE_NAMES, get_training_load, zone_totals
+from database import DEFAULT_USER_ID, get_stats_by_workout_type
+from viewmodels.periods import chart_period_start, date_range
+
+CHART_TYPES = ["Calories by Workout Type", "Duration by Workout Type",
+               "Workout Frequency", "Progress Over Time",
+               "Fitness, Fatigue and Form", "Time in Heart Rate Zones"]
+
+# Bar charts over the per-type statistics: (stat column, title, y label)
+TYPE_BARS = {
+    "Calories by Workout Type": (4, "Calories Burned by Workout Type", "Calories"),
+    "Duration by Workout Type": (2, "Duration by Workout Type", "Duration (minutes)"),
+}
+
+
+def chart_stats(period, user_id=None):
+    """Fetch the per-workout-type statistics a chart period needs."""
+    end_date = datetime.now()
+    start_date = chart_period_start(period, end_date)
+    if start_date:
+        return start_date, get_stats_by_workout_type(*date_range(start_date, end_date), user_id)
+    return None, get_stats_by_workout_type(user_id=user_id)
+
+
+def training_load_series(period, user_id=DEFAULT_USER_ID):
+    """Dates with daily load, fitness (CTL), fatigue (ATL) and form (TSB) for a chart period."""
+    start_date = chart_period_start(period)
+    days, load, ctl, atl, tsb = get_training_load(start_date.strftime('%Y-%m-%d') if start_date else None,
+                                                  user_id)
+    dates = [datetime(1970, 1, 1) + timedelta(days=int(day)) for day in days]
+    return dates, load, ctl, atl, tsb
+
+
+def zone_minutes(period, user_id=DEFAULT_USER_ID):
+    """(zone name, minutes) of heart rate zone time over a chart period."""
+    end_date = datetime.now()
+    seconds = zone_totals(*date_range(chart_period_start(period, end_date), end_date), user_id)
+    return list(zip(ZONE_NAMES, (seconds / 60.0).tolist()))
+
+
+def chart_data(chart_type, period, user_id=DEFAULT_USER_ID):
+    """The series and labels of a chart, ready to draw.
+
+    Returns a dict whose "kind" says how to draw it: "empty" (nothing in the
+    period), "message" (a text in place of a chart), "bar" and "pie" (labels
+    and values, bars labelled with value_format), or "load" (dates with the
+    load, ctl, atl and tsb series).
+    """
+    if chart_type == "Fitness, Fatigue and Form":
+        dates, load, ctl, atl, tsb = training_load_series(period, user_id)
+        if not ctl.any():
+            return {"kind": "empty"}
+        return {"kind": "load", "title": "Fitness, Fatigue and Form", "ylabel": "Training load (TRIMP)",
+                "dates": dates, "load": load, "ctl": ctl, "atl": atl, "tsb": tsb}
+
+    if chart_type == "Time in Heart Rate Zones":
+        zones = zone_minutes(period, user_id)
+        if not any(minutes for _, minutes in zones):
+            return {"kind": "empty"}
+        return {"kind": "bar", "title": "Time in Heart Rate Zones", "xlabel": "Zone", "ylabel": "Minutes",
+                "labels": [name for name, _ in zones], "values": [minutes for _, minutes in zones],
+                "value_format": "{:.0f}"}
+
+    start_date, stats = chart_stats(period, user_id)
+    if not stats:
+        return {"kind": "empty"}
+    workout_types = [stat[0] for stat in stats]
+
+    if chart_type in TYPE_BARS:
+        column, title, ylabel = TYPE_BARS[chart_type]
+        return {"kind": "bar", "title": title, "xlabel": "Workout Type", "ylabel": ylabel,
+                "labels": workout_types, "values": [stat[column] for stat in stats], "value_format": "{:.1f}"}
+    if chart_type == "Workout Frequency":
+        return {"kind": "pie", "title": "Workout Frequency by Type",
+                "labels": workout_types, "values": [stat[1] for stat in stats]}
+    if chart_type == "Progress Over Time":
+        if start_date:
+            return {"kind": "message",
+                    "message": "Progress Over Time chart requires\ndata analysis over multiple sessions"}
+        return {"kind": "message", "message": "Select a specific date range for this chart"}
+    raise ValueError(f"Unknown chart type: {chart_type}")
@@ -0,0 +1,102 @@
+from datetime import date, timedelta
+
+from database import (DEFAULT_USER_ID, RECORD_METRICS, get_active_goals, get_personal_records, get_session_totals,
+                      get_sessions, get_trends, get_user_profile)
+
+RECENT_SESSIONS = 5
+RECENT_RECORDS = 5
+TREND_DAYS = 30
+
+# Goal type: (label, index into get_session_totals, unit)
+GOAL_METRICS = {
+    "Workout Frequency": ("Workouts", 1, "workouts"),
+    "Calories Burned": ("Calories", 3, "kcal"),
+    "Duration": ("Duration", 2, "min"),
+}
+
+
+def format_record(metric, value):
+    """Text of a personal record, e.g. 'Longest workout 62.0 min'."""
+    label, unit = RECORD_METRICS[metric]
+    return f"{label} {value:.1f} {unit}"
+
+
+def trend_series(days=TREND_DAYS, user_id=DEFAULT_USER_ID):
+    """Daily workouts, minutes and calories of the last days, today included, zero on rest days.
+
+    Returns a dict of equally long lists: dates (YYYY-MM-DD), workouts,
+    duration and calories.
+    """
+    today = date.today()
+    dates = [(today - timedelta(days=offset)).isoformat() for offset in range(days - 1, -1, -1)]
+    by_date = {row[0]: row[1:] for row in get_trends(days - 1, user_id)}
+    empty = (0, 0.0, 0.0)
+    return {
+        "dates": dates,
+        "workouts": [by_date.get(day, empty)[0] for day in dates],
+        "duration": [by_date.get(day, empty)[1] or 0.0 for day in dates],
+        "calories": [by_date.get(day, empty)[2] or 0.0 for day in dates],
+    }
+
+
+def goal_progress(user_id=DEFAULT_USER_ID):
+    """(label, description, progress %) of each active goal of a profile, soonest ending first.
+
+    Progress counts the profile's sessions started between the goal's
+    start and end dates. Goals saved without dates are left out.
+    """
+    goals = []
+    for _, goal_type, target, start_date, end_date, _, notes, _ in get_active_goals(user_id):
+        if goal_type not in GOAL_METRICS:
+            continue
+        try:
+            totals = get_session_totals(start_date, f"{end_date} 23:59:59", user_id)
+        except ValueError:
+            continue
+        label, index, unit = GOAL_METRICS[goal_type]
+        value = totals[index]
+        description = f"{value:.0f} of {target:.0f} {unit} by {end_date}"
+        if notes:
+            description = f"{notes} ({description})"
+        goals.append((label, description, min(100, int(value / target * 100)) if target > 0 else 0))
+    return goals
+
+
+def dashboard_data(user_id=DEFAULT_USER_ID):
+    """Everything the dashboard shows for a profile, as plain data.
+
+    Returns a dict with recent (date, duration, calories) rows of the newest
+    sessions, the all-time totals, the daily calorie target and progress when
+    the profile has a BMR, the most recently set personal records as
+    (text, date) pairs, the progress of the active goals and the daily
+    trend of the last 30 days.
+    """
+    recent = []
+    for session in get_sessions(user_id=user_id, limit=RECENT_SESSIONS):
+        duration = session[3] if len(session) > 3 else None
+        calories = session[4] if len(session) > 4 else None
+        recent.append((session[1], f"{duration:.1f} min" if duration else "Active",
+                       f"{calories:.1f}" if calories else "-"))
+
+    sessions, _, total_duration, total_calories = get_session_totals(user_id=user_id)
+
+    # Example target: 20% of BMR as daily exercise
+    target = None
+    profile = get_user_profile(user_id)
+    if profile and profile[6]:
+        calories_target = profile[6] * 0.2
+        progress = min(100, int((total_calories / calories_target) * 100)) if calories_target > 0 else 0
+        target = {"calories": calories_target, "progress_pct": progress}
+
+    records = sorted(get_personal_records(user_id).items(), key=lambda item: item[1][2], reverse=True)
+    return {
+        "recent": recent,
+        "total_sessions": sessions,
+        "total_duration": total_duration,
+        "total_calories": total_calories,
+        "target": target,
+        "records": [(f"{workout_type}: {format_record(metric, value)}", date)
+                    for (workout_type, metric), (value, _, date) in records[:RECENT_RECORDS]],
+        "goals": goal_progress(user_id),
+        "trend": trend_series(TREND_DAYS, user_id),
+    }
@@ -0,0 +1,79 @@
+import calendar
+from datetime import date, timedelta
+
+from database import DEFAULT_USER_ID, get_activity_calendar, get_activity_years
+
+# Metric choices of the activity calendar: (label, calendar metric, unit)
+HEATMAP_METRICS = [("Workouts", "workouts", "workouts"), ("Minutes", "duration", "min"),
+                   ("Calories", "calories", "cal")]
+
+# Shades from no activity (0) to the busiest days (4)
+HEATMAP_LEVELS = 4
+
+
+def heatmap_levels(values):
+    """Shade level 0-4 of each day; active days are spread over 1-4 relative to the busiest."""
+    top = max(values, default=0)
+    if top <= 0:
+        return [0] * len(values)
+    return [0 if value <= 0 else min(HEATMAP_LEVELS, 1 + int((HEATMAP_LEVELS - 1) * value / top)) for value in values]
+
+
+class HeatmapViewModel:
+    """Activity calendar of one profile, a year at a time.
+
+    Each year is read once from the precomputed per-day arrays and kept, so
+    switching between years and metrics does not touch the database again
+    until invalidate().
+    """
+
+    def __init__(self, user_id=DEFAULT_USER_ID):
+        self.user_id = user_id
+        self._years = {}
+
+    def invalidate(self, user_id=None):
+        if user_id is not None:
+            self.user_id = user_id
+        self._years.clear()
+
+    def cached(self, year):
+        return year in self._years
+
+    def years(self):
+        """Years with logged activity, and the current year, oldest first."""
+        return sorted(set(get_activity_years(self.user_id)) | {date.today().year})
+
+    def load(self, year):
+        """Read a year into the cache (safe to run on a worker) and return it."""
+        arrays = get_activity_calendar(year, self.user_id)
+        self._years[year] = arrays
+        return arrays
+
+    def data(self, year, metric="workouts"):
+        """What the calendar shows for a year and metric.
+
+        A dict with the year, days (365 or 366), first_weekday (0 is Monday),
+        the daily values and shade levels, the total, the number of active
+        days and the busiest day as (YYYY-MM-DD, value) or None.
+        """
+        arrays = self._years.get(year)
+        if arrays is None:
+            arrays = self.load(year)
+        days = 366 if calendar.isleap(year) else 365
+        values = arrays[metric][:days]
+        busiest = max(range(days), key=values.__getitem__)
+        return {
+            "year": year,
+            "days": days,
+            "first_weekday": date(year, 1, 1).weekday(),
+            "values": values,
+            "levels": heatmap_levels(values),
+            "total": sum(values),
+            "active_days": sum(1 for value in values if value > 0),
+            "busiest": (day_date(year, busiest), values[busiest]) if values[busiest] > 0 else None,
+        }
+
+
+def day_date(year, slot):
+    """'YYYY-MM-DD' of a day of the year (slot 0 is January 1st)."""
+    return (date(year, 1, 1) + timedelta(days=slot)).isoformat()
@@ -0,0 +1,68 @@
+from database import get_session, get_session_details, get_session_workout_types, get_sessions
+
+
+class HistoryViewModel:
+    """Rows of the history table for one profile, loaded once and filtered in memory.
+
+    load() reads the sessions and their workout types with two queries;
+    rows() then filters the cached rows without touching the database.
+    """
+
+    def __init__(self, user_id=None):
+        self.user_id = user_id
+        self._rows = []
+
+    def load(self, user_id=None):
+        """Read the history of user_id (default: the current profile) and return every row."""
+        if user_id is not None:
+            self.user_id = user_id
+        sessions = get_sessions(user_id=self.user_id)
+        types = get_session_workout_types(user_id=self.user_id)
+
+        rows = []
+        for session_id, start_time, end_time, duration, calories in (session[:5] for session in sessions):
+            workout_types = types.get(session_id)
+            workout_summary = ", ".join(workout_types) if workout_types else "No workouts"
+            duration_str = f"{duration:.1f}" if duration else "-"
+            calories_str = f"{calories:.1f}" if calories else "-"
+            row = (session_id, start_time, duration_str, calories_str, workout_summary)
+            # Lowercased text the filter searches: id, start, end and workout types
+            search = "\0".join((str(session_id), start_time, end_time or "", workout_summary)).lower()
+            rows.append((row, search))
+        # Swapped in whole, so rows() never sees a half-built list when load() runs on a worker
+        self._rows = rows
+        return self.rows()
+
+    def rows(self, filter_text=""):
+        """Cached rows whose id, times or workout types contain filter_text (case-insensitive)."""
+        filter_text = filter_text.lower()
+        if not filter_text:
+            return [row for row, _ in self._rows]
+        return [row for row, search in self._rows if filter_text in search]
+
+    def __len__(self):
+        return len(self._rows)
+
+
+def session_detail(session_id):
+    """What the session details dialog shows, or None if the session does not exist.
+
+    A dict with the session's id, start_time, end_time, duration_text,
+    calories_text, deletable (only ended sessions can be deleted) and
+    workouts as (workout id, line, duration, calories, notes).
+    """
+    session = get_session(session_id)
+    if session is None:
+        return None
+    _, start_time, end_time, duration, calories = session[:5]
+    workouts = [(workout_id, f"{workout_type} - {minutes:.1f} min, {burned:.1f} cal", minutes, burned, notes or "")
+                for workout_type, minutes, burned, _, notes, workout_id in get_session_details(session_id)]
+    return {
+        "id": session_id,
+        "start_time": start_time,
+        "end_time": end_time,
+        "duration_text": f"Duration: {duration:.1f} minutes" if duration else "Duration: -",
+        "calories_text": f"Calories: {calories:.1f}" if calories else "Calories: -",
+        "deletable": end_time is not None,
+        "workouts": workouts,
+    }
@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta
+
+SUMMARY_PERIODS = ["This Week", "This Month", "This Year", "All Time"]
+CHART_PERIODS = ["Last 7 Days", "Last 30 Days", "This Month", "This Year", "All Time"]
+
+
+def summary_period_start(period, now=None):
+    """Return the start of a summary period, or None for all time."""
+    now = now or datetime.now()
+    if period == "This Week":
+        return now - timedelta(days=7)
+    elif period == "This Month":
+        return now - timedelta(days=30)
+    elif period == "This Year":
+        return now - timedelta(days=365)
+    return None
+
+
+def chart_period_start(period, now=None):
+    """Return the start of a chart period, or None for all time."""
+    now = now or datetime.now()
+    if period == "Last 7 Days":
+        return now - timedelta(days=7)
+    elif period == "Last 30 Days":
+        return now - timedelta(days=30)
+    elif period == "This Month":
+        return datetime(now.year, now.month, 1)
+    elif period == "This Year":
+        return datetime(now.year, 1, 1)
+    return None
+
+
+def date_range(start_date, end_date):
+    """('YYYY-MM-DD' or None, 'YYYY-MM-DD') as the database functions take them."""
+    return (start_date.strftime('%Y-%m-%d') if start_date else None), end_date.strftime('%Y-%m-%d')
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from database import get_session_totals
+from viewmodels.periods import date_range, summary_period_start
+
+
+def summary_totals(period, user_id=None):
+    """Compute the summary statistics for the selected time period."""
+    end_date = datetime.now()
+    start_date_str, end_date_str = date_range(summary_period_start(period, end_date), end_date)
+    sessions, workouts, duration, calories = get_session_totals(start_date_str, end_date_str, user_id)
+    return {
+        "total_sessions": sessions,
+        "total_workouts": workouts,
+        "total_duration": duration,
+        "total_calories": calories,
+        "avg_duration": duration / sessions if sessions else 0.0,
+        "avg_calories": calories / sessions if sessions else 0.0
+    }
+
+
+def summary_texts(totals):
+    """The summary statistics formatted for display, keyed like summary_totals."""
+    return {
+        "total_sessions": str(totals["total_sessions"]),
+        "total_workouts": str(totals["total_workouts"]),
+        "total_duration": f"{totals['total_duration']:.1f}",
+        "total_calories": f"{totals['total_calories']:.1f}",
+        "avg_duration": f"{totals['avg_duration']:.1f}",
+        "avg_calories": f"{totals['avg_calories']:.1f}"
+    }
@@ -1,11 +1,14 @@
 class Workout:
-    def __init__(self, workout_type, duration, calories_burned, intensity="Medium", notes=""):
+    def __init__(self, workout_type, duration, calories_burned, intensity="Medium", notes="",
+                 calories_estimated=False, distance=None):
         self.workout_type = workout_type
         self.duration = duration  # in minutes
         self.calories_burned = calories_burned
         self.calories = calories_burned  # Add alias for compatibility
         self.intensity = intensity
         self.notes = notes
+        self.calories_estimated = calories_estimated  # True when calories came from the estimator
+        self.distance = distance  # in kilometres, when known
 
     def __str__(self):
         return f"{self.workout_type:10} │ {self.duration:6.1f} min │ {self.calories_burned:6.1f} cal"
\ No newline at end of file